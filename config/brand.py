@@ -1,15 +1,90 @@
+import hashlib
+import json
+import os
+import threading
 from pathlib import Path
-import yaml
+
+from config.settings import Settings
+
+DEFAULT_CONFIG_PATH = Path(__file__).parent / "brand.yaml"
+
+# Parsed configs by resolved path, with the (mtime_ns, size) they were read at.
+_parsed: dict[Path, tuple[tuple[int, int], dict]] = {}
+_lock = threading.Lock()
+
+
+def _parse_yaml(path: Path) -> dict:
+    import yaml  # Only needed when the parsed copy is missing or stale
+
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    with open(path, "r") as f:
+        return yaml.load(f, Loader=loader)
+
+
+def _disk_cache_path(path: Path) -> Path:
+    digest = hashlib.sha256(str(path).encode()).hexdigest()[:16]
+    return Settings.CACHE_DIR / "brand" / f"{path.stem}-{digest}.json"
+
+
+def _write_disk_cache(cache_file: Path, stamp: tuple[int, int], config: dict) -> None:
+    try:
+        payload = json.dumps({"stamp": stamp, "config": config})
+    except (TypeError, ValueError):
+        return
+    if json.loads(payload)["config"] != config:
+        return  # e.g. YAML dates or non-string keys would not round-trip
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp = cache_file.with_name(f".{cache_file.name}.{os.getpid()}")
+        tmp.write_text(payload)
+        os.replace(tmp, cache_file)
+    except OSError:
+        pass  # A read-only cache directory only costs the re-parse
+
+
+def _load(path: Path) -> dict:
+    """Parse a brand YAML file, reusing a copy parsed at the same mtime/size.
+
+    Parsed configs are kept per process and as JSON under CACHE_DIR, so a
+    fresh process with an unchanged file skips importing the YAML parser.
+    """
+    path = path.resolve()
+    stat = path.stat()
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    with _lock:
+        cached = _parsed.get(path)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+
+    cache_file = _disk_cache_path(path)
+    config = None
+    try:
+        with open(cache_file) as f:
+            entry = json.load(f)
+        if tuple(entry["stamp"]) == stamp:
+            config = entry["config"]
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    if config is None:
+        config = _parse_yaml(path)
+        _write_disk_cache(cache_file, stamp, config)
+
+    with _lock:
+        _parsed[path] = (stamp, config)
+    return config
 
 
 class BrandConfig:
-    """Load and provide access to brand configuration from brand.yaml."""
+    """Load and provide access to brand configuration from brand.yaml.
+
+    The parsed YAML is shared between instances loading the same unchanged
+    file; treat the returned dicts as read-only.
+    """
 
     def __init__(self, config_path: str | None = None):
-        if config_path is None:
-            config_path = Path(__file__).parent / "brand.yaml"
-        with open(config_path, "r") as f:
-            self._config = yaml.safe_load(f)
+        self._config = _load(Path(config_path or DEFAULT_CONFIG_PATH))
+        self._content_hash = None
 
     @property
     def name(self) -> str:
@@ -34,3 +109,20 @@ class BrandConfig:
     @property
     def defaults(self) -> dict:
         return self._config["defaults"]
+
+    def lookup(self, key: str):
+        """The value at a dotted key such as 'typography.heading_font', or None."""
+        value = self._config
+        for part in key.split("."):
+            if not isinstance(value, dict) or part not in value:
+                return None
+            value = value[part]
+        return value
+
+    @property
+    def content_hash(self) -> str:
+        """SHA-256 of the parsed brand configuration, stable across key order."""
+        if self._content_hash is None:
+            canonical = json.dumps(self._config, sort_keys=True, default=str)
+            self._content_hash = hashlib.sha256(canonical.encode()).hexdigest()
+        return self._content_hash
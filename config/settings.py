@@ -1,12 +1,26 @@
 import os
 from pathlib import Path
-from dotenv import load_dotenv
-
-load_dotenv()
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 
+def _has_dotenv() -> bool:
+    """Whether load_dotenv() could find a .env file (it searches upward from
+    this package, or from the working directory when interactive)."""
+    for start in (Path(__file__).resolve().parent, Path.cwd()):
+        for directory in (start, *start.parents):
+            if (directory / ".env").is_file():
+                return True
+    return False
+
+
+# python-dotenv is slow to import; skip it when there is nothing to load.
+if _has_dotenv():
+    from dotenv import load_dotenv
+
+    load_dotenv()
+
+
 class Settings:
     """Application-wide settings loaded from environment variables."""
 
@@ -14,11 +28,57 @@ class Settings:
     OUTPUT_FORMAT = os.getenv("OUTPUT_FORMAT", "png")
     OUTPUT_QUALITY = int(os.getenv("OUTPUT_QUALITY", "95"))
 
+    # Encoder options per output format (see src.utils.encode.encode_optimized).
+    # Flat brand graphics become 8-bit palette PNGs / lossless WebP; JPEGs are
+    # progressive. PLATFORM_ENCODER_PROFILES overrides them per platform.
+    # PNG palettes are exact (at most 256 source colors) unless
+    # PNG_PALETTE_MAX_COLORS, or a profile's palette_max_colors, opts in to
+    # a lossy 256-color palette for images with more colors.
+    PNG_PALETTE_MAX_COLORS = int(os.getenv("PNG_PALETTE_MAX_COLORS", "256"))
+    ENCODER_PROFILES = {
+        "png": {"optimize": True, "palette": True, "palette_max_colors": PNG_PALETTE_MAX_COLORS},
+        "jpg": {"quality": OUTPUT_QUALITY, "optimize": True, "progressive": True},
+        "webp": {"quality": OUTPUT_QUALITY, "lossless": "auto", "method": 4},
+        "pdf": {"quality": OUTPUT_QUALITY},
+    }
+    PLATFORM_ENCODER_PROFILES = {
+        # YouTube rejects custom thumbnails over 2 MB.
+        "youtube_thumbnail": {"max_bytes": 2 * 1024 * 1024},
+    }
+
+    # Threads used to encode exports in parallel (0 = Python's default)
+    EXPORT_WORKERS = int(os.getenv("EXPORT_WORKERS", "0"))
+
+    CACHE_DIR = Path(os.getenv("CACHE_DIR", OUTPUT_DIR / ".cache"))
+    RENDER_CACHE_MAX_BYTES = int(os.getenv("RENDER_CACHE_MAX_BYTES", str(1 << 30)))
+
+    # Inputs of every output rendered by `sigma build`
+    BUILD_MANIFEST = Path(os.getenv("BUILD_MANIFEST", OUTPUT_DIR / ".sigma-build.json"))
+
+    # Traces and cProfile dumps written by `sigma --profile ...`
+    PROFILE_DIR = Path(os.getenv("PROFILE_DIR", OUTPUT_DIR / "profile"))
+
     ASSETS_DIR = BASE_DIR / "assets"
+    CUTOUTS_DIR = Path(os.getenv("CUTOUTS_DIR", BASE_DIR))
     TEMPLATES_DIR = BASE_DIR / "templates"
 
     SUPPORTED_FORMATS = ("png", "jpg", "webp", "pdf")
 
+    # Print sizes in inches (width, height) for `sigma banner --print`,
+    # rendered at PRINT_DPI and streamed to PNG or TIFF strip by strip
+    PRINT_SIZES = {
+        "event_banner": (96, 36),   # 8 ft x 3 ft backdrop
+        "rollup_banner": (33, 80),  # Pull-up stand
+        "billboard": (576, 168),    # 48 ft x 14 ft bulletin
+    }
+    PRINT_DPI = int(os.getenv("PRINT_DPI", "300"))
+
+    # Animated stories (`sigma story`): default file format (webp, gif or
+    # png for APNG), length in seconds and frame rate
+    ANIMATION_FORMAT = os.getenv("ANIMATION_FORMAT", "webp")
+    ANIMATION_DURATION = float(os.getenv("ANIMATION_DURATION", "3"))
+    ANIMATION_FPS = int(os.getenv("ANIMATION_FPS", "30"))
+
     PLATFORM_DIMENSIONS = {
         "youtube_thumbnail": (1280, 720),
         "youtube_banner": (2560, 1440),
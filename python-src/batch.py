@@ -0,0 +1,375 @@
+import io
+import json
+import os
+import time
+import traceback
+from contextlib import nullcontext
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from importlib import import_module
+from pathlib import Path
+from typing import Iterable, Iterator
+
+import yaml
+
+from config import Settings, BrandConfig
+from src.dependencies import Dependencies, TrackedBrand, recording
+from src.profiling import peak_memory
+
+# Generator names accepted in manifests, resolved lazily so a worker only
+# imports the generator modules its jobs actually use.
+GENERATORS = {
+    "thumbnail": "src.generators.thumbnail:ThumbnailGenerator",
+    "banner": "src.generators.banner:BannerGenerator",
+    "social": "src.generators.social_post:SocialPostGenerator",
+    "carousel": "src.generators.carousel:CarouselGenerator",
+    "story": "src.generators.story:StoryGenerator",
+}
+
+# Suffix of a PLATFORM_DIMENSIONS key -> (generator name, text parameter).
+# Keys without an entry are skipped when expanding a campaign matrix:
+# twitter_header has no generator yet, and animated stories are rendered
+# only by explicit jobs.
+PLATFORM_KINDS = {
+    "thumbnail": ("thumbnail", "title"),
+    "banner": ("banner", "title"),
+    "post": ("social", "text"),
+    "carousel": ("carousel", "title"),
+}
+
+
+@dataclass
+class BatchJob:
+    """A single generator invocation inside a batch."""
+
+    generator: str
+    params: dict = field(default_factory=dict)
+    id: str | None = None
+    # Source data the job was expanded from (a catalog course), tracked as
+    # an input by incremental builds.
+    record: dict | None = None
+
+    def __post_init__(self):
+        if self.id is None:
+            self.id = f"{self.generator}:{self.params.get('output_path', '')}"
+
+
+@dataclass
+class JobResult:
+    """Outcome of a batch job, streamed back to the caller as jobs finish."""
+
+    job_id: str
+    outputs: list[Path | io.BytesIO] = field(default_factory=list)
+    error: str | None = None
+    elapsed: float = 0.0
+    # Inputs the render read, when run with track_dependencies.
+    dependencies: Dependencies | None = None
+    # Peak resident memory of the worker while running the job.
+    peak_rss_kb: int | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def get_generator_class(name: str):
+    """Resolve a generator name from a manifest to its class."""
+    try:
+        module_name, class_name = GENERATORS[name].split(":")
+    except KeyError:
+        raise ValueError(
+            f"Unknown generator '{name}'. Available: {sorted(GENERATORS)}"
+        ) from None
+    return getattr(import_module(module_name), class_name)
+
+
+def campaign_jobs(
+    courses_path: str | Path,
+    settings: Settings,
+    platforms: Iterable[str] | None = None,
+    output_dir: str | Path | None = None,
+) -> list[BatchJob]:
+    """Expand every course in a catalog x every platform into batch jobs.
+
+    Args:
+        courses_path: Path to a catalog like data/courses.json.
+        settings: Settings providing PLATFORM_DIMENSIONS and output defaults.
+        platforms: PLATFORM_DIMENSIONS keys to render. Defaults to all keys
+                   that have a matching generator.
+        output_dir: Root directory for outputs, one subdirectory per course.
+    """
+    with open(courses_path, "r") as f:
+        catalog = json.load(f)
+    courses = catalog["courses"] if isinstance(catalog, dict) else catalog
+    output_dir = Path(output_dir) if output_dir else settings.OUTPUT_DIR / "campaign"
+    keys = list(platforms) if platforms else list(settings.PLATFORM_DIMENSIONS)
+
+    jobs = []
+    for course in courses:
+        for key in keys:
+            platform, _, kind = key.rpartition("_")
+            if kind not in PLATFORM_KINDS:
+                continue
+            generator, text_param = PLATFORM_KINDS[kind]
+            target = output_dir / course["id"] / key
+            if kind != "carousel":
+                target = target.with_suffix(f".{settings.OUTPUT_FORMAT}")
+            jobs.append(
+                BatchJob(
+                    generator=generator,
+                    params={
+                        text_param: course["name"],
+                        "platform": platform,
+                        "output_path": str(target),
+                    },
+                    id=f"{course['id']}/{key}",
+                    record=course,
+                )
+            )
+    return jobs
+
+
+def iter_manifest(path: str | Path, settings: Settings) -> Iterator[BatchJob]:
+    """Lazily yield the batch jobs of a YAML or JSON manifest.
+
+    A manifest holds an explicit ``jobs`` list, a ``campaign`` section that
+    expands a course catalog over platforms, ``sources`` that map the
+    records of JSON/JSONL/CSV data files to jobs (see
+    ``src.datasource.source_jobs``), or any mix of these::
+
+        defaults: {platform: youtube}
+        jobs:
+          - generator: thumbnail
+            params: {title: "Power BI", output_path: output/pbi.png}
+        campaign:
+          courses: data/courses.json
+          platforms: [youtube_thumbnail, linkedin_post]
+        sources:
+          - path: data/courses.json
+            records: courses
+            jobs:
+              - generator: thumbnail
+                id: "ads/{id}"
+                params: {title: "{name}", output_path: "output/ads/{id}.png"}
+
+    Data sources are streamed, so jobs can be fed to ``BatchRunner.run``
+    without ever holding the whole data file in memory.
+    """
+    path = Path(path)
+    with open(path, "r") as f:
+        if path.suffix == ".json":
+            manifest = json.load(f)
+        else:
+            manifest = yaml.safe_load(f)
+
+    defaults = manifest.get("defaults", {})
+    for entry in manifest.get("jobs", []):
+        yield BatchJob(
+            generator=entry["generator"],
+            params={**defaults, **entry.get("params", {})},
+            id=entry.get("id"),
+        )
+
+    campaign = manifest.get("campaign")
+    if campaign:
+        courses = Path(campaign["courses"])
+        if not courses.is_absolute() and not courses.exists():
+            courses = path.parent / courses
+        yield from campaign_jobs(
+            courses,
+            settings,
+            platforms=campaign.get("platforms"),
+            output_dir=campaign.get("output_dir"),
+        )
+
+    sources = manifest.get("sources")
+    if sources:
+        from src.datasource import source_jobs
+
+        for spec in sources:
+            yield from source_jobs(spec, path.parent, defaults)
+
+
+def load_manifest(path: str | Path, settings: Settings) -> list[BatchJob]:
+    """Load every batch job of a manifest (see ``iter_manifest``)."""
+    return list(iter_manifest(path, settings))
+
+
+# Per-process state, populated once by init_worker so every job in a
+# worker reuses the same Settings, BrandConfig, fonts and generator instances.
+_worker_state: dict = {}
+
+
+def _tune_allocator() -> None:
+    """Return freed canvases to the OS instead of keeping them in the heap.
+
+    glibc raises its mmap threshold after large blocks are freed, so a
+    worker's heap grows to fit the biggest canvases it ever rendered and
+    stays there. Pinning the threshold at 1 MiB keeps image buffers in
+    their own mappings, which are unmapped when freed. The setting is
+    process-wide and Linux/glibc only; elsewhere this does nothing.
+    """
+    try:
+        import ctypes
+
+        libc = ctypes.CDLL("libc.so.6")
+        libc.mallopt(-3, 1 << 20)  # M_MMAP_THRESHOLD
+    except (OSError, AttributeError):
+        pass
+
+
+def init_worker(use_cache: bool = False, profile_dir: str | None = None) -> None:
+    """Load settings, brand, fonts and the cutout index once per process.
+
+    With ``profile_dir``, every job run by the process writes its trace and
+    cProfile dump there (see src.profiling.profile_job).
+    """
+    from src.cache import RenderCache
+    from src.utils.assets import get_cutout_library
+    from src.utils.text import warm_font_cache
+
+    settings = Settings()
+    brand = BrandConfig()
+    warm_font_cache(brand)
+    get_cutout_library().poses()
+    _worker_state.clear()
+    _worker_state.update(
+        settings=settings,
+        brand=brand,
+        generators={},
+        cache=RenderCache(settings) if use_cache else None,
+        profile_dir=profile_dir,
+    )
+
+
+def init_pool_worker(use_cache: bool = False, profile_dir: str | None = None) -> None:
+    """Pool initializer: ``init_worker`` plus allocator tuning.
+
+    Only processes the pool owns get the tuned allocator; a caller running
+    jobs inline with ``init_worker`` keeps its own.
+    """
+    _tune_allocator()
+    init_worker(use_cache, profile_dir)
+
+
+def _get_generator(name: str, tracked: bool = False):
+    if not _worker_state:
+        init_worker()
+    generators = _worker_state["generators"]
+    if (name, tracked) not in generators:
+        cls = get_generator_class(name)
+        brand = _worker_state["brand"]
+        if tracked:
+            brand = TrackedBrand(brand)
+        generators[name, tracked] = cls(_worker_state["settings"], brand)
+    return generators[name, tracked]
+
+
+def _job_profile(job: BatchJob):
+    profile_dir = _worker_state.get("profile_dir")
+    if profile_dir is None:
+        return nullcontext()
+    from src.profiling import job_name, profile_job
+
+    return profile_job(profile_dir, job_name(job.id))
+
+
+def run_job(
+    job: BatchJob, in_memory: bool = False, track_dependencies: bool = False
+) -> JobResult:
+    """Run one job with this process's warm generators; never raises.
+
+    With ``in_memory`` the outputs are encoded buffers instead of files; the
+    format comes from the ``output_path`` suffix if one is given. With
+    ``track_dependencies`` the job bypasses the render cache and the brand
+    keys and files it read are returned in ``JobResult.dependencies``.
+    """
+    start = time.perf_counter()
+    try:
+        generator = _get_generator(job.generator, tracked=track_dependencies)
+        cache = _worker_state["cache"]
+        deps = None
+        with _job_profile(job), peak_memory() as memory:
+            if track_dependencies:
+                with recording() as deps:
+                    result = generator.generate(**job.params)
+            elif in_memory:
+                params = dict(job.params)
+                fmt = Path(params.pop("output_path", None) or "").suffix.lstrip(".")
+                result = generator.generate_bytes(fmt or None, **params)
+            elif cache is not None:
+                result = cache.render(generator, **job.params)
+            else:
+                result = generator.generate(**job.params)
+        outputs = result if isinstance(result, list) else [result]
+        return JobResult(
+            job.id,
+            outputs,
+            elapsed=time.perf_counter() - start,
+            dependencies=deps,
+            peak_rss_kb=memory.get("peak_rss_kb"),
+        )
+    except Exception:
+        return JobResult(
+            job.id,
+            error=traceback.format_exc(),
+            elapsed=time.perf_counter() - start,
+        )
+
+
+class BatchRunner:
+    """Fan batch jobs out across a process pool and stream results back."""
+
+    def __init__(
+        self,
+        workers: int | None = None,
+        max_pending: int | None = None,
+        use_cache: bool = False,
+        profile_dir: str | Path | None = None,
+        track_dependencies: bool = False,
+    ):
+        """Create a runner.
+
+        Args:
+            workers: Number of worker processes. Defaults to the CPU count;
+                     1 runs jobs inline in the calling process.
+            max_pending: Upper bound on jobs submitted but not yet finished,
+                         so very large job lists are consumed lazily.
+            use_cache: Serve unchanged outputs from the render cache.
+            profile_dir: Write a trace and cProfile dump per job here.
+            track_dependencies: Record each job's inputs (see run_job).
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending or self.workers * 4
+        self.use_cache = use_cache
+        self.profile_dir = str(profile_dir) if profile_dir else None
+        self.track_dependencies = track_dependencies
+
+    def run(self, jobs: Iterable[BatchJob]) -> Iterator[JobResult]:
+        """Run jobs and yield a JobResult for each one as it completes.
+
+        Failures never abort the batch; they are reported through
+        ``JobResult.error``.
+        """
+        if self.workers == 1:
+            init_worker(self.use_cache, self.profile_dir)
+            for job in jobs:
+                yield run_job(job, track_dependencies=self.track_dependencies)
+            return
+
+        with ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=init_pool_worker,
+            initargs=(self.use_cache, self.profile_dir),
+        ) as pool:
+            pending = set()
+            for job in jobs:
+                pending.add(pool.submit(run_job, job, False, self.track_dependencies))
+                if len(pending) >= self.max_pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
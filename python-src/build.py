@@ -0,0 +1,196 @@
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from config import BrandConfig, Settings
+from src.batch import BatchJob, BatchRunner, JobResult, get_generator_class
+from src.cache import code_fingerprint
+
+# Bump when the manifest layout changes; older manifests are discarded.
+MANIFEST_VERSION = 1
+
+_HASH_CHUNK = 1 << 20
+
+
+def _digest(value) -> str:
+    """Short stable hash of a JSON-serializable value."""
+    canonical = json.dumps(value, sort_keys=True, default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()[:32]
+
+
+def _hash_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(_HASH_CHUNK):
+            digest.update(chunk)
+    return digest.hexdigest()[:32]
+
+
+class BuildManifest:
+    """What every built output was rendered from, stored as JSON.
+
+    ``outputs`` maps a job id to its output paths and input digests.
+    ``files`` maps each input file to ``[mtime_ns, size, sha256]``, so a file
+    is only re-hashed when its mtime or size changed since the last build,
+    and at most once per build however many outputs depend on it.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        try:
+            data = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            data = {}
+        if data.get("version") != MANIFEST_VERSION:
+            data = {}
+        self.outputs: dict[str, dict] = data.get("outputs", {})
+        self.files: dict[str, list] = data.get("files", {})
+        self._checked: dict[str, str | None] = {}
+
+    def file_digest(self, path: str) -> str | None:
+        """Content hash of a file (None if it is gone), hashing only on change."""
+        if path in self._checked:
+            return self._checked[path]
+        try:
+            stat = os.stat(path)
+        except OSError:
+            digest = None
+        else:
+            known = self.files.get(path)
+            if known and known[0] == stat.st_mtime_ns and known[1] == stat.st_size:
+                digest = known[2]
+            else:
+                digest = _hash_file(path)
+                self.files[path] = [stat.st_mtime_ns, stat.st_size, digest]
+        self._checked[path] = digest
+        return digest
+
+    def save(self) -> None:
+        from src.utils.image import atomic_write_bytes
+
+        payload = {"version": MANIFEST_VERSION, "outputs": self.outputs, "files": self.files}
+        atomic_write_bytes(self.path, json.dumps(payload, separators=(",", ":")).encode())
+
+
+class Builder:
+    """Re-render only the jobs whose inputs changed since the last build.
+
+    A job's inputs are its generator (class and code fingerprint, plus the
+    settings that shape output), its parameters, the catalog record it came
+    from, the brand config keys it read and the files (fonts, cutouts) it
+    loaded. The last two are recorded while the job renders.
+    """
+
+    def __init__(
+        self,
+        settings: Settings,
+        brand: BrandConfig,
+        manifest_path: str | Path | None = None,
+        workers: int | None = None,
+    ):
+        self.settings = settings
+        self.brand = brand
+        self.manifest = BuildManifest(manifest_path or settings.BUILD_MANIFEST)
+        self.workers = workers
+        self._versions: dict[str, str] = {}
+        self._config_digests: dict[str, str] = {}
+
+    def _generator_version(self, name: str) -> str:
+        if name not in self._versions:
+            cls = get_generator_class(name)
+            self._versions[name] = _digest({
+                "generator": f"{cls.__module__}.{cls.__qualname__}",
+                "code": code_fingerprint(),
+                "dimensions": self.settings.PLATFORM_DIMENSIONS,
+                "format": self.settings.OUTPUT_FORMAT,
+                "quality": self.settings.OUTPUT_QUALITY,
+                "encoders": [
+                    self.settings.ENCODER_PROFILES,
+                    self.settings.PLATFORM_ENCODER_PROFILES,
+                ],
+            })
+        return self._versions[name]
+
+    def _config_digest(self, key: str) -> str:
+        # Thousands of outputs read the same few keys.
+        if key not in self._config_digests:
+            self._config_digests[key] = _digest(self.brand.lookup(key))
+        return self._config_digests[key]
+
+    def stale_reason(self, job: BatchJob) -> str | None:
+        """Why ``job`` must be rebuilt, or None if its outputs are current.
+
+        Cheap checks run first; files are stat'ed, and hashed only when
+        their mtime or size changed.
+        """
+        entry = self.manifest.outputs.get(job.id)
+        if entry is None:
+            return "new"
+        if entry["generator"] != self._generator_version(job.generator):
+            return "generator changed"
+        if entry["params"] != _digest(job.params):
+            return "parameters changed"
+        if entry["record"] != _digest(job.record):
+            return "data record changed"
+        for key, digest in entry["config"].items():
+            if self._config_digest(key) != digest:
+                return f"brand key '{key}' changed"
+        for path in entry["outputs"]:
+            if not os.path.exists(path):
+                return "output missing"
+        for path, digest in entry["files"].items():
+            if self.manifest.file_digest(path) != digest:
+                return f"{Path(path).name} changed"
+        return None
+
+    def plan(self, jobs: Iterable[BatchJob]) -> list[tuple[BatchJob, str]]:
+        """(job, reason) for every job that needs rebuilding."""
+        stale = []
+        for job in jobs:
+            reason = self.stale_reason(job)
+            if reason is not None:
+                stale.append((job, reason))
+        return stale
+
+    def _record(self, job: BatchJob, result: JobResult) -> None:
+        deps = result.dependencies
+        self.manifest.outputs[job.id] = {
+            "outputs": [str(path) for path in result.outputs],
+            "generator": self._generator_version(job.generator),
+            "params": _digest(job.params),
+            "record": _digest(job.record),
+            "config": {key: self._config_digest(key) for key in sorted(deps.config)},
+            "files": {path: self.manifest.file_digest(path) for path in sorted(deps.files)},
+        }
+
+    def build(
+        self, jobs: Iterable[BatchJob], force: bool = False
+    ) -> Iterator[tuple[JobResult, str]]:
+        """Render the stale jobs, yielding (result, reason) as each finishes.
+
+        The manifest is saved when the build ends, including when it is
+        interrupted, so finished outputs are not rebuilt next time.
+        """
+        pending: dict[str, tuple[BatchJob, str]] = {}
+
+        def stale_jobs():
+            # Planned lazily so a streamed manifest is never held in memory.
+            for job in jobs:
+                reason = "forced" if force else self.stale_reason(job)
+                if reason is not None:
+                    pending[job.id] = (job, reason)
+                    yield job
+
+        runner = BatchRunner(workers=self.workers, track_dependencies=True)
+        try:
+            for result in runner.run(stale_jobs()):
+                job, reason = pending.pop(result.job_id)
+                if result.ok:
+                    self._record(job, result)
+                else:
+                    self.manifest.outputs.pop(job.id, None)
+                yield result, reason
+        finally:
+            self.manifest.save()
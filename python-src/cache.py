@@ -0,0 +1,202 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+
+from config import Settings
+
+# Bump to invalidate every cached render after a change the code
+# fingerprint cannot see (e.g. a Pillow upgrade that changes encoder output).
+CACHE_VERSION = 1
+
+ENTRY_FILE = "entry.json"
+
+
+# Root of the package: every module in it can change what a render produces
+# (generators, src.render, src.utils, exporters...).
+PACKAGE_DIR = Path(__file__).parent
+
+
+def _source_files() -> list[Path]:
+    return sorted(PACKAGE_DIR.rglob("*.py"))
+
+
+@lru_cache(maxsize=None)
+def code_fingerprint() -> str:
+    """Hash the source of every module in the package."""
+    digest = hashlib.sha256()
+    for path in _source_files():
+        digest.update(path.relative_to(PACKAGE_DIR).as_posix().encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def _materialize(source: Path, target: Path) -> None:
+    """Place a cached file at target, hardlinking when possible."""
+    target.parent.mkdir(parents=True, exist_ok=True)
+    if target.exists():
+        target.unlink()
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copy2(source, target)
+
+
+class RenderCache:
+    """Content-addressed cache of finished generator outputs.
+
+    Each render is keyed by a hash of the generator class and code, its
+    parameters, the brand configuration, platform dimensions and output
+    format/quality. Entries live in ``<cache_dir>/renders/<key>/`` and are
+    evicted least-recently-used first once the cache exceeds ``max_bytes``.
+    """
+
+    def __init__(
+        self,
+        settings: Settings,
+        cache_dir: str | Path | None = None,
+        max_bytes: int | None = None,
+    ):
+        self.settings = settings
+        self.root = Path(cache_dir or settings.CACHE_DIR) / "renders"
+        self.max_bytes = (
+            max_bytes if max_bytes is not None else settings.RENDER_CACHE_MAX_BYTES
+        )
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, generator, params: dict) -> str:
+        """Compute the cache key for rendering ``params`` with ``generator``."""
+        cls = type(generator)
+        output_path = params.get("output_path")
+        material = {
+            "version": CACHE_VERSION,
+            "generator": f"{cls.__module__}.{cls.__qualname__}",
+            "code": code_fingerprint(),
+            "params": {k: v for k, v in params.items() if k != "output_path"},
+            # Default output locations are part of what a hit must restore,
+            # and an explicit path's suffix picks the format encoded.
+            "default_output": output_path is None,
+            "suffix": Path(output_path).suffix.lower() if output_path else None,
+            "brand": generator.brand.content_hash,
+            "dimensions": self.settings.PLATFORM_DIMENSIONS,
+            "format": self.settings.OUTPUT_FORMAT,
+            "quality": self.settings.OUTPUT_QUALITY,
+            "encoders": [
+                self.settings.ENCODER_PROFILES,
+                self.settings.PLATFORM_ENCODER_PROFILES,
+            ],
+        }
+        canonical = json.dumps(material, sort_keys=True, default=str)
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+    def _entry_dir(self, key: str) -> Path:
+        return self.root / key
+
+    def render(self, generator, **params) -> Path | list[Path]:
+        """Return the generator's output for ``params``, rendering only on a miss."""
+        key = self.key(generator, params)
+        entry = self._entry_dir(key)
+        output_path = params.get("output_path")
+
+        try:
+            with open(entry / ENTRY_FILE, "r") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            meta = None
+
+        if meta is not None:
+            targets = self._targets(meta, output_path)
+            for name, target in zip(meta["files"], targets):
+                _materialize(entry / name, target)
+            os.utime(entry / ENTRY_FILE)
+            self.hits += 1
+            return targets if meta["list"] else targets[0]
+
+        self.misses += 1
+        result = generator.generate(**params)
+        self._store(key, result, output_path)
+        return result
+
+    def _targets(self, meta: dict, output_path: str | None) -> list[Path]:
+        if output_path is None:
+            return [self.settings.OUTPUT_DIR / rel for rel in meta["defaults"]]
+        if meta["list"]:
+            return [Path(output_path) / name for name in meta["files"]]
+        return [Path(output_path)]
+
+    def _store(self, key: str, result, output_path: str | None) -> None:
+        outputs = result if isinstance(result, list) else [result]
+        meta = {
+            "files": [p.name for p in outputs],
+            "list": isinstance(result, list),
+            "defaults": None,
+        }
+        if output_path is None:
+            meta["defaults"] = [
+                os.path.relpath(p, self.settings.OUTPUT_DIR) for p in outputs
+            ]
+
+        # Build the entry in a temp dir and rename it into place, so
+        # concurrent workers storing the same key never see a partial entry.
+        self.root.mkdir(parents=True, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(dir=self.root, prefix=".staging-"))
+        try:
+            for path in outputs:
+                _materialize(Path(path), staging / path.name)
+            with open(staging / ENTRY_FILE, "w") as f:
+                json.dump(meta, f)
+            os.rename(staging, self._entry_dir(key))
+        except OSError:
+            shutil.rmtree(staging, ignore_errors=True)
+            return
+
+        if self.max_bytes:
+            self.prune(self.max_bytes)
+
+    def _entries(self) -> list[tuple[float, int, Path]]:
+        """List (last used, size in bytes, path) for every cache entry."""
+        if not self.root.is_dir():
+            return []
+        entries = []
+        for entry in self.root.iterdir():
+            marker = entry / ENTRY_FILE
+            if entry.name.startswith(".") or not marker.exists():
+                continue
+            size = sum(f.stat().st_size for f in entry.iterdir())
+            entries.append((marker.stat().st_mtime, size, entry))
+        return entries
+
+    def stats(self) -> dict:
+        """Return entry count, total size and this instance's hit/miss counters."""
+        entries = self._entries()
+        return {
+            "directory": str(self.root),
+            "entries": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def prune(self, max_bytes: int | None = None) -> tuple[int, int]:
+        """Evict least-recently-used entries until the cache fits in max_bytes.
+
+        Returns:
+            (entries removed, bytes freed). ``max_bytes=0`` clears the cache.
+        """
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        removed = freed = 0
+        for _, size, entry in entries:
+            if total <= limit:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+            removed += 1
+            freed += size
+        return removed, freed
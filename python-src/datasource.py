@@ -0,0 +1,325 @@
+import codecs
+import csv
+import itertools
+import json
+import re
+import string
+from collections.abc import Mapping
+from pathlib import Path
+from typing import IO, Iterator
+
+from src.batch import BatchJob
+
+# Characters read per refill when streaming JSON.
+CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = " \t\r\n"
+# Characters a JSON number can contain.
+_NUMBER = frozenset("0123456789+-.eE")
+# Characters that matter when skipping over a nested JSON value.
+_STRUCTURAL = re.compile(r'["\\{}\[\]]')
+
+
+class _JsonArrayStream:
+    """Yield the elements of an array inside a JSON document one at a time.
+
+    Only the current element and one chunk of input are held in memory.
+    ``f`` is a binary file of UTF-8 JSON.
+    Values on the way to the array (e.g. a large ``company`` object next to
+    ``courses``) are skipped without being decoded.
+    """
+
+    def __init__(self, f: IO[bytes], chunk_size: int = CHUNK_SIZE):
+        self._f = f
+        self._chunk_size = chunk_size
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+        self._decoder = json.JSONDecoder()
+        # Decoding here rather than through a text file avoids the copies of
+        # the last chunk a TextIOWrapper keeps.
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+
+    def _fill(self) -> bool:
+        if self._eof:
+            return False
+        while True:
+            data = self._f.read(self._chunk_size)
+            chunk = self._utf8.decode(data, final=not data)
+            if chunk or not data:
+                break
+            # Only part of a multi-byte character was read.
+        if not chunk:
+            self._eof = True
+            return False
+        self._buf = self._buf[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def _peek(self) -> str:
+        """The next non-whitespace character, or '' at the end of input."""
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                return ""
+
+    def _expect(self, char: str) -> None:
+        found = self._peek()
+        if found != char:
+            raise ValueError(f"Expected '{char}' in JSON, found {found or 'end of input'!r}")
+        self._pos += 1
+
+    def _buffer_number(self) -> None:
+        """Read input until the number at the current position is complete.
+
+        A number cut by a chunk boundary (``1`` | ``.5e3``) is itself valid
+        JSON, so it must be whole before it is decoded.
+        """
+        length = 0
+        while True:
+            end = self._pos + length
+            while end < len(self._buf) and self._buf[end] in _NUMBER:
+                end += 1
+            length = end - self._pos
+            if end < len(self._buf) or not self._fill():
+                return
+
+    def _decode(self):
+        """Decode the next value, reading more input until it is complete."""
+        if self._peek() in _NUMBER:
+            self._buffer_number()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            self._pos = end
+            return value
+
+    def _skip(self) -> None:
+        """Move past the next value without decoding containers."""
+        if self._peek() not in "{[":
+            self._decode()
+            return
+        depth = 0
+        in_string = False
+        while True:
+            match = _STRUCTURAL.search(self._buf, self._pos)
+            if match is None:
+                self._pos = len(self._buf)
+                if not self._fill():
+                    raise ValueError("Unexpected end of JSON input")
+                continue
+            char = match.group()
+            self._pos = match.end()
+            if char == "\\":
+                # Skip the escaped character, which may be in the next chunk.
+                if self._pos == len(self._buf) and not self._fill():
+                    raise ValueError("Unexpected end of JSON input")
+                self._pos += 1
+            elif char == '"':
+                in_string = not in_string
+            elif in_string:
+                continue
+            elif char in "{[":
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 0:
+                    return
+
+    def _enter(self, key: str) -> None:
+        """Move to the value of ``key`` in the object at the current position."""
+        self._expect("{")
+        while self._peek() != "}":
+            name = self._decode()
+            self._expect(":")
+            if name == key:
+                return
+            self._skip()
+            if self._peek() == ",":
+                self._pos += 1
+        raise ValueError(f"JSON object has no key '{key}'")
+
+    def items(self, path: list[str]) -> Iterator:
+        for key in path:
+            self._enter(key)
+        self._expect("[")
+        if self._peek() == "]":
+            return
+        while True:
+            yield self._decode()
+            separator = self._peek()
+            self._pos += 1
+            if separator == "]":
+                return
+            if separator != ",":
+                raise ValueError(f"Expected ',' or ']' in JSON array, found {separator!r}")
+
+
+def _lookup(record, field: str):
+    """Value at a dotted field (``price.INR``, ``tools.0``) of a record."""
+    value = record
+    for part in field.split("."):
+        if isinstance(value, Mapping):
+            value = value[part]
+        elif isinstance(value, list) and part.isdigit():
+            value = value[int(part)]
+        else:
+            raise KeyError(field)
+    return value
+
+
+def iter_records(
+    path: str | Path,
+    records: str | None = None,
+    format: str | None = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> Iterator[dict]:
+    """Stream records from a JSON, JSON Lines or CSV file.
+
+    Args:
+        path: The data file.
+        records: JSON only: dotted path to the array of records, e.g.
+                 'courses' in data/courses.json. Omit for a top-level array.
+        format: 'json', 'jsonl' or 'csv'. Defaults to the file suffix
+                (.ndjson is JSON Lines).
+        chunk_size: Bytes read at a time from JSON files.
+
+    Records are parsed one at a time, so memory use does not grow with the
+    file. CSV rows are dicts of strings keyed by the header row.
+    """
+    path = Path(path)
+    format = format or path.suffix.lstrip(".").lower()
+    if format == "ndjson":
+        format = "jsonl"
+    if format not in ("json", "jsonl", "csv"):
+        raise ValueError(f"Unsupported data format '{format}'. Use json, jsonl or csv.")
+
+    if format == "json":
+        with open(path, "rb") as f:
+            stream = _JsonArrayStream(f, chunk_size)
+            yield from stream.items(records.split(".") if records else [])
+        return
+
+    with open(path, "r", encoding="utf-8", newline="" if format == "csv" else None) as f:
+        if format == "csv":
+            yield from csv.DictReader(f)
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+class _RecordFormatter(string.Formatter):
+    """str.format over a record: dotted fields and !i / !f conversions."""
+
+    def get_field(self, field_name, args, kwargs):
+        return _lookup(kwargs, field_name), field_name
+
+    def convert_field(self, value, conversion):
+        if conversion == "i":
+            return int(value)
+        if conversion == "f":
+            return float(value)
+        return super().convert_field(value, conversion)
+
+
+_formatter = _RecordFormatter()
+
+
+def fill_template(template, record: Mapping):
+    """Fill ``{field}`` placeholders in a mapping value from a record.
+
+    Strings are formatted with the record; a string that is a single
+    placeholder (``"{price.INR}"``, ``"{slides!i}"``) keeps the value's
+    type. Dicts and lists are filled recursively; other values pass through.
+    """
+    if isinstance(template, str):
+        parts = list(_formatter.parse(template))
+        if len(parts) == 1 and not parts[0][0] and parts[0][1] and not parts[0][2]:
+            _, field, _, conversion = parts[0]
+            value = _lookup(record, field)
+            return _formatter.convert_field(value, conversion) if conversion else value
+        return _formatter.vformat(template, (), record)
+    if isinstance(template, Mapping):
+        return {key: fill_template(value, record) for key, value in template.items()}
+    if isinstance(template, list):
+        return [fill_template(value, record) for value in template]
+    return template
+
+
+def _matches(record: Mapping, where: Mapping) -> bool:
+    """Whether every ``where`` field equals (or, for lists, contains) its value.
+
+    A list of expected values matches any of them.
+    """
+    for field, expected in where.items():
+        try:
+            value = _lookup(record, field)
+        except (KeyError, IndexError):
+            return False
+        wanted = expected if isinstance(expected, list) else [expected]
+        found = value if isinstance(value, list) else [value]
+        if not any(item in wanted for item in found):
+            return False
+    return True
+
+
+def source_jobs(
+    spec: Mapping, base_dir: str | Path = ".", defaults: Mapping | None = None
+) -> Iterator[BatchJob]:
+    """Lazily map the records of a data source to batch jobs.
+
+    ``spec`` is a manifest ``sources`` entry::
+
+        path: data/courses.json     # .json, .jsonl/.ndjson or .csv
+        records: courses            # JSON path to the record array
+        where: {partOfBootcamp: da-bootcamp}   # optional, see _matches
+        limit: 100                  # optional
+        jobs:                       # one job per template per record
+          - generator: social
+            id: "ads/{id}/linkedin"
+            params:
+              text: "{name}"
+              platform: linkedin
+              output_path: "output/ads/{id}/linkedin.png"
+
+    Relative paths are resolved against the working directory, then
+    ``base_dir`` (the manifest's directory).
+    """
+    path = Path(spec["path"])
+    if not path.is_absolute() and not path.exists():
+        path = Path(base_dir) / path
+    templates = spec.get("jobs") or []
+    if not templates:
+        raise ValueError(f"Data source {spec['path']} has no job templates")
+    where = spec.get("where") or {}
+    defaults = defaults or {}
+
+    records = iter_records(path, spec.get("records"), spec.get("format"))
+    records = (record for record in records if _matches(record, where))
+    if spec.get("limit") is not None:
+        records = itertools.islice(records, spec["limit"])
+
+    for number, record in enumerate(records, 1):
+        for template in templates:
+            try:
+                params = fill_template(template.get("params", {}), record)
+                job_id = fill_template(template["id"], record) if "id" in template else None
+            except (KeyError, IndexError) as e:
+                raise ValueError(
+                    f"Record {number} of {path}: no field {e} for the "
+                    f"'{template['generator']}' job template"
+                ) from None
+            yield BatchJob(
+                generator=template["generator"],
+                params={**defaults, **params},
+                id=job_id,
+                record=record,
+            )
@@ -0,0 +1,158 @@
+import contextvars
+from collections.abc import Mapping
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Iterator
+
+
+@dataclass
+class Dependencies:
+    """Inputs a render read: dotted brand config keys and file paths."""
+
+    config: set[str] = field(default_factory=set)
+    files: set[str] = field(default_factory=set)
+
+
+# Dependencies of the render in progress, if they are being recorded.
+_current: contextvars.ContextVar[Dependencies | None] = contextvars.ContextVar(
+    "sigma_dependencies", default=None
+)
+
+
+@contextmanager
+def recording() -> Iterator[Dependencies]:
+    """Record the config keys and files read by renders inside the block."""
+    deps = Dependencies()
+    token = _current.set(deps)
+    try:
+        yield deps
+    finally:
+        _current.reset(token)
+
+
+def merge(deps: Dependencies) -> None:
+    """Add earlier recorded dependencies (of a cached result) to the current ones."""
+    current = _current.get()
+    if current is not None:
+        current.config |= deps.config
+        current.files |= deps.files
+
+
+def is_recording() -> bool:
+    return _current.get() is not None
+
+
+def record_file(path) -> None:
+    """Note that the render in progress read this file (a font, a cutout)."""
+    deps = _current.get()
+    if deps is not None:
+        deps.files.add(str(path))
+
+
+def record_config(key: str) -> None:
+    """Note that the render in progress read a brand config key."""
+    deps = _current.get()
+    if deps is not None:
+        deps.config.add(key)
+
+
+class _TrackedSection(Mapping):
+    """Read-only view of a brand config section that records keys read."""
+
+    def __init__(self, prefix: str, data: Mapping):
+        self._prefix = prefix
+        self._data = data
+
+    def __getitem__(self, key):
+        record_config(f"{self._prefix}.{key}")
+        value = self._data[key]
+        if isinstance(value, Mapping):
+            return _TrackedSection(f"{self._prefix}.{key}", value)
+        return value
+
+    def __iter__(self):
+        # Iterating depends on the whole section.
+        record_config(self._prefix)
+        return iter(self._data)
+
+    def __len__(self):
+        record_config(self._prefix)
+        return len(self._data)
+
+
+class _TrackedPalette:
+    """A Palette that records which colors are looked up."""
+
+    def __init__(self, palette):
+        self._palette = palette
+
+    def __getitem__(self, name):
+        record_config(f"colors.{name}")
+        return self._palette[name]
+
+    def __contains__(self, name):
+        record_config(f"colors.{name}")
+        return name in self._palette
+
+    def rgba(self, name, alpha=255):
+        record_config(f"colors.{name}")
+        return self._palette.rgba(name, alpha)
+
+    def tint(self, name, step):
+        record_config(f"colors.{name}")
+        return self._palette.tint(name, step)
+
+    def shade(self, name, step):
+        record_config(f"colors.{name}")
+        return self._palette.shade(name, step)
+
+    def __getattr__(self, attr):
+        # LUT helpers take names or raw colors; depend on every color.
+        record_config("colors")
+        return getattr(self._palette, attr)
+
+
+class TrackedBrand:
+    """A BrandConfig whose reads are recorded while ``recording()`` is active.
+
+    Generators built on a TrackedBrand report which brand keys each render
+    used (e.g. ``typography.heading_font``), so an edit to brand.yaml only
+    invalidates the outputs that read the changed keys.
+    """
+
+    def __init__(self, brand):
+        from src.utils.color import palette_for  # src.utils imports this module
+
+        self._brand = brand
+        self.palette = _TrackedPalette(palette_for(brand))
+
+    @property
+    def name(self) -> str:
+        record_config("brand.name")
+        return self._brand.name
+
+    @property
+    def tagline(self) -> str:
+        record_config("brand.tagline")
+        return self._brand.tagline
+
+    @property
+    def colors(self) -> Mapping:
+        return _TrackedSection("colors", self._brand.colors)
+
+    @property
+    def typography(self) -> Mapping:
+        return _TrackedSection("typography", self._brand.typography)
+
+    @property
+    def logo_paths(self) -> Mapping:
+        return _TrackedSection("logo", self._brand.logo_paths)
+
+    @property
+    def defaults(self) -> Mapping:
+        return _TrackedSection("defaults", self._brand.defaults)
+
+    @property
+    def content_hash(self) -> str:
+        return self._brand.content_hash
+
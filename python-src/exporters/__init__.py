@@ -1,3 +1,7 @@
+from src.exporters.animation import global_palette, write_animation
 from src.exporters.export import Exporter
+from src.exporters.pdf import PdfWriter, write_pdf
+from src.exporters.sinks import DirectorySink, MemorySink, Sink, TarSink, ZipSink
 
-__all__ = ["Exporter"]
+__all__ = ["Exporter", "Sink", "DirectorySink", "MemorySink", "ZipSink", "TarSink",
+           "PdfWriter", "write_pdf", "global_palette", "write_animation"]
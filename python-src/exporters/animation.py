@@ -0,0 +1,352 @@
+import io
+import struct
+import zlib
+from collections import Counter
+from pathlib import Path
+from typing import BinaryIO, Iterable
+
+from PIL import GifImagePlugin, Image, ImageChops
+
+from src.profiling import span
+from src.render.animation import Animation, AnimationFrame
+from src.utils.encode import LOSSLESS_MAX_COLORS
+from src.utils.image import atomic_write
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# Pixels in the weighted color sample a median-cut palette is built from.
+_PALETTE_SAMPLE = 1 << 16
+
+
+def global_palette(frames: Iterable[AnimationFrame]) -> tuple[Image.Image, int | None]:
+    """One palette shared by every frame of an animation.
+
+    Returns a "P" image carrying the palette and the number of distinct
+    colors in the frames, or None if there are more than
+    LOSSLESS_MAX_COLORS. With at most 256 colors the palette holds them
+    all; otherwise it is a median cut weighted by how many pixels use each
+    color, visually lossless for flat graphics and an approximation for
+    photos and gradients (whose frames add their own 256-color cut).
+    """
+    counts = Counter()
+    exceeded = False
+    for frame in frames:
+        colors = frame.image.getcolors(LOSSLESS_MAX_COLORS)
+        if colors is None:
+            exceeded = True
+            quantized = frame.image.quantize(256, method=Image.Quantize.FASTOCTREE)
+            colors = quantized.convert("RGB").getcolors(256)
+        counts.update({rgb: count for count, rgb in colors})
+    exceeded = exceeded or len(counts) > LOSSLESS_MAX_COLORS
+
+    palette = Image.new("P", (1, 1))
+    if len(counts) <= 256:
+        palette.putpalette(bytes(c for rgb in counts for c in rgb))
+    else:
+        total = sum(counts.values())
+        sample = b"".join(
+            bytes(rgb) * max(1, count * _PALETTE_SAMPLE // total)
+            for rgb, count in counts.items()
+        )
+        image = Image.frombytes("RGB", (len(sample) // 3, 1), sample)
+        palette = image.quantize(256, method=Image.Quantize.MEDIANCUT)
+    return palette, None if exceeded else len(counts)
+
+
+class _Palettizer:
+    """Map frames onto a global palette, exactly when it holds their colors."""
+
+    def __init__(self, palette: Image.Image):
+        self.palette = palette
+        entries = palette.getpalette("RGB")
+        self._index = {}
+        for i in range(len(entries) // 3):
+            self._index.setdefault(tuple(entries[3 * i : 3 * i + 3]), i)
+
+    def __call__(self, image: Image.Image) -> Image.Image:
+        colors = image.getcolors(256)
+        if colors is not None and all(rgb in self._index for _, rgb in colors):
+            # Max-coverage quantizing keeps every color (see compact_image);
+            # its local palette is then renumbered into the global one.
+            local = image.quantize(
+                len(colors), method=Image.Quantize.MAXCOVERAGE, dither=Image.Dither.NONE
+            )
+            entries = local.getpalette("RGB")
+            lut = [
+                self._index.get(tuple(entries[3 * i : 3 * i + 3]), 0)
+                for i in range(len(entries) // 3)
+            ]
+            indices = Image.frombytes("L", local.size, local.tobytes())
+            indices = indices.point(lut + [0] * (256 - len(lut)))
+            result = Image.frombytes("P", image.size, indices.tobytes())
+            result.putpalette(self.palette.getpalette("RGB"))
+            if ImageChops.difference(result.convert("RGB"), image).getbbox() is None:
+                return result
+        return image.quantize(palette=self.palette, dither=Image.Dither.NONE)
+
+
+class GifWriter:
+    """Write an animated GIF frame by frame, with one global color table.
+
+    Every frame is mapped onto ``palette`` (see ``global_palette``) and
+    stored as its changed rectangle over the previous frame. GIF delays are
+    in hundredths of a second, and browsers slow down shorter ones, so
+    each frame shows for at least 20 ms.
+    """
+
+    def __init__(
+        self, file: BinaryIO, size: tuple[int, int], palette: Image.Image, loop: int = 0
+    ):
+        self.file = file
+        self.size = tuple(size)
+        self.frames = 0
+        self._palettize = _Palettizer(palette)
+        self._elapsed = 0
+        self._shown = 0
+        table = bytes(palette.getpalette("RGB")).ljust(768, b"\0")[:768]
+        width, height = self.size
+        # Global color table of 256 entries, 8 bits per primary color.
+        file.write(b"GIF89a" + struct.pack("<HHBBB", width, height, 0xF7, 0, 0))
+        file.write(table)
+        file.write(b"!\xff\x0bNETSCAPE2.0\x03\x01" + struct.pack("<H", loop) + b"\0")
+
+    def write(self, frame: AnimationFrame) -> None:
+        """Append the next frame."""
+        image = self._palettize(frame.image)
+        self._elapsed += frame.duration
+        delay = max(2, round(self._elapsed / 10) - self._shown)
+        self._shown += delay
+        with span("encode", format="gif", pixels=image.width * image.height):
+            data = GifImagePlugin.getdata(
+                image, offset=frame.box[:2], duration=delay * 10, disposal=1
+            )
+        self.file.write(b"".join(data))
+        self.frames += 1
+
+    def close(self) -> None:
+        """Finish the file."""
+        if not self.frames:
+            raise ValueError("An animation needs at least one frame")
+        self.file.write(b";")
+
+
+class ApngWriter:
+    """Write an animated PNG frame by frame.
+
+    With a ``palette`` every frame is 8-bit indexed, otherwise RGB. Each
+    frame stores only its changed rectangle, which replaces the pixels
+    below it. The frame count is patched into the header at the end, so
+    the file must be seekable.
+    """
+
+    def __init__(
+        self,
+        file: BinaryIO,
+        size: tuple[int, int],
+        palette: Image.Image | None = None,
+        loop: int = 0,
+        compress_level: int = 6,
+    ):
+        self.file = file
+        self.size = tuple(size)
+        self.frames = 0
+        self.compress_level = compress_level
+        self._palettize = _Palettizer(palette) if palette is not None else None
+        self._sequence = 0
+        self._start = file.tell()
+        width, height = self.size
+        color_type = 3 if palette is not None else 2
+        file.write(_PNG_SIGNATURE)
+        self._chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, color_type, 0, 0, 0))
+        self._actl = file.tell()
+        self._chunk(b"acTL", struct.pack(">II", 0, loop))
+        self._loop = loop
+        if palette is not None:
+            self._chunk(b"PLTE", bytes(palette.getpalette("RGB")))
+
+    def _chunk(self, kind: bytes, data: bytes) -> None:
+        self.file.write(struct.pack(">I", len(data)) + kind + data)
+        self.file.write(struct.pack(">I", zlib.crc32(data, zlib.crc32(kind))))
+
+    def _next_sequence(self) -> bytes:
+        number = struct.pack(">I", self._sequence)
+        self._sequence += 1
+        return number
+
+    def write(self, frame: AnimationFrame) -> None:
+        """Append the next frame; the first one must cover the canvas."""
+        left, top, right, bottom = frame.box
+        if not self.frames and frame.box != (0, 0, *self.size):
+            raise ValueError("The first APNG frame must cover the whole canvas")
+        image = self._palettize(frame.image) if self._palettize else frame.image
+        with span("encode", format="apng", pixels=image.width * image.height):
+            buffer = io.BytesIO()
+            image.save(buffer, "PNG", bits=8, compress_level=self.compress_level)
+        # Delay in ms (over 1000); no disposal, and the rectangle replaces
+        # the pixels below it.
+        control = struct.pack(
+            ">IIIIHHBB", right - left, bottom - top, left, top, frame.duration, 1000, 0, 0
+        )
+        self._chunk(b"fcTL", self._next_sequence() + control)
+        for kind, data in _png_chunks(buffer.getvalue()):
+            if kind != b"IDAT":
+                continue
+            if self.frames:
+                self._chunk(b"fdAT", self._next_sequence() + data)
+            else:
+                self._chunk(b"IDAT", data)
+        self.frames += 1
+
+    def close(self) -> None:
+        """Finish the file and record its frame count."""
+        if not self.frames:
+            raise ValueError("An animation needs at least one frame")
+        self._chunk(b"IEND", b"")
+        end = self.file.tell()
+        self.file.seek(self._actl)
+        self._chunk(b"acTL", struct.pack(">II", self.frames, self._loop))
+        self.file.seek(end)
+
+
+def _png_chunks(data: bytes) -> Iterable[tuple[bytes, bytes]]:
+    offset = len(_PNG_SIGNATURE)
+    while offset < len(data):
+        (length,) = struct.unpack(">I", data[offset : offset + 4])
+        yield data[offset + 4 : offset + 8], data[offset + 8 : offset + 8 + length]
+        offset += 12 + length
+
+
+def _riff_chunks(data: bytes) -> Iterable[tuple[bytes, bytes]]:
+    """(fourcc, chunk bytes including its header) of a WebP file."""
+    offset = 12
+    while offset < len(data):
+        kind = data[offset : offset + 4]
+        (length,) = struct.unpack("<I", data[offset + 4 : offset + 8])
+        end = offset + 8 + length + length % 2
+        yield kind, data[offset:end]
+        offset = end
+
+
+class WebpWriter:
+    """Write an animated WebP frame by frame.
+
+    Each frame is its changed rectangle, encoded with libwebp through Pillow
+    and stored without blending over the previous frame. With a
+    ``palette`` frames are mapped onto it and stored losslessly (libwebp
+    turns a small color set into an indexed encoding); otherwise they are
+    stored as RGB, losslessly with ``lossless`` or else lossy at
+    ``quality``. The RIFF size is patched at the end, so the file must be
+    seekable.
+    """
+
+    def __init__(
+        self,
+        file: BinaryIO,
+        size: tuple[int, int],
+        palette: Image.Image | None = None,
+        loop: int = 0,
+        quality: int = 90,
+        method: int = 4,
+        lossless: bool = False,
+    ):
+        self.file = file
+        self.size = tuple(size)
+        self.frames = 0
+        self.quality = quality
+        self.method = method
+        self.lossless = lossless
+        self._palettize = _Palettizer(palette) if palette is not None else None
+        self._start = file.tell()
+        width, height = self.size
+        file.write(b"RIFF\0\0\0\0WEBP")
+        # VP8X with the animation flag, then the canvas size minus one.
+        vp8x = struct.pack("<I", 0x02) + (width - 1).to_bytes(3, "little")
+        file.write(b"VP8X" + struct.pack("<I", 10) + vp8x + (height - 1).to_bytes(3, "little"))
+        file.write(b"ANIM" + struct.pack("<I", 6) + b"\0\0\0\0" + struct.pack("<H", loop))
+
+    def write(self, frame: AnimationFrame) -> None:
+        """Append the next frame; boxes must start at even coordinates."""
+        left, top, right, bottom = frame.box
+        if left % 2 or top % 2:
+            raise ValueError("WebP frames must start at even coordinates")
+        if self._palettize:
+            image = self._palettize(frame.image).convert("RGB")
+            options = {"lossless": True}
+        else:
+            image = frame.image
+            options = {"lossless": True} if self.lossless else {"quality": self.quality}
+        with span("encode", format="webp", pixels=image.width * image.height):
+            buffer = io.BytesIO()
+            image.save(buffer, "WEBP", method=self.method, **options)
+        bitstream = b"".join(
+            chunk
+            for kind, chunk in _riff_chunks(buffer.getvalue())
+            if kind in (b"ALPH", b"VP8 ", b"VP8L")
+        )
+        header = b"".join(
+            value.to_bytes(3, "little")
+            for value in (left // 2, top // 2, right - left - 1, bottom - top - 1, frame.duration)
+        )
+        # Flags: do not blend with, or dispose of, the previous frame.
+        payload = header + b"\x02" + bitstream
+        self.file.write(b"ANMF" + struct.pack("<I", len(payload)) + payload)
+        self.frames += 1
+
+    def close(self) -> None:
+        """Finish the file by recording its size."""
+        if not self.frames:
+            raise ValueError("An animation needs at least one frame")
+        end = self.file.tell()
+        self.file.seek(self._start + 4)
+        self.file.write(struct.pack("<I", end - self._start - 8))
+        self.file.seek(end)
+
+
+ANIMATION_WRITERS = {
+    "gif": GifWriter,
+    "png": ApngWriter,
+    "apng": ApngWriter,
+    "webp": WebpWriter,
+}
+
+
+def write_animation(path: str | Path, animation: Animation, **options) -> Path:
+    """Encode an Animation to an animated GIF, PNG (APNG) or WebP file.
+
+    The frames are rendered twice: once to build a global palette from the
+    colors of every frame (see ``global_palette``), then to encode them.
+    Only one frame is held at a time. GIF always uses the palette, which
+    approximates animations with more than 256 colors. APNG and WebP use
+    it only when it holds every color; otherwise APNG frames are RGB and
+    WebP frames are lossless RGB, or lossy above LOSSLESS_MAX_COLORS.
+
+    Args:
+        path: Output file; its suffix (.gif, .png, .apng or .webp) picks
+              the format. Written via a temp file and an atomic rename.
+        animation: The animation to encode.
+        **options: Passed to the writer (loop, quality, compress_level...).
+    """
+    path = Path(path)
+    ext = path.suffix.lower().lstrip(".")
+    try:
+        writer_class = ANIMATION_WRITERS[ext]
+    except KeyError:
+        raise ValueError(
+            f"Cannot animate '{ext}' images. Available: {sorted(ANIMATION_WRITERS)}"
+        ) from None
+
+    palette, colors = global_palette(animation.frames())
+    if writer_class is not GifWriter and (colors is None or colors > 256):
+        # Past 256 colors the palette is a lossy median cut.
+        palette = None
+        if writer_class is WebpWriter:
+            options.setdefault("lossless", colors is not None)
+
+    def write(tmp):
+        with open(tmp, "wb") as f:
+            writer = writer_class(f, animation.size, palette, **options)
+            for frame in animation.frames():
+                writer.write(frame)
+            writer.close()
+
+    return atomic_write(path, write)
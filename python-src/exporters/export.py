@@ -1,22 +1,111 @@
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Callable
 
 from PIL import Image
 
 from config import Settings
+from src.exporters.sinks import DirectorySink, Sink
+from src.profiling import Tracer, span, traced
+from src.utils.encode import EncodeStats, encode_optimized, encoder_profile
+
+# Formats that cannot store an alpha channel; RGBA/LA/P images are converted
+# to RGB once per image and the converted copy is shared between them.
+OPAQUE_FORMATS = ("jpg", "pdf")
 
 
 class Exporter:
     """Export generated assets to various formats and locations."""
 
-    def __init__(self, settings: Settings):
+    def __init__(
+        self,
+        settings: Settings,
+        output_dir: str | Path | None = None,
+        max_workers: int | None = None,
+        sink: Sink | None = None,
+    ):
+        """Create an exporter.
+
+        Args:
+            settings: Application settings.
+            output_dir: Directory to export into. Defaults to OUTPUT_DIR.
+                        Ignored when a sink is given.
+            max_workers: Encoder threads. Defaults to EXPORT_WORKERS, or
+                         Python's default pool size when that is 0.
+            sink: Where files go (see src.exporters.sinks): a directory,
+                  memory, or a zip/tar archive. Defaults to a DirectorySink
+                  on output_dir.
+        """
         self.settings = settings
+        self.output_dir = Path(output_dir) if output_dir else settings.OUTPUT_DIR
+        self.max_workers = max_workers or settings.EXPORT_WORKERS or None
+        self.sink = sink or DirectorySink(self.output_dir)
+        # Called (from encoder threads) with the EncodeStats of each file.
+        # When set, stats include the size of a plain quality-only encode.
+        self.on_encode: Callable[[EncodeStats], None] | None = None
+        # When set, exports are traced into it (src.profiling).
+        self.tracer: Tracer | None = None
+
+    def _check_formats(self, formats: list[str]) -> None:
+        for fmt in formats:
+            if fmt not in self.settings.SUPPORTED_FORMATS:
+                raise ValueError(
+                    f"Unsupported format '{fmt}'. "
+                    f"Supported: {self.settings.SUPPORTED_FORMATS}"
+                )
+
+    def _encode(self, image: Image.Image, filename: str, fmt: str, platform: str | None):
+        baseline = None
+        if self.on_encode is not None:
+            baseline = {"quality": self.settings.OUTPUT_QUALITY}
+        with span("encode", format=fmt, pixels=image.width * image.height) as info:
+            data, stats = encode_optimized(
+                image, fmt, encoder_profile(self.settings, fmt, platform), baseline
+            )
+            if info is not None:
+                info["bytes"] = len(data)
+        if self.on_encode is not None:
+            self.on_encode(stats)
+        with span("write", bytes=len(data)):
+            return self.sink.put(filename, data)
+
+    def _tasks(
+        self, image: Image.Image, name: str, formats: list[str], platform: str | None
+    ) -> list[tuple[Image.Image, str, str, str | None]]:
+        opaque = None
+        tasks = []
+        for fmt in formats:
+            source = image
+            if fmt in OPAQUE_FORMATS and image.mode not in ("RGB", "L", "CMYK"):
+                if opaque is None:
+                    opaque = image.convert("RGB")
+                source = opaque
+            tasks.append((source, f"{name}.{fmt}", fmt, platform))
+        return tasks
 
+    def _run(self, tasks: list[tuple[Image.Image, str, str, str | None]]) -> list:
+        # Pillow releases the GIL while encoding, so threads encode in parallel.
+        # Results are collected in submission order.
+        if len(tasks) <= 1 or self.max_workers == 1:
+            return [self._encode(*task) for task in tasks]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            # Each task runs in a copy of the caller's context, so spans
+            # recorded on encoder threads reach the active tracer.
+            futures = [
+                pool.submit(contextvars.copy_context().run, self._encode, *task)
+                for task in tasks
+            ]
+            return [future.result() for future in futures]
+
+    @traced("export")
     def export(
         self,
         image: Image.Image,
         name: str,
         formats: list[str] | None = None,
-    ) -> list[Path]:
+        platform: str | None = None,
+    ) -> list:
         """Export an image to one or more formats.
 
         Args:
@@ -24,41 +113,39 @@ class Exporter:
             name: Base filename (without extension).
             formats: List of format strings (e.g. ['png', 'jpg', 'webp']).
                      Defaults to the configured output format.
+            platform: PLATFORM_DIMENSIONS key (e.g. 'youtube_thumbnail')
+                      whose encoder profile overrides apply.
+
+        Returns:
+            One entry per format from the sink: paths for a directory,
+            memoryviews for memory, member names for archives.
         """
         if formats is None:
             formats = [self.settings.OUTPUT_FORMAT]
+        self._check_formats(formats)
+        return self._run(self._tasks(image, name, formats, platform))
 
-        saved = []
-        for fmt in formats:
-            if fmt not in self.settings.SUPPORTED_FORMATS:
-                raise ValueError(
-                    f"Unsupported format '{fmt}'. "
-                    f"Supported: {self.settings.SUPPORTED_FORMATS}"
-                )
-            output_path = self.settings.OUTPUT_DIR / f"{name}.{fmt}"
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-
-            save_kwargs = {"quality": self.settings.OUTPUT_QUALITY}
-            if fmt == "png":
-                save_kwargs.pop("quality")
-
-            image.save(str(output_path), **save_kwargs)
-            saved.append(output_path)
-
-        return saved
-
+    @traced("export_batch")
     def export_batch(
         self,
         images: list[tuple[Image.Image, str]],
         formats: list[str] | None = None,
-    ) -> list[Path]:
+        platform: str | None = None,
+    ) -> list:
         """Export multiple images.
 
+        All (image, format) pairs are encoded on one thread pool; results are
+        returned image by image, in the order formats were requested.
+
         Args:
             images: List of (image, name) tuples.
             formats: Export formats to use.
+            platform: PLATFORM_DIMENSIONS key for encoder profile overrides.
         """
-        all_saved = []
+        if formats is None:
+            formats = [self.settings.OUTPUT_FORMAT]
+        self._check_formats(formats)
+        tasks = []
         for image, name in images:
-            all_saved.extend(self.export(image, name, formats))
-        return all_saved
+            tasks.extend(self._tasks(image, name, formats, platform))
+        return self._run(tasks)
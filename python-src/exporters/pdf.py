@@ -0,0 +1,176 @@
+import hashlib
+import io
+import zlib
+from pathlib import Path
+from typing import BinaryIO, Iterable
+
+from PIL import Image
+
+from src.profiling import span
+from src.utils.encode import LOSSLESS_MAX_COLORS
+from src.utils.image import atomic_write, compact_image
+
+# Boxes are (left, top, right, bottom) in pixels, top-left origin.
+Box = tuple[int, int, int, int]
+
+# A page: its (width, height) and the images drawn on it, in order.
+Page = tuple[tuple[int, int], list[tuple[Image.Image, Box]]]
+
+# Page object tree root; object 1 is the catalog.
+_PAGES = 2
+
+
+class PdfWriter:
+    """Write a multi-page PDF of raster images page by page.
+
+    Objects go to the file as soon as they are added; only their offsets
+    are kept, so memory does not grow with the number of pages. Images
+    are embedded once per distinct content and can be drawn on any number
+    of pages: a slide background shared by a whole deck is stored once,
+    and each page adds only the regions that differ. One pixel is one
+    point (1/72 inch).
+
+    Each image is compressed on its own: Flate for flat graphics (8-bit
+    indexed or gray when the colors convert exactly), JPEG for images with
+    more than LOSSLESS_MAX_COLORS colors (photos, gradients).
+    """
+
+    def __init__(self, file: BinaryIO, quality: int = 95, compress_level: int = 6):
+        self.file = file
+        self.quality = quality
+        self.compress_level = compress_level
+        self.pages = 0
+        # Image content hash -> (object number, "FlateDecode" or "DCTDecode").
+        self.images: dict[str, tuple[int, str]] = {}
+        self._offsets: dict[int, int] = {}
+        self._next = _PAGES + 1
+        self._kids: list[int] = []
+        self._start = file.tell()
+        file.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    def _reserve(self) -> int:
+        number = self._next
+        self._next += 1
+        return number
+
+    def _write_object(self, number: int, body: bytes, stream: bytes | None = None) -> None:
+        self._offsets[number] = self.file.tell() - self._start
+        self.file.write(b"%d 0 obj\n" % number)
+        self.file.write(body)
+        if stream is not None:
+            self.file.write(b"\nstream\n")
+            self.file.write(stream)
+            self.file.write(b"\nendstream")
+        self.file.write(b"\nendobj\n")
+
+    def _encode(self, image: Image.Image) -> tuple[str, bytes, bytes]:
+        """(filter, color space, stream data) for an image XObject."""
+        if image.mode not in ("RGB", "L", "P"):
+            image = image.convert("RGB")
+        if image.mode == "RGB":
+            image = compact_image(image)
+        if image.mode == "RGB" and image.getcolors(LOSSLESS_MAX_COLORS) is None:
+            buffer = io.BytesIO()
+            image.save(buffer, "JPEG", quality=self.quality)
+            return "DCTDecode", b"/DeviceRGB", buffer.getvalue()
+
+        if image.mode == "P":
+            palette = bytes(image.getpalette("RGB")[: 3 * 256])
+            space = b"[/Indexed /DeviceRGB %d <%s>]" % (
+                len(palette) // 3 - 1,
+                palette.hex().encode(),
+            )
+        elif image.mode == "L":
+            space = b"/DeviceGray"
+        else:
+            space = b"/DeviceRGB"
+        return "FlateDecode", space, zlib.compress(image.tobytes(), self.compress_level)
+
+    def add_image(self, image: Image.Image) -> str:
+        """Embed an image unless identical content was embedded before.
+
+        Returns a key for ``add_page``.
+        """
+        digest = hashlib.sha1(image.tobytes())
+        digest.update(repr((image.mode, image.size)).encode())
+        key = digest.hexdigest()
+        if key not in self.images:
+            with span("encode", format="pdf", pixels=image.width * image.height):
+                filter_name, space, data = self._encode(image)
+            number = self._reserve()
+            body = (
+                b"<< /Type /XObject /Subtype /Image /Width %d /Height %d "
+                b"/ColorSpace %s /BitsPerComponent 8 /Filter /%s /Length %d >>"
+                % (*image.size, space, filter_name.encode(), len(data))
+            )
+            self._write_object(number, body, data)
+            self.images[key] = (number, filter_name)
+        return key
+
+    def add_page(self, size: tuple[int, int], placements: list[tuple[str, Box]]) -> None:
+        """Add a page drawing images (``add_image`` keys) at pixel boxes, in order."""
+        width, height = size
+        names = {}
+        content = []
+        for key, (left, top, right, bottom) in placements:
+            number = self.images[key][0]
+            name = names.setdefault(number, f"Im{number}")
+            content.append(
+                f"q {right - left} 0 0 {bottom - top} {left} {height - bottom} cm /{name} Do Q"
+            )
+        stream = zlib.compress("\n".join(content).encode(), self.compress_level)
+        contents = self._reserve()
+        self._write_object(
+            contents, b"<< /Length %d /Filter /FlateDecode >>" % len(stream), stream
+        )
+        xobjects = " ".join(f"/{name} {number} 0 R" for number, name in names.items())
+        page = self._reserve()
+        self._write_object(
+            page,
+            (
+                f"<< /Type /Page /Parent {_PAGES} 0 R /MediaBox [0 0 {width} {height}] "
+                f"/Resources << /XObject << {xobjects} >> >> /Contents {contents} 0 R >>"
+            ).encode(),
+        )
+        self._kids.append(page)
+        self.pages += 1
+
+    def close(self) -> None:
+        """Write the page tree, catalog and cross-reference table."""
+        if not self.pages:
+            raise ValueError("A PDF needs at least one page")
+        kids = " ".join(f"{kid} 0 R" for kid in self._kids)
+        self._write_object(
+            _PAGES, f"<< /Type /Pages /Kids [{kids}] /Count {self.pages} >>".encode()
+        )
+        self._write_object(1, f"<< /Type /Catalog /Pages {_PAGES} 0 R >>".encode())
+        xref = self.file.tell() - self._start
+        count = self._next
+        lines = [f"xref\n0 {count}\n0000000000 65535 f \n"]
+        for number in range(1, count):
+            lines.append(f"{self._offsets[number]:010d} 00000 n \n")
+        lines.append(
+            f"trailer\n<< /Size {count} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n"
+        )
+        self.file.write("".join(lines).encode())
+
+
+def write_pdf(path: str | Path, pages: Iterable[Page], **options) -> Path:
+    """Stream pages into a PDF file, via a temp file and an atomic rename.
+
+    Args:
+        path: Output file.
+        pages: (size, [(image, box), ...]) per page, consumed one at a
+               time. Images with identical content are embedded once.
+        **options: Passed to PdfWriter (quality, compress_level).
+    """
+
+    def save(tmp):
+        with open(tmp, "wb") as f:
+            writer = PdfWriter(f, **options)
+            for size, placements in pages:
+                keys = [(writer.add_image(image), box) for image, box in placements]
+                writer.add_page(size, keys)
+            writer.close()
+
+    return atomic_write(path, save)
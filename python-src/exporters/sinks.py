@@ -0,0 +1,116 @@
+import io
+import tarfile
+import threading
+import time
+import zipfile
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import BinaryIO
+
+from src.utils.image import atomic_write_bytes
+
+
+class Sink(ABC):
+    """Destination for exported files.
+
+    ``put`` may be called from encoder threads; it serializes calls to
+    ``write``, which subclasses implement, so archives can be appended to
+    safely. Sinks are context managers; ``close`` finalizes archives.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    def put(self, name: str, data: bytes):
+        """Store encoded bytes as ``name``; returns where they went."""
+        with self._lock:
+            return self.write(name, data)
+
+    @abstractmethod
+    def write(self, name: str, data: bytes):
+        """Store ``data`` as ``name``. Must be implemented by subclasses."""
+        ...
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class DirectorySink(Sink):
+    """Write files into a directory via temp file and atomic rename."""
+
+    def __init__(self, root: str | Path):
+        super().__init__()
+        self.root = Path(root)
+
+    def put(self, name: str, data: bytes) -> Path:
+        # Different files can be written concurrently.
+        return self.write(name, data)
+
+    def write(self, name: str, data: bytes) -> Path:
+        return atomic_write_bytes(self.root / name, data)
+
+
+class MemorySink(Sink):
+    """Keep encoded files in memory, keyed by name."""
+
+    def __init__(self):
+        super().__init__()
+        self.files: dict[str, bytes] = {}
+
+    def write(self, name: str, data: bytes) -> memoryview:
+        self.files[name] = data
+        return memoryview(data)
+
+
+class ZipSink(Sink):
+    """Append files to a zip archive at a path or in a writable file object.
+
+    Images are already compressed, so members are stored by default.
+    """
+
+    def __init__(
+        self,
+        target: str | Path | BinaryIO,
+        compression: int = zipfile.ZIP_STORED,
+    ):
+        super().__init__()
+        self._zip = zipfile.ZipFile(target, "w", compression=compression)
+
+    def write(self, name: str, data: bytes) -> str:
+        self._zip.writestr(name, data)
+        return name
+
+    def close(self) -> None:
+        self._zip.close()
+
+
+class TarSink(Sink):
+    """Stream files into a tar archive.
+
+    Uses tarfile's stream mode, so the target may be a non-seekable file
+    object such as a pipe, socket or stdout.
+    """
+
+    def __init__(self, target: str | Path | BinaryIO, compression: str = ""):
+        super().__init__()
+        mode = f"w|{compression}"
+        if isinstance(target, (str, Path)):
+            self._tar = tarfile.open(target, mode)
+        else:
+            self._tar = tarfile.open(fileobj=target, mode=mode)
+
+    def write(self, name: str, data: bytes) -> str:
+        info = tarfile.TarInfo(name)
+        info.size = len(data)
+        info.mtime = int(time.time())
+        self._tar.addfile(info, io.BytesIO(data))
+        return name
+
+    def close(self) -> None:
+        self._tar.close()
@@ -1,56 +1,123 @@
 from pathlib import Path
 
-from PIL import Image, ImageDraw
+from PIL import Image
 
 from config import Settings, BrandConfig
 from src.generators.base import BaseGenerator
-from src.utils.color import hex_to_rgb
-from src.utils.text import draw_text_centered
+from src.profiling import traced
+from src.render import CenteredText, Fill, Layer, Rect, Scene
+from src.utils.stream import write_strips
+from src.utils.text import DEFAULT_FONT_SIZE
 
 
 class BannerGenerator(BaseGenerator):
     """Generate banner images for YouTube, LinkedIn, and Twitter."""
 
+    kind = "banner"
+
     def __init__(self, settings: Settings, brand: BrandConfig):
         super().__init__(settings, brand)
 
-    def generate(
+    def _scene(
+        self, title: str, width: int, height: int, fit_title: bool, scale: float = 1.0
+    ) -> tuple[Scene, list[Layer]]:
+        """The banner's static scene and title layer at a size.
+
+        ``scale`` multiplies font sizes and spacing, for canvases much larger
+        than the platform banners the layout was designed at.
+        """
+        # Background, accent bar and tagline depend only on the brand and
+        # platform size, so they are rendered once and reused.
+        bar_height = height // 15
+        scene = Scene(
+            (width, height),
+            [
+                Fill(self.palette["background"]),
+                # Accent bar
+                Rect((0, 0, width, bar_height), fill=self.palette["accent"]),
+                # Tagline
+                CenteredText(
+                    self.brand.tagline,
+                    color=self.palette["text_secondary"],
+                    font_name=self.brand.typography["body_font"],
+                    font_size=round(DEFAULT_FONT_SIZE * scale),
+                    y_offset=round(60 * scale),
+                ),
+            ],
+        )
+
+        # Title, auto-fit between the accent bar and the tagline if requested
+        box = None
+        if fit_title:
+            padding = round(self.brand.defaults["padding"] * scale)
+            bottom = height // 2 + round(30 * scale)
+            box = (padding, bar_height + padding, width - padding, bottom)
+        title_layer = self._title_layer(title, box, font_size=round(DEFAULT_FONT_SIZE * scale))
+        return scene, [title_layer]
+
+    @traced("render")
+    def render(
         self,
         title: str,
         platform: str = "youtube",
-        output_path: str | None = None,
-    ) -> Path:
+        fit_title: bool = False,
+        size: tuple[int, int] | None = None,
+    ) -> Image.Image:
         dim_key = f"{platform}_banner"
-        width, height = self.settings.PLATFORM_DIMENSIONS.get(
+        width, height = size or self.settings.PLATFORM_DIMENSIONS.get(
             dim_key, (2560, 1440)
         )
+        scene, layers = self._scene(title, width, height, fit_title)
+        return scene.render(layers)
 
-        canvas = self._create_canvas(width, height)
-        draw = ImageDraw.Draw(canvas)
+    @traced("generate")
+    def generate(
+        self,
+        title: str,
+        platform: str = "youtube",
+        output_path: str | None = None,
+        fit_title: bool = False,
+    ) -> Path:
+        canvas = self.render(title, platform, fit_title=fit_title)
+        path = self._resolve_output_path(output_path, f"banner_{platform}")
+        return self._save(canvas, path, platform)
 
-        # Draw accent bar
-        accent = hex_to_rgb(self.brand.colors["accent"])
-        bar_height = height // 15
-        draw.rectangle([(0, 0), (width, bar_height)], fill=accent)
-
-        # Draw title
-        draw_text_centered(
-            draw,
-            title,
-            canvas.size,
-            color=self.brand.colors["text_primary"],
-            font_name=self.brand.typography["heading_font"],
-        )
+    @traced("generate")
+    def generate_print(
+        self,
+        title: str,
+        print_size: str = "event_banner",
+        output_path: str | None = None,
+        dpi: int | None = None,
+        fit_title: bool = False,
+    ) -> Path:
+        """Render a banner at print resolution, streamed into a PNG or TIFF.
 
-        # Draw tagline
-        draw_text_centered(
-            draw,
-            self.brand.tagline,
-            canvas.size,
-            color=self.brand.colors["text_secondary"],
-            font_name=self.brand.typography["body_font"],
-            y_offset=60,
-        )
+        The canvas is rendered and encoded strip by strip (``Scene.strips``),
+        so memory stays bounded however large the print is. Text and spacing
+        scale with the canvas from the YouTube banner layout.
 
-        path = self._resolve_output_path(output_path, f"banner_{platform}")
-        return self._save(canvas, path)
+        Args:
+            title: Banner title.
+            print_size: A ``PRINT_SIZES`` key; sizes are in inches.
+            output_path: A .png, .tif or .tiff path. Defaults to
+                         ``OUTPUT_DIR/banner_<print_size>.png``.
+            dpi: Print resolution. Defaults to ``PRINT_DPI``.
+            fit_title: Size the title to fill the space above the tagline.
+        """
+        try:
+            inches = self.settings.PRINT_SIZES[print_size]
+        except KeyError:
+            raise ValueError(
+                f"Unknown print size '{print_size}'. "
+                f"Available: {sorted(self.settings.PRINT_SIZES)}"
+            ) from None
+        dpi = dpi or self.settings.PRINT_DPI
+        width, height = (round(side * dpi) for side in inches)
+        ref_width, ref_height = self.settings.PLATFORM_DIMENSIONS["youtube_banner"]
+        scale = min(width / ref_width, height / ref_height)
+
+        scene, layers = self._scene(title, width, height, fit_title, scale)
+        path = self._resolve_output_path(output_path, f"banner_{print_size}", "png")
+        strips = (strip for _, strip in scene.strips(layers))
+        return write_strips(path, (width, height), strips, dpi=dpi)
@@ -1,22 +1,71 @@
+import inspect
+import io
 from abc import ABC, abstractmethod
 from pathlib import Path
+from typing import Callable, Iterable
 
 from PIL import Image
 
 from config import Settings, BrandConfig
-from src.utils.color import hex_to_rgb
+from src.dependencies import TrackedBrand
+from src.profiling import Tracer, span, traced
+from src.render import CenteredText, FittedText, Layer
+from src.utils.color import palette_for
+from src.utils.gradient import linear_gradient
+from src.utils.encode import EncodeStats, encode_optimized, encoder_profile
+from src.utils.image import atomic_write_bytes
+from src.utils.text import DEFAULT_FONT_SIZE
+
+# Auto-fitted titles may wrap onto this many lines.
+FIT_MAX_LINES = 2
 
 
 class BaseGenerator(ABC):
     """Base class for all asset generators."""
 
+    # Suffix of the generator's PLATFORM_DIMENSIONS keys, e.g. "thumbnail";
+    # "{platform}_{kind}" selects PLATFORM_ENCODER_PROFILES overrides.
+    kind: str = ""
+
     def __init__(self, settings: Settings, brand: BrandConfig):
         self.settings = settings
         self.brand = brand
+        # A TrackedBrand brings a palette recording the colors looked up.
+        self.palette = brand.palette if isinstance(brand, TrackedBrand) else palette_for(brand)
+        # Called with the EncodeStats of every encoded image. When set, the
+        # stats also include the size of a plain quality-only encode.
+        self.on_encode: Callable[[EncodeStats], None] | None = None
+        # When set, render/generate calls are traced into it (src.profiling).
+        self.tracer: Tracer | None = None
 
     def _create_canvas(self, width: int, height: int) -> Image.Image:
-        bg_color = hex_to_rgb(self.brand.colors["background"])
-        return Image.new("RGB", (width, height), bg_color)
+        return Image.new("RGB", (width, height), self.palette["background"])
+
+    def _create_gradient_canvas(
+        self, width: int, height: int, stops: list, angle: float = 90
+    ) -> Image.Image:
+        """Create a canvas filled with a (memoized) linear gradient."""
+        return linear_gradient((width, height), stops, angle)
+
+    def _title_layer(
+        self,
+        title: str,
+        box: tuple[int, int, int, int] | None = None,
+        font_key: str = "heading_font",
+        font_size: int = DEFAULT_FONT_SIZE,
+    ) -> Layer:
+        """Title layer: centered at ``font_size``, or auto-fit to ``box``."""
+        color = self.palette["text_primary"]
+        font_name = self.brand.typography[font_key]
+        if box is None:
+            return CenteredText(title, color=color, font_name=font_name, font_size=font_size)
+        return FittedText(
+            title,
+            box,
+            color=color,
+            font_name=font_name,
+            max_lines=FIT_MAX_LINES,
+        )
 
     def _resolve_output_path(
         self, output_path: str | None, prefix: str, ext: str | None = None
@@ -26,12 +75,147 @@ class BaseGenerator(ABC):
             return Path(output_path)
         return self.settings.OUTPUT_DIR / f"{prefix}.{ext}"
 
-    def _save(self, image: Image.Image, path: Path) -> Path:
-        path.parent.mkdir(parents=True, exist_ok=True)
-        image.save(str(path), quality=self.settings.OUTPUT_QUALITY)
-        return path
+    def _encode_bytes(
+        self,
+        image: Image.Image,
+        fmt: str,
+        platform: str | None,
+        dim_key: str | None = None,
+    ) -> bytes:
+        fmt = "jpg" if fmt == "jpeg" else fmt
+        if dim_key is None and platform:
+            dim_key = f"{platform}_{self.kind}"
+        profile = encoder_profile(self.settings, fmt, dim_key)
+        baseline = None
+        if self.on_encode is not None:
+            baseline = {"quality": self.settings.OUTPUT_QUALITY}
+        with span("encode", format=fmt, pixels=image.width * image.height) as info:
+            data, stats = encode_optimized(image, fmt, profile, baseline)
+            if info is not None:
+                info["bytes"] = len(data)
+        if self.on_encode is not None:
+            self.on_encode(stats)
+        return data
+
+    def _save(
+        self,
+        image: Image.Image,
+        path: Path,
+        platform: str | None = None,
+        dim_key: str | None = None,
+    ) -> Path:
+        """Encode with the format/platform encoder profile and write atomically."""
+        fmt = path.suffix.lstrip(".").lower() or self.settings.OUTPUT_FORMAT
+        data = self._encode_bytes(image, fmt, platform, dim_key)
+        with span("write", bytes=len(data)):
+            return atomic_write_bytes(path, data)
+
+    def _encode(
+        self, image: Image.Image, fmt: str | None = None, platform: str | None = None
+    ) -> io.BytesIO:
+        fmt = fmt or self.settings.OUTPUT_FORMAT
+        return io.BytesIO(self._encode_bytes(image, fmt, platform))
+
+    def _default_platform(self) -> str | None:
+        parameter = inspect.signature(self.render).parameters.get("platform")
+        return parameter.default if parameter else None
+
+    @abstractmethod
+    def render(self, **kwargs) -> Image.Image | list[Image.Image]:
+        """Render the asset in memory without saving it.
+
+        Takes the same arguments as ``generate`` except ``output_path``.
+        Must be implemented by subclasses.
+        """
+        ...
 
     @abstractmethod
     def generate(self, **kwargs) -> Path:
         """Generate the marketing asset. Must be implemented by subclasses."""
         ...
+
+    @traced("generate_bytes")
+    def generate_bytes(
+        self, fmt: str | None = None, **kwargs
+    ) -> io.BytesIO | list[io.BytesIO]:
+        """Render the asset and encode it in memory, skipping the filesystem.
+
+        Args:
+            fmt: Output format extension. Defaults to OUTPUT_FORMAT.
+            **kwargs: Arguments for ``render``.
+
+        Returns:
+            A rewound buffer per image (a list for multi-image generators);
+            use ``getvalue()`` for bytes or ``getbuffer()`` for a memoryview.
+        """
+        platform = kwargs.get("platform", self._default_platform())
+        rendered = self.render(**kwargs)
+        if isinstance(rendered, list):
+            return [self._encode(image, fmt, platform) for image in rendered]
+        return self._encode(rendered, fmt, platform)
+
+    @traced("render_all")
+    def render_all(
+        self, platforms: Iterable[str] | None = None, **kwargs
+    ) -> dict[str, Image.Image | list[Image.Image]]:
+        """Render the asset at many PLATFORM_DIMENSIONS sizes in one call.
+
+        Each distinct size is laid out and rendered once, largest first;
+        keys sharing a size (instagram_post and instagram_carousel) get
+        copies. Scene bases, fonts, text layouts and the decoded cutout
+        pyramids (see CutoutLibrary) are shared between the sizes.
+
+        Args:
+            platforms: PLATFORM_DIMENSIONS keys. Defaults to all of them.
+            **kwargs: Arguments for ``render`` other than ``platform``.
+
+        Returns:
+            The image (a list for multi-image generators) per key, in the
+            order of ``platforms``.
+        """
+        dimensions = self.settings.PLATFORM_DIMENSIONS
+        keys = list(platforms) if platforms else list(dimensions)
+        unknown = [key for key in keys if key not in dimensions]
+        if unknown:
+            raise ValueError(f"Unknown platform sizes {unknown}. Available: {list(dimensions)}")
+
+        by_size = {}
+        results = {}
+        for key in sorted(keys, key=lambda k: dimensions[k][0] * dimensions[k][1], reverse=True):
+            size = tuple(dimensions[key])
+            if size in by_size:
+                rendered = by_size[size]
+                if isinstance(rendered, list):
+                    results[key] = [image.copy() for image in rendered]
+                else:
+                    results[key] = rendered.copy()
+                continue
+            rendered = self.render(platform=key.partition("_")[0], size=size, **kwargs)
+            by_size[size] = results[key] = rendered
+        return {key: results[key] for key in keys}
+
+    @traced("generate_all")
+    def generate_all(
+        self,
+        output_dir: str | Path | None = None,
+        platforms: Iterable[str] | None = None,
+        **kwargs,
+    ) -> dict[str, Path | list[Path]]:
+        """Render many platform sizes (see ``render_all``) and save each one.
+
+        Files are named after their PLATFORM_DIMENSIONS key, in
+        ``output_dir`` (default OUTPUT_DIR/<kind>_all), and encoded with that
+        key's encoder profile; multi-image assets get a directory of slides.
+        """
+        output_dir = Path(output_dir) if output_dir else self.settings.OUTPUT_DIR / f"{self.kind}_all"
+        ext = self.settings.OUTPUT_FORMAT
+        saved = {}
+        for key, rendered in self.render_all(platforms, **kwargs).items():
+            if isinstance(rendered, list):
+                saved[key] = [
+                    self._save(image, output_dir / key / f"slide_{i + 1:02d}.{ext}", dim_key=key)
+                    for i, image in enumerate(rendered)
+                ]
+            else:
+                saved[key] = self._save(rendered, output_dir / f"{key}.{ext}", dim_key=key)
+        return saved
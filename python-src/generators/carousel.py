@@ -1,69 +1,172 @@
+import io
+from collections.abc import Iterator
 from pathlib import Path
 
-from PIL import Image, ImageDraw
+from PIL import Image
 
 from config import Settings, BrandConfig
 from src.generators.base import BaseGenerator
-from src.utils.color import hex_to_rgb
-from src.utils.text import draw_text_centered
+from src.exporters.pdf import write_pdf
+from src.profiling import traced
+from src.render import CenteredText, Fill, Layer, Rect, Scene
+from src.utils.encode import encoder_profile
 
 
 class CarouselGenerator(BaseGenerator):
     """Generate multi-slide carousel images for Instagram and LinkedIn."""
 
+    kind = "carousel"
+
     def __init__(self, settings: Settings, brand: BrandConfig):
         super().__init__(settings, brand)
 
+    def _slides(
+        self,
+        title: str,
+        num_slides: int,
+        platform: str,
+        fit_title: bool,
+        size: tuple[int, int] | None,
+    ) -> tuple[Scene, Iterator[list[Layer]]]:
+        """The shared background scene and each slide's layers."""
+        dim_key = f"{platform}_carousel"
+        width, height = size or self.settings.PLATFORM_DIMENSIONS.get(
+            dim_key, (1080, 1080)
+        )
+        scene = Scene((width, height), [Fill(self.palette["background"])])
+
+        title_box = None
+        if fit_title:
+            padding = self.brand.defaults["padding"]
+            title_box = (padding, height // 4, width - padding, height * 3 // 4)
+
+        def layers():
+            for i in range(num_slides):
+                # Alternate accent color per slide
+                bar_color = self.palette["primary" if i % 2 == 0 else "accent"]
+                slide_title = title if i == 0 else f"{title} - Part {i + 1}"
+                yield [
+                    # Top accent bar
+                    Rect((0, 0, width, 8), fill=bar_color),
+                    # Slide number indicator
+                    CenteredText(
+                        f"{i + 1}/{num_slides}",
+                        color=self.palette["text_secondary"],
+                        font_name=self.brand.typography["accent_font"],
+                        y_offset=-(height // 3),
+                    ),
+                    # Slide title
+                    self._title_layer(slide_title, title_box),
+                ]
+
+        return scene, layers()
+
+    def iter_slides(
+        self,
+        title: str,
+        num_slides: int = 5,
+        platform: str = "instagram",
+        fit_title: bool = False,
+        size: tuple[int, int] | None = None,
+    ) -> Iterator[Image.Image]:
+        """Yield each slide in turn.
+
+        Slides share one canvas: a yielded image is only valid until the
+        next one is requested, so copy it if it must be kept.
+        """
+        # Only the bar color, counter and title change between slides; the
+        # compositor restores just those regions from the shared background.
+        scene, slides = self._slides(title, num_slides, platform, fit_title, size)
+        compositor = scene.compositor()
+        for layers in slides:
+            yield compositor.render(layers)
+
+    @traced("render")
+    def render(
+        self,
+        title: str,
+        num_slides: int = 5,
+        platform: str = "instagram",
+        fit_title: bool = False,
+        size: tuple[int, int] | None = None,
+    ) -> list[Image.Image]:
+        return [
+            slide.copy()
+            for slide in self.iter_slides(title, num_slides, platform, fit_title, size)
+        ]
+
+    @traced("generate_bytes")
+    def generate_bytes(self, fmt: str | None = None, **kwargs) -> list[io.BytesIO]:
+        # Encode each slide straight from the shared canvas, without copies.
+        platform = kwargs.get("platform", self._default_platform())
+        return [
+            self._encode(slide, fmt, platform) for slide in self.iter_slides(**kwargs)
+        ]
+
+    @traced("generate")
     def generate(
         self,
         title: str,
         num_slides: int = 5,
         platform: str = "instagram",
         output_path: str | None = None,
+        fit_title: bool = False,
     ) -> list[Path]:
-        dim_key = f"{platform}_carousel"
-        width, height = self.settings.PLATFORM_DIMENSIONS.get(
-            dim_key, (1080, 1080)
-        )
+        """Save one file per slide into a directory, or one PDF document.
+
+        A PDF is written (see ``generate_pdf``) when ``output_path`` ends in
+        .pdf, or when there is none and OUTPUT_FORMAT is pdf.
+        """
+        if output_path:
+            pdf = Path(output_path).suffix.lower() == ".pdf"
+        else:
+            pdf = self.settings.OUTPUT_FORMAT == "pdf"
+        if pdf:
+            return [self.generate_pdf(title, num_slides, platform, output_path, fit_title)]
 
         output_dir = Path(output_path) if output_path else self.settings.OUTPUT_DIR / "carousel"
         output_dir.mkdir(parents=True, exist_ok=True)
 
         saved_paths = []
-        for i in range(num_slides):
-            canvas = self._create_canvas(width, height)
-            draw = ImageDraw.Draw(canvas)
-
-            # Alternate accent color per slide
-            primary = hex_to_rgb(self.brand.colors["primary"])
-            accent = hex_to_rgb(self.brand.colors["accent"])
-            bar_color = primary if i % 2 == 0 else accent
-
-            # Top accent bar
-            draw.rectangle([(0, 0), (width, 8)], fill=bar_color)
-
-            # Slide number indicator
-            draw_text_centered(
-                draw,
-                f"{i + 1}/{num_slides}",
-                canvas.size,
-                color=self.brand.colors["text_secondary"],
-                font_name=self.brand.typography["accent_font"],
-                y_offset=-(height // 3),
-            )
-
-            # Slide title
-            slide_title = title if i == 0 else f"{title} - Part {i + 1}"
-            draw_text_centered(
-                draw,
-                slide_title,
-                canvas.size,
-                color=self.brand.colors["text_primary"],
-                font_name=self.brand.typography["heading_font"],
-            )
-
+        slides = self.iter_slides(title, num_slides, platform, fit_title)
+        for i, slide in enumerate(slides):
             slide_path = output_dir / f"slide_{i + 1:02d}.{self.settings.OUTPUT_FORMAT}"
-            self._save(canvas, slide_path)
+            self._save(slide, slide_path, platform)
             saved_paths.append(slide_path)
 
         return saved_paths
+
+    @traced("generate_pdf")
+    def generate_pdf(
+        self,
+        title: str,
+        num_slides: int = 5,
+        platform: str = "instagram",
+        output_path: str | None = None,
+        fit_title: bool = False,
+    ) -> Path:
+        """Save the carousel as one PDF document, one page per slide.
+
+        Pages are written as the slides are rendered, so memory stays flat
+        however many slides there are. The background is embedded once and
+        shared by every page; each page adds only the regions its slide
+        drew (see ``Compositor.dirty``), and repeated regions such as the
+        alternating accent bars are embedded once too.
+        """
+        scene, slides = self._slides(title, num_slides, platform, fit_title, None)
+        compositor = scene.compositor()
+        full = (0, 0, *scene.size)
+
+        def pages():
+            for layers in slides:
+                frame = compositor.render(layers)
+                dirty = compositor.dirty
+                if dirty is None:
+                    yield scene.size, [(frame.copy(), full)]
+                else:
+                    regions = [(frame.crop(box), box) for box in dirty]
+                    yield scene.size, [(scene.base(), full), *regions]
+
+        profile = encoder_profile(self.settings, "pdf", f"{platform}_{self.kind}")
+        path = self._resolve_output_path(output_path, "carousel", "pdf")
+        return write_pdf(path, pages(), quality=profile.get("quality", 95))
@@ -1,62 +1,76 @@
 from pathlib import Path
 
-from PIL import Image, ImageDraw
+from PIL import Image
 
 from config import Settings, BrandConfig
 from src.generators.base import BaseGenerator
-from src.utils.color import hex_to_rgb
-from src.utils.text import draw_text_wrapped
+from src.profiling import traced
+from src.render import Fill, Rect, Scene, WrappedText
 
 
 class SocialPostGenerator(BaseGenerator):
     """Generate social media post images for Instagram, LinkedIn, and Twitter."""
 
+    kind = "post"
+
     def __init__(self, settings: Settings, brand: BrandConfig):
         super().__init__(settings, brand)
 
-    def generate(
+    @traced("render")
+    def render(
         self,
         text: str,
         platform: str = "instagram",
-        output_path: str | None = None,
-    ) -> Path:
+        size: tuple[int, int] | None = None,
+    ) -> Image.Image:
         dim_key = f"{platform}_post"
-        width, height = self.settings.PLATFORM_DIMENSIONS.get(
+        width, height = size or self.settings.PLATFORM_DIMENSIONS.get(
             dim_key, (1080, 1080)
         )
 
-        canvas = self._create_canvas(width, height)
-        draw = ImageDraw.Draw(canvas)
-
-        # Draw border frame
-        primary = hex_to_rgb(self.brand.colors["primary"])
-        border = self.brand.defaults["padding"] // 2
-        draw.rectangle(
-            [(border, border), (width - border, height - border)],
-            outline=primary,
-            width=4,
-        )
-
-        # Draw post text
         padding = self.brand.defaults["padding"]
-        draw_text_wrapped(
-            draw,
-            text,
-            max_width=width - padding * 2,
-            position=(padding, height // 3),
-            color=self.brand.colors["text_primary"],
-            font_name=self.brand.typography["body_font"],
+        border = padding // 2
+        scene = Scene(
+            (width, height),
+            [
+                Fill(self.palette["background"]),
+                # Border frame
+                Rect(
+                    (border, border, width - border, height - border),
+                    outline=self.palette["primary"],
+                    width=4,
+                ),
+                # Brand name at bottom
+                WrappedText(
+                    self.brand.name,
+                    max_width=width,
+                    position=(padding, height - padding * 2),
+                    color=self.palette["text_secondary"],
+                    font_name=self.brand.typography["accent_font"],
+                ),
+            ],
         )
 
-        # Draw brand name at bottom
-        draw_text_wrapped(
-            draw,
-            self.brand.name,
-            max_width=width,
-            position=(padding, height - padding * 2),
-            color=self.brand.colors["text_secondary"],
-            font_name=self.brand.typography["accent_font"],
+        # Post text
+        return scene.render(
+            [
+                WrappedText(
+                    text,
+                    max_width=width - padding * 2,
+                    position=(padding, height // 3),
+                    color=self.palette["text_primary"],
+                    font_name=self.brand.typography["body_font"],
+                )
+            ]
         )
 
+    @traced("generate")
+    def generate(
+        self,
+        text: str,
+        platform: str = "instagram",
+        output_path: str | None = None,
+    ) -> Path:
+        canvas = self.render(text, platform)
         path = self._resolve_output_path(output_path, f"post_{platform}")
-        return self._save(canvas, path)
+        return self._save(canvas, path, platform)
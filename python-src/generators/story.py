@@ -0,0 +1,144 @@
+from pathlib import Path
+
+from PIL import Image
+
+from config import Settings, BrandConfig
+from src.exporters.animation import ANIMATION_WRITERS, write_animation
+from src.generators.base import BaseGenerator
+from src.profiling import traced
+from src.render import Animated, Animation, Fill, Rect, Scene, Track, WrappedText
+from src.utils.encode import encoder_profile
+
+# Distance (pixels) the title rises while it fades in.
+TITLE_RISE = 80
+
+
+class StoryGenerator(BaseGenerator):
+    """Generate vertical stories for Instagram and Meta, animated or still."""
+
+    kind = "story"
+
+    def __init__(self, settings: Settings, brand: BrandConfig):
+        super().__init__(settings, brand)
+
+    def animation(
+        self,
+        title: str,
+        text: str = "",
+        platform: str = "instagram",
+        size: tuple[int, int] | None = None,
+        duration: float | None = None,
+        fps: int | None = None,
+    ) -> Animation:
+        """The story as an Animation.
+
+        The title rises and fades in, an accent bar grows under it, then the
+        text is revealed word by word and holds until the end.
+
+        Args:
+            duration: Seconds. Defaults to ANIMATION_DURATION.
+            fps: Frames per second. Defaults to ANIMATION_FPS.
+        """
+        dim_key = f"{platform}_story"
+        width, height = size or self.settings.PLATFORM_DIMENSIONS.get(
+            dim_key, (1080, 1920)
+        )
+        duration = duration or self.settings.ANIMATION_DURATION
+        fps = fps or self.settings.ANIMATION_FPS
+
+        padding = self.brand.defaults["padding"]
+        scene = Scene(
+            (width, height),
+            [
+                Fill(self.palette["background"]),
+                # Brand name at bottom
+                WrappedText(
+                    self.brand.name,
+                    max_width=width,
+                    position=(padding, height - padding * 2),
+                    color=self.palette["text_secondary"],
+                    font_name=self.brand.typography["accent_font"],
+                ),
+            ],
+        )
+
+        # Keyframes are placed at fractions of the duration.
+        def at(fraction):
+            return round(duration * fraction, 3)
+
+        title_box = (padding, height // 4, width - padding, height // 4 + height // 6)
+        left, top, right, bottom = title_box
+        start_box = (left, top + TITLE_RISE, right, bottom + TITLE_RISE)
+        bar_top = bottom + padding // 2
+        bar_start = (padding, bar_top, padding, bar_top + 8)
+        bar_end = (padding, bar_top, width - padding, bar_top + 8)
+        layers = [
+            Animated(
+                self._title_layer(title, title_box),
+                {
+                    "box": Track(((0, start_box), (at(0.2), title_box)), "ease_out"),
+                    "opacity": Track(((0, 0.0), (at(0.2), 1.0))),
+                },
+            ),
+            Animated(
+                Rect(bar_start, fill=self.palette["primary"]),
+                {"box": Track(((at(0.1), bar_start), (at(0.3), bar_end)), "ease_in_out")},
+            ),
+        ]
+        if text:
+            layers.append(
+                Animated(
+                    WrappedText(
+                        text,
+                        max_width=width - padding * 2,
+                        position=(padding, bar_top + padding),
+                        color=self.palette["text_primary"],
+                        font_name=self.brand.typography["body_font"],
+                    ),
+                    {"reveal": Track(((at(0.3), 0.0), (at(0.8), 1.0)))},
+                )
+            )
+        return Animation(scene, layers, duration, fps)
+
+    @traced("render")
+    def render(
+        self,
+        title: str,
+        text: str = "",
+        platform: str = "instagram",
+        size: tuple[int, int] | None = None,
+    ) -> Image.Image:
+        """The story's last frame, as a still."""
+        animation = self.animation(title, text, platform, size)
+        return animation.render(animation.duration)
+
+    @traced("generate")
+    def generate(
+        self,
+        title: str,
+        text: str = "",
+        platform: str = "instagram",
+        output_path: str | None = None,
+        duration: float | None = None,
+        fps: int | None = None,
+    ) -> Path:
+        """Save the story, animated for .webp, .gif and .png (APNG) paths.
+
+        Other formats (jpg) get the last frame as a still. Without a path
+        the file goes to OUTPUT_DIR in ANIMATION_FORMAT.
+        """
+        path = self._resolve_output_path(
+            output_path, f"story_{platform}", self.settings.ANIMATION_FORMAT
+        )
+        fmt = path.suffix.lstrip(".").lower()
+        animation = self.animation(title, text, platform, duration=duration, fps=fps)
+        if fmt not in ANIMATION_WRITERS:
+            return self._save(animation.render(animation.duration), path, platform)
+
+        profile = encoder_profile(self.settings, fmt, f"{platform}_{self.kind}")
+        options = {}
+        if fmt == "webp":
+            options = {key: profile[key] for key in ("quality", "method") if key in profile}
+        elif fmt in ("png", "apng") and "compress_level" in profile:
+            options = {"compress_level": profile["compress_level"]}
+        return write_animation(path, animation, **options)
@@ -1,48 +1,71 @@
 from pathlib import Path
 
-from PIL import Image, ImageDraw
+from PIL import Image
 
 from config import Settings, BrandConfig
 from src.generators.base import BaseGenerator
-from src.utils.color import hex_to_rgb
-from src.utils.text import draw_text_centered
+from src.profiling import traced
+from src.render import Gradient, ImageLayer, Scene
+from src.utils.assets import get_cutout_library
+
+# Height of a character cutout relative to the thumbnail height
+POSE_HEIGHT_RATIO = 0.9
 
 
 class ThumbnailGenerator(BaseGenerator):
     """Generate thumbnail images for YouTube and other platforms."""
 
+    kind = "thumbnail"
+
     def __init__(self, settings: Settings, brand: BrandConfig):
         super().__init__(settings, brand)
 
-    def generate(
+    @traced("render")
+    def render(
         self,
         title: str,
         platform: str = "youtube",
-        output_path: str | None = None,
-    ) -> Path:
+        pose: str | None = None,
+        fit_title: bool = False,
+        size: tuple[int, int] | None = None,
+    ) -> Image.Image:
         dim_key = f"{platform}_thumbnail"
-        width, height = self.settings.PLATFORM_DIMENSIONS.get(
+        width, height = size or self.settings.PLATFORM_DIMENSIONS.get(
             dim_key, (1280, 720)
         )
 
-        canvas = self._create_canvas(width, height)
-        draw = ImageDraw.Draw(canvas)
-
-        # Draw gradient overlay
-        primary = hex_to_rgb(self.brand.colors["primary"])
-        for y in range(height):
-            alpha = y / height
-            color = tuple(int(primary[i] * alpha) for i in range(3))
-            draw.line([(0, y), (width, y)], fill=color)
-
-        # Draw title text
-        draw_text_centered(
-            draw,
-            title,
-            canvas.size,
-            color=self.brand.colors["text_primary"],
-            font_name=self.brand.typography["heading_font"],
+        # Gradient from black at the top to the primary color at the bottom
+        scene = Scene(
+            (width, height),
+            [Gradient(((0.0, "#000000"), (1.0, self.palette["primary"])))],
         )
 
+        layers = []
+        padding = self.brand.defaults["padding"]
+        title_right = width - padding
+
+        # Character cutout, bottom-right
+        if pose:
+            cutout = get_cutout_library().get(pose, int(height * POSE_HEIGHT_RATIO))
+            layers.append(
+                ImageLayer(cutout, (width - cutout.width, height - cutout.height))
+            )
+            title_right = width - cutout.width
+
+        # Title text
+        box = (padding, padding, title_right, height - padding) if fit_title else None
+        layers.append(self._title_layer(title, box))
+        return scene.render(layers)
+
+    @traced("generate")
+    def generate(
+        self,
+        title: str,
+        platform: str = "youtube",
+        output_path: str | None = None,
+        pose: str | None = None,
+        fit_title: bool = False,
+    ) -> Path:
+        canvas = self.render(title, platform, pose=pose, fit_title=fit_title)
         path = self._resolve_output_path(output_path, f"thumbnail_{platform}")
-        return self._save(canvas, path)
+        return self._save(canvas, path, platform)
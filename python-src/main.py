@@ -1,27 +1,81 @@
 import click
-from config import Settings, BrandConfig
+
+
+class _Resources(dict):
+    """ctx.obj that loads settings and brand config on first access.
+
+    Commands that never touch them (``--help``, ``cache stats`` for the
+    brand) skip importing and parsing the config entirely.
+    """
+
+    def __missing__(self, key):
+        if key == "settings":
+            from config import Settings
+
+            value = Settings()
+        elif key == "brand":
+            from config import BrandConfig
+
+            value = BrandConfig()
+        else:
+            raise KeyError(key)
+        self[key] = value
+        return value
 
 
 @click.group()
+@click.option("--report", is_flag=True, help="Print size, encode time and bytes saved per image")
+@click.option("--profile", is_flag=True, help="Write a trace and cProfile dump per job to PROFILE_DIR")
 @click.pass_context
-def cli(ctx):
+def cli(ctx, report, profile):
     """SIGMA - Marketing Asset Generator for Codebasics."""
-    ctx.ensure_object(dict)
-    ctx.obj["settings"] = Settings()
-    ctx.obj["brand"] = BrandConfig()
+    ctx.ensure_object(_Resources)
+    ctx.obj["report"] = report
+    ctx.obj["profile"] = profile
+
+
+def _profile_dir(ctx) -> str | None:
+    return str(ctx.obj["settings"].PROFILE_DIR) if ctx.obj.get("profile") else None
+
+
+def _generator(ctx, cls):
+    """Instantiate a generator, wired up for --report and --profile."""
+    generator = cls(ctx.obj["settings"], ctx.obj["brand"])
+    if ctx.obj.get("report"):
+        generator.on_encode = lambda stats: click.echo(f"  {stats.summary()}")
+    if ctx.obj.get("profile"):
+        from src.profiling import job_name, profile_job
+
+        directory = ctx.obj["settings"].PROFILE_DIR
+        name = job_name(ctx.info_name)
+
+        def summary():
+            stages = sorted(tracer.stage_totals().items(), key=lambda item: -item[1])
+            click.echo(", ".join(f"{stage} {seconds * 1000:.1f} ms" for stage, seconds in stages))
+            click.echo(f"Profile written to {directory / name}.*")
+
+        # Registered first so it runs after the profile is written.
+        ctx.call_on_close(summary)
+        tracer = ctx.with_resource(profile_job(directory, name))
+        generator.tracer = tracer
+    return generator
 
 
 @cli.command()
 @click.option("--title", required=True, help="Title text for the thumbnail")
 @click.option("--platform", default="youtube", help="Target platform")
 @click.option("--output", default=None, help="Output file path")
+@click.option("--pose", default=None, help="Character cutout pose (e.g. confident, shrug)")
+@click.option("--fit", is_flag=True, help="Size the title to fill the available space")
 @click.pass_context
-def thumbnail(ctx, title, platform, output):
+def thumbnail(ctx, title, platform, output, pose, fit):
     """Generate a thumbnail image."""
     from src.generators.thumbnail import ThumbnailGenerator
 
-    generator = ThumbnailGenerator(ctx.obj["settings"], ctx.obj["brand"])
-    result = generator.generate(title=title, platform=platform, output_path=output)
+    generator = _generator(ctx, ThumbnailGenerator)
+    result = generator.generate(
+        title=title, platform=platform, output_path=output, pose=pose, fit_title=fit
+    )
     click.echo(f"Thumbnail saved to: {result}")
 
 
@@ -29,13 +83,24 @@ def thumbnail(ctx, title, platform, output):
 @click.option("--title", required=True, help="Title text for the banner")
 @click.option("--platform", default="youtube", help="Target platform")
 @click.option("--output", default=None, help="Output file path")
+@click.option("--fit", is_flag=True, help="Size the title to fill the available space")
+@click.option("--print", "print_size", default=None, help="Print size (e.g. event_banner, billboard) instead of a platform")
+@click.option("--dpi", type=int, default=None, help="Print resolution (default: PRINT_DPI)")
 @click.pass_context
-def banner(ctx, title, platform, output):
+def banner(ctx, title, platform, output, fit, print_size, dpi):
     """Generate a banner image."""
     from src.generators.banner import BannerGenerator
 
-    generator = BannerGenerator(ctx.obj["settings"], ctx.obj["brand"])
-    result = generator.generate(title=title, platform=platform, output_path=output)
+    generator = _generator(ctx, BannerGenerator)
+    if print_size:
+        # Streamed strip by strip to PNG/TIFF; pick TIFF with a .tif output.
+        result = generator.generate_print(
+            title=title, print_size=print_size, output_path=output, dpi=dpi, fit_title=fit
+        )
+    else:
+        result = generator.generate(
+            title=title, platform=platform, output_path=output, fit_title=fit
+        )
     click.echo(f"Banner saved to: {result}")
 
 
@@ -48,26 +113,193 @@ def social(ctx, text, platform, output):
     """Generate a social media post image."""
     from src.generators.social_post import SocialPostGenerator
 
-    generator = SocialPostGenerator(ctx.obj["settings"], ctx.obj["brand"])
+    generator = _generator(ctx, SocialPostGenerator)
     result = generator.generate(text=text, platform=platform, output_path=output)
     click.echo(f"Social post saved to: {result}")
 
 
+@cli.command()
+@click.option("--title", required=True, help="Story title")
+@click.option("--text", default="", help="Text revealed under the title")
+@click.option("--platform", default="instagram", help="Target platform")
+@click.option("--output", default=None, help="Output file path (.webp, .gif or .png for APNG)")
+@click.option("--duration", type=float, default=None, help="Length in seconds")
+@click.option("--fps", type=int, default=None, help="Frames per second")
+@click.pass_context
+def story(ctx, title, text, platform, output, duration, fps):
+    """Generate an animated story."""
+    from src.generators.story import StoryGenerator
+
+    generator = _generator(ctx, StoryGenerator)
+    result = generator.generate(
+        title=title,
+        text=text,
+        platform=platform,
+        output_path=output,
+        duration=duration,
+        fps=fps,
+    )
+    click.echo(f"Story saved to: {result}")
+
+
 @cli.command()
 @click.option("--slides", required=True, type=int, help="Number of carousel slides")
 @click.option("--title", required=True, help="Carousel title")
 @click.option("--platform", default="instagram", help="Target platform")
-@click.option("--output", default=None, help="Output directory path")
+@click.option("--output", default=None, help="Output directory, or a .pdf file for one document")
+@click.option("--fit", is_flag=True, help="Size slide titles to fill the available space")
 @click.pass_context
-def carousel(ctx, slides, title, platform, output):
+def carousel(ctx, slides, title, platform, output, fit):
     """Generate a carousel of images."""
     from src.generators.carousel import CarouselGenerator
 
-    generator = CarouselGenerator(ctx.obj["settings"], ctx.obj["brand"])
+    generator = _generator(ctx, CarouselGenerator)
     results = generator.generate(
-        title=title, num_slides=slides, platform=platform, output_path=output
+        title=title,
+        num_slides=slides,
+        platform=platform,
+        output_path=output,
+        fit_title=fit,
     )
-    click.echo(f"Carousel ({len(results)} slides) saved to: {results[0].parent}")
+    if results[0].suffix == ".pdf":
+        click.echo(f"Carousel ({slides} pages) saved to: {results[0]}")
+    else:
+        click.echo(f"Carousel ({len(results)} slides) saved to: {results[0].parent}")
+
+
+@cli.command()
+@click.argument("manifest", type=click.Path(exists=True, dir_okay=False))
+@click.option("--workers", "-j", type=int, default=None, help="Worker processes (default: CPU count)")
+@click.option("--cache/--no-cache", default=True, help="Reuse unchanged outputs from the render cache")
+@click.pass_context
+def batch(ctx, manifest, workers, cache):
+    """Render every job in a YAML/JSON manifest in parallel."""
+    from src.batch import BatchRunner, iter_manifest
+
+    # Jobs are streamed from the manifest's data sources as workers free up.
+    jobs = iter_manifest(manifest, ctx.obj["settings"])
+    runner = BatchRunner(workers=workers, use_cache=cache, profile_dir=_profile_dir(ctx))
+    total = failed = peak = 0
+    for result in runner.run(jobs):
+        total += 1
+        if result.ok:
+            outputs = ", ".join(str(p) for p in result.outputs)
+            timing = f"{result.elapsed:.2f}s"
+            if result.peak_rss_kb:
+                peak = max(peak, result.peak_rss_kb)
+                timing += f", {result.peak_rss_kb // 1024} MB peak"
+            click.echo(f"[ok] {result.job_id} ({timing}): {outputs}")
+        else:
+            failed += 1
+            click.echo(f"[failed] {result.job_id}\n{result.error}", err=True)
+    summary = f"Batch finished: {total - failed} succeeded, {failed} failed"
+    if peak:
+        summary += f" (peak worker memory {peak // 1024} MB)"
+    click.echo(summary)
+    if failed:
+        ctx.exit(1)
+
+
+@cli.command()
+@click.argument("manifest", type=click.Path(exists=True, dir_okay=False))
+@click.option("--workers", "-j", type=int, default=None, help="Worker processes (default: CPU count)")
+@click.option("--force", is_flag=True, help="Rebuild every output")
+@click.option("--dry-run", is_flag=True, help="List the outputs that would be rebuilt, and why")
+@click.pass_context
+def build(ctx, manifest, workers, force, dry_run):
+    """Re-render only the manifest outputs whose inputs changed."""
+    from src.batch import iter_manifest
+    from src.build import Builder
+
+    builder = Builder(ctx.obj["settings"], ctx.obj["brand"], workers=workers)
+    total = 0
+
+    def jobs():
+        # Streamed from the manifest and counted on the way.
+        nonlocal total
+        for job in iter_manifest(manifest, ctx.obj["settings"]):
+            total += 1
+            yield job
+
+    if dry_run:
+        stale = 0
+        for job in jobs():
+            reason = "forced" if force else builder.stale_reason(job)
+            if reason is not None:
+                stale += 1
+                click.echo(f"[stale] {job.id}: {reason}")
+        click.echo(f"{stale} of {total} outputs out of date")
+        return
+
+    built = failed = 0
+    for result, reason in builder.build(jobs(), force=force):
+        if result.ok:
+            built += 1
+            click.echo(f"[built] {result.job_id} ({reason}, {result.elapsed:.2f}s)")
+        else:
+            failed += 1
+            click.echo(f"[failed] {result.job_id}\n{result.error}", err=True)
+    click.echo(f"Build finished: {built} rebuilt, {total - built - failed} up to date, {failed} failed")
+    if failed:
+        ctx.exit(1)
+
+
+@cli.command()
+@click.option("--host", default="127.0.0.1", help="Interface to listen on")
+@click.option("--port", default=8765, type=int, help="Port to listen on")
+@click.option("--workers", "-j", type=int, default=None, help="Render worker processes (default: CPU count)")
+@click.option("--queue", "queue_size", default=32, type=int, help="Requests allowed to wait beyond busy workers")
+@click.option("--timeout", default=30.0, type=float, help="Per-request render timeout in seconds")
+@click.option("--cache/--no-cache", default=True, help="Reuse unchanged outputs from the render cache")
+@click.pass_context
+def serve(ctx, host, port, workers, queue_size, timeout, cache):
+    """Run an HTTP/JSON render server backed by warm workers."""
+    import asyncio
+
+    from src.server import RenderServer
+
+    server = RenderServer(
+        host=host,
+        port=port,
+        workers=workers,
+        queue_size=queue_size,
+        timeout=timeout,
+        use_cache=cache,
+        profile_dir=_profile_dir(ctx),
+    )
+    click.echo(f"Serving on http://{host}:{port} with {server.workers} workers")
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+@cli.group()
+def cache():
+    """Inspect and prune the render cache."""
+
+
+@cache.command("stats")
+@click.pass_context
+def cache_stats(ctx):
+    """Show render cache size and entry count."""
+    from src.cache import RenderCache
+
+    stats = RenderCache(ctx.obj["settings"]).stats()
+    click.echo(f"Directory: {stats['directory']}")
+    click.echo(f"Entries:   {stats['entries']}")
+    click.echo(f"Size:      {stats['bytes'] / 1e6:.1f} MB of {stats['max_bytes'] / 1e6:.1f} MB")
+
+
+@cache.command("prune")
+@click.option("--max-bytes", type=int, default=None, help="Target size (default: RENDER_CACHE_MAX_BYTES; 0 clears)")
+@click.pass_context
+def cache_prune(ctx, max_bytes):
+    """Evict least-recently-used renders until the cache fits."""
+    from src.cache import RenderCache
+
+    removed, freed = RenderCache(ctx.obj["settings"]).prune(max_bytes)
+    click.echo(f"Removed {removed} entries ({freed / 1e6:.1f} MB)")
 
 
 if __name__ == "__main__":
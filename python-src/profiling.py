@@ -0,0 +1,304 @@
+import contextvars
+import cProfile
+import functools
+import json
+import itertools
+import os
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Iterator
+
+# Tracer that module-level ``span``/``count`` calls record into, if any.
+_current: contextvars.ContextVar["Tracer | None"] = contextvars.ContextVar(
+    "sigma_tracer", default=None
+)
+
+# Shared no-op returned by ``span`` when nothing is being traced.
+_NO_SPAN = nullcontext()
+
+_job_numbers = itertools.count(1)
+
+
+class Tracer:
+    """Collects timing spans and counters for one render job.
+
+    Spans are timed stages (``scene.base``, ``text.layout``, ``encode``...)
+    with optional arguments; a ``pixels`` argument is also summed into a
+    ``pixels.<span name>`` counter. While a tracer is active (``activate``),
+    code anywhere in the render path records into it through the module-level
+    ``span`` and ``count`` functions. Recording is thread-safe, so encoder
+    threads can share a tracer.
+
+    Font, text layout, scene base and cutout cache hits are counted as the
+    change in those caches' own counters over the outermost activation.
+    """
+
+    def __init__(self, name: str = "sigma"):
+        self.name = name
+        self.events: list[dict] = []
+        self.counters: dict[str, int] = {}
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+        self._depth = 0
+        self._cache_start: dict[str, int] = {}
+
+    @contextmanager
+    def span(self, name: str, **args) -> Iterator[dict]:
+        """Time a stage. The yielded dict can be updated with more arguments."""
+        start = time.perf_counter()
+        try:
+            yield args
+        finally:
+            end = time.perf_counter()
+            event = {
+                "name": name,
+                "ts": start - self._origin,
+                "dur": end - start,
+                "tid": threading.get_ident(),
+                "args": args,
+            }
+            with self._lock:
+                self.events.append(event)
+                if "pixels" in args:
+                    key = f"pixels.{name}"
+                    self.counters[key] = self.counters.get(key, 0) + args["pixels"]
+
+    def count(self, name: str, value: int = 1) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    @contextmanager
+    def activate(self) -> Iterator["Tracer"]:
+        """Make this the tracer that ``span`` and ``count`` record into."""
+        if self._depth == 0:
+            self._cache_start = cache_counters()
+        self._depth += 1
+        token = _current.set(self)
+        try:
+            yield self
+        finally:
+            _current.reset(token)
+            self._depth -= 1
+            if self._depth == 0:
+                for key, value in cache_counters().items():
+                    delta = value - self._cache_start.get(key, 0)
+                    if delta:
+                        self.count(key, delta)
+
+    def stage_totals(self) -> dict[str, float]:
+        """Total seconds per span name."""
+        totals: dict[str, float] = {}
+        for event in self.events:
+            totals[event["name"]] = totals.get(event["name"], 0.0) + event["dur"]
+        return totals
+
+    def write_jsonl(self, path: str | Path) -> Path:
+        """One JSON object per span (times in seconds), then the counters."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w") as f:
+            for event in self.events:
+                f.write(json.dumps({"type": "span", "job": self.name, **event}, default=str) + "\n")
+            f.write(json.dumps({"type": "counters", "job": self.name, **self.counters}) + "\n")
+        return path
+
+    def chrome_trace(self) -> dict:
+        """The trace in Chrome trace event format (chrome://tracing, Perfetto)."""
+        pid = os.getpid()
+        events = [
+            {"name": "process_name", "ph": "M", "pid": pid, "args": {"name": self.name}}
+        ]
+        for event in self.events:
+            events.append({
+                "name": event["name"],
+                "cat": "sigma",
+                "ph": "X",
+                "ts": round(event["ts"] * 1e6, 1),
+                "dur": round(event["dur"] * 1e6, 1),
+                "pid": pid,
+                "tid": event["tid"],
+                "args": {k: v if isinstance(v, (int, float, bool)) else str(v)
+                         for k, v in event["args"].items()},
+            })
+        end = max((e["ts"] + e["dur"] for e in self.events), default=0.0)
+        events.append({
+            "name": "counters",
+            "ph": "C",
+            "ts": round(end * 1e6, 1),
+            "pid": pid,
+            "args": self.counters,
+        })
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write_chrome_trace(self, path: str | Path) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.chrome_trace()))
+        return path
+
+
+def current() -> Tracer | None:
+    """The active tracer, or None when nothing is being traced."""
+    return _current.get()
+
+
+def span(name: str, **args):
+    """Time a stage on the active tracer; a shared no-op when there is none.
+
+    Use as ``with span("encode", fmt="png") as info:``; ``info`` is a dict
+    for extra arguments, or None when not tracing.
+    """
+    tracer = _current.get()
+    if tracer is None:
+        return _NO_SPAN
+    return tracer.span(name, **args)
+
+
+def count(name: str, value: int = 1) -> None:
+    """Add to a counter on the active tracer, if any."""
+    tracer = _current.get()
+    if tracer is not None:
+        tracer.count(name, value)
+
+
+def traced(name: str):
+    """Decorate a method so it runs as a span on its object's tracer.
+
+    The object's ``tracer`` attribute is used, falling back to the active
+    tracer; either way that tracer is activated for the call, so stages
+    inside (scene, text, encode) record into it. Untraced calls pass
+    straight through.
+    """
+
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            tracer = self.tracer or _current.get()
+            if tracer is None:
+                return method(self, *args, **kwargs)
+            with tracer.activate(), tracer.span(name, source=type(self).__name__):
+                return method(self, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def cache_counters() -> dict[str, int]:
+    """Current hit/miss counters of the process-wide render caches.
+
+    Only caches whose modules are already imported are read, so this never
+    pulls in Pillow on its own.
+    """
+    counters = {}
+    text = sys.modules.get("src.utils.text")
+    if text is not None:
+        stats = text.font_cache.stats()
+        counters["font_cache.hits"] = stats["hits"]
+        counters["font_cache.misses"] = stats["misses"]
+    layout = sys.modules.get("src.utils.layout")
+    if layout is not None:
+        counters["layout_cache.hits"] = layout.layout_cache.hits
+        counters["layout_cache.misses"] = layout.layout_cache.misses
+    scene = sys.modules.get("src.render.scene")
+    if scene is not None:
+        counters["scene_cache.hits"] = scene.base_cache.hits
+        counters["scene_cache.misses"] = scene.base_cache.misses
+    assets = sys.modules.get("src.utils.assets")
+    if assets is not None and assets._library is not None:
+        stats = assets._library.stats()
+        counters["cutouts.hits"] = stats["hits"]
+        counters["cutouts.disk_hits"] = stats["disk_hits"]
+        counters["cutouts.decodes"] = stats["decodes"]
+    return counters
+
+
+def _read_hwm_kb() -> int | None:
+    """Peak resident set size of this process in KiB, or None if unknown."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and KiB elsewhere.
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def _reset_hwm() -> bool:
+    """Restart peak RSS tracking from the current RSS (Linux only)."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+@contextmanager
+def peak_memory() -> Iterator[dict]:
+    """Measure the peak resident memory of the process inside the block.
+
+    The yielded dict gets ``peak_rss_kb`` on exit, also added to the active
+    tracer as the ``memory.peak_rss_kb`` counter. On Linux the high-water
+    mark is reset on entry, so a worker reports the peak of each job rather
+    than of its whole life; elsewhere it is the process peak so far.
+    """
+    _reset_hwm()
+    info: dict = {}
+    try:
+        yield info
+    finally:
+        peak = _read_hwm_kb()
+        if peak is not None:
+            info["peak_rss_kb"] = peak
+            count("memory.peak_rss_kb", peak)
+
+
+def job_name(label: str) -> str:
+    """A file-safe, unique-per-process profile name for a job label."""
+    slug = re.sub(r"[^\w.-]+", "_", label).strip("_") or "job"
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    return f"{stamp}-{os.getpid()}-{next(_job_numbers)}-{slug}"
+
+
+@contextmanager
+def profile_job(
+    directory: str | Path, name: str, cprofile: bool = True
+) -> Iterator[Tracer]:
+    """Trace (and optionally cProfile) everything run inside the block.
+
+    On exit writes ``<name>.trace.jsonl``, ``<name>.trace.json`` (Chrome
+    trace format) and, with ``cprofile``, ``<name>.prof`` (load it with
+    ``pstats`` or snakeviz) into ``directory``. cProfile slows Python code
+    down, which inflates the span timings of the same run.
+    """
+    directory = Path(directory)
+    tracer = Tracer(name)
+    profiler = cProfile.Profile() if cprofile else None
+    try:
+        with tracer.activate():
+            if profiler is not None:
+                profiler.enable()
+            try:
+                with tracer.span("job"):
+                    yield tracer
+            finally:
+                if profiler is not None:
+                    profiler.disable()
+    finally:
+        # Written for failed jobs too; those are often the ones to look at.
+        tracer.write_jsonl(directory / f"{name}.trace.jsonl")
+        tracer.write_chrome_trace(directory / f"{name}.trace.json")
+        if profiler is not None:
+            profiler.dump_stats(directory / f"{name}.prof")
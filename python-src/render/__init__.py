@@ -0,0 +1,32 @@
+from src.render.animation import Animated, Animation, AnimationFrame, Track
+from src.render.scene import (
+    CenteredText,
+    Compositor,
+    Faded,
+    Fill,
+    FittedText,
+    Gradient,
+    ImageLayer,
+    Layer,
+    Rect,
+    Scene,
+    WrappedText,
+)
+
+__all__ = [
+    "Animated",
+    "Animation",
+    "AnimationFrame",
+    "CenteredText",
+    "Compositor",
+    "Faded",
+    "Fill",
+    "FittedText",
+    "Gradient",
+    "ImageLayer",
+    "Layer",
+    "Rect",
+    "Scene",
+    "Track",
+    "WrappedText",
+]
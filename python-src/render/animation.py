@@ -0,0 +1,322 @@
+import math
+import re
+from collections import OrderedDict
+from dataclasses import dataclass, fields, replace
+from typing import Any, Callable, Iterator
+
+from PIL import Image, ImageChops, ImageDraw
+
+from src.profiling import span
+from src.render.scene import Box, Faded, Layer, Scene, record_text
+
+# Easing curves mapping linear progress (0 to 1) through a segment.
+EASINGS: dict[str, Callable[[float], float]] = {
+    "linear": lambda t: t,
+    "ease_in": lambda t: t * t,
+    "ease_out": lambda t: 1 - (1 - t) ** 2,
+    "ease_in_out": lambda t: t * t * (3 - 2 * t),
+}
+
+_WORD = re.compile(r"\S+")
+
+# Text coverage masks kept while rendering an animation's frames.
+TEXT_MASK_CACHE_SIZE = 32
+
+
+def _interpolate(start: Any, end: Any, progress: float) -> Any:
+    if isinstance(start, tuple) and isinstance(end, tuple):
+        return tuple(_interpolate(a, b, progress) for a, b in zip(start, end))
+    numbers = all(
+        isinstance(v, (int, float)) and not isinstance(v, bool) for v in (start, end)
+    )
+    if not numbers:
+        # Colors, text and flags switch at the next keyframe.
+        return start if progress < 1 else end
+    value = start + (end - start) * progress
+    # Whole-pixel values (positions, boxes) stay whole.
+    return round(value) if isinstance(start, int) and isinstance(end, int) else value
+
+
+@dataclass(frozen=True)
+class Track:
+    """The value of one layer property over time.
+
+    Args:
+        keyframes: (seconds, value) pairs in time order. Numbers and tuples
+                   of numbers are interpolated between keyframes (integers
+                   stay integers); other values hold until the next one.
+                   Values hold before the first and after the last keyframe.
+        easing: An EASINGS curve applied to every segment.
+    """
+
+    keyframes: tuple[tuple[float, Any], ...]
+    easing: str = "linear"
+
+    def __post_init__(self):
+        keyframes = tuple((float(t), value) for t, value in self.keyframes)
+        if not keyframes:
+            raise ValueError("A track needs at least one keyframe")
+        if any(a[0] > b[0] for a, b in zip(keyframes, keyframes[1:])):
+            raise ValueError("Keyframes must be in time order")
+        if self.easing not in EASINGS:
+            raise ValueError(f"Unknown easing '{self.easing}'. Available: {sorted(EASINGS)}")
+        object.__setattr__(self, "keyframes", keyframes)
+
+    def at(self, t: float) -> Any:
+        """The value at ``t`` seconds."""
+        keyframes = self.keyframes
+        if t <= keyframes[0][0]:
+            return keyframes[0][1]
+        for (start, value), (end, next_value) in zip(keyframes, keyframes[1:]):
+            if t < end:
+                progress = EASINGS[self.easing]((t - start) / (end - start))
+                return _interpolate(value, next_value, progress)
+        return keyframes[-1][1]
+
+
+def _reveal(text: str, fraction: float) -> str:
+    """The leading ``fraction`` of the words of ``text``.
+
+    Whole words are revealed so wrapped lines do not reflow as they grow.
+    """
+    ends = [match.end() for match in _WORD.finditer(text)]
+    shown = min(len(ends), math.floor(len(ends) * fraction + 1e-9))
+    return text[: ends[shown - 1]] if shown else ""
+
+
+@dataclass(frozen=True, eq=False)
+class Animated:
+    """A layer whose properties follow Tracks.
+
+    Track names are the layer's own fields (``position``, ``box``,
+    ``y_offset``, ``color``...) plus:
+        opacity: 0 to 1, for layers without an ``opacity`` field (drawn
+                 through Faded). At 0 the layer is left out.
+        reveal: Fraction of the words shown, for text layers.
+    """
+
+    layer: Layer
+    tracks: dict[str, Track]
+
+    def __post_init__(self):
+        names = {field.name for field in fields(self.layer)}
+        allowed = names | {"opacity"} | ({"reveal"} if "text" in names else set())
+        unknown = sorted(set(self.tracks) - allowed)
+        if unknown:
+            raise ValueError(
+                f"{type(self.layer).__name__} has no animatable {unknown}. "
+                f"Available: {sorted(allowed)}"
+            )
+
+    def at(self, t: float) -> Layer | None:
+        """The layer as it is at ``t`` seconds, or None while invisible."""
+        values = {name: track.at(t) for name, track in self.tracks.items()}
+        own_opacity = "opacity" in {field.name for field in fields(self.layer)}
+        opacity = 1.0 if own_opacity else values.pop("opacity", 1.0)
+        if "reveal" in values:
+            values["text"] = _reveal(self.layer.text, values.pop("reveal"))
+            if not values["text"]:
+                return None
+        if opacity <= 0:
+            return None
+        layer = replace(self.layer, **values) if values else self.layer
+        return Faded(layer, opacity) if opacity < 1 else layer
+
+
+class _TextMasks:
+    """Coverage masks of text runs, reused by frames that move or fade them.
+
+    A run drawn at a new position (a sliding title) or under a new
+    opacity is pasted from the mask rasterized for the first frame rather
+    than rasterized again. Pasting a color through the mask blends exactly
+    like drawing the text (see Scene.strips).
+    """
+
+    def __init__(self, maxsize: int = TEXT_MASK_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._masks = OrderedDict()
+        self._measure = ImageDraw.Draw(Image.new("RGB", (1, 1)))
+
+    def draw(self, layer: Layer, canvas: Image.Image, draw) -> None:
+        recorder = record_text(layer, canvas.size)
+        if recorder is None:
+            # Not text only (shapes, images): draw it directly.
+            layer.draw(canvas, draw)
+            return
+        for (x, y), text, fill, font, kwargs in recorder.runs:
+            left, top = math.floor(x), math.floor(y)
+            mask, offset = self._mask(text, font, (x - left, y - top), kwargs)
+            canvas.paste(fill, (left + offset[0], top + offset[1]), mask)
+
+    def _mask(self, text, font, origin, kwargs):
+        key = (text, id(font), origin, tuple(sorted(kwargs.items())))
+        entry = self._masks.get(key)
+        if entry is None:
+            left, top, right, bottom = self._measure.textbbox(origin, text, font=font, **kwargs)
+            mask = Image.new("L", (max(1, right - left), max(1, bottom - top)))
+            ImageDraw.Draw(mask).text(
+                (origin[0] - left, origin[1] - top), text, fill=255, font=font, **kwargs
+            )
+            # The font is kept so its id is not reused while cached.
+            entry = self._masks[key] = (mask, (left, top), font)
+            if len(self._masks) > self.maxsize:
+                self._masks.popitem(last=False)
+        else:
+            self._masks.move_to_end(key)
+        return entry[0], entry[1]
+
+
+@dataclass(frozen=True, eq=False)
+class _Reused(Layer):
+    """Draws a layer through _TextMasks."""
+
+    layer: Layer
+    masks: _TextMasks
+
+    def draw(self, canvas, draw):
+        self.masks.draw(self.layer, canvas, draw)
+
+    def bounds(self, size):
+        return self.layer.bounds(size)
+
+
+def _reuse(layer: Layer, masks: _TextMasks) -> Layer:
+    if isinstance(layer, Faded):
+        return replace(layer, layer=_reuse(layer.layer, masks))
+    return _Reused(layer, masks)
+
+
+@dataclass
+class AnimationFrame:
+    """A stored frame: the pixels of the region changed since the last one.
+
+    ``image`` is the RGB content of ``box``, shown for ``duration`` ms.
+    """
+
+    image: Image.Image
+    box: Box
+    duration: int
+
+
+class Animation:
+    """A scene with animated layers, rendered as a sequence of delta frames.
+
+    Layers are drawn in order over the scene's static layers; any leading
+    layers that are not Animated never change either and are rendered into
+    the cached scene base with them. A frame is drawn with a Compositor, so
+    it costs the area its layers cover rather than a full canvas, runs of
+    identical frames are drawn once, and text that only moves or fades is
+    rasterized once.
+    """
+
+    def __init__(
+        self,
+        scene: Scene,
+        layers: list[Layer | Animated],
+        duration: float,
+        fps: int = 30,
+    ):
+        if duration <= 0 or fps <= 0:
+            raise ValueError("Animations need a positive duration and frame rate")
+        static = 0
+        while static < len(layers) and not isinstance(layers[static], Animated):
+            static += 1
+        self.scene = Scene(scene.size, [*scene.layers, *layers[:static]])
+        self.layers = list(layers[static:])
+        self.size = self.scene.size
+        self.duration = duration
+        self.fps = fps
+
+    @property
+    def ticks(self) -> int:
+        """Number of frames before merging identical ones."""
+        return max(1, round(self.duration * self.fps))
+
+    def layers_at(self, t: float) -> list[Layer]:
+        """The layers drawn over the base at ``t`` seconds."""
+        layers = []
+        for layer in self.layers:
+            if isinstance(layer, Animated):
+                layer = layer.at(t)
+            if layer is not None:
+                layers.append(layer)
+        return layers
+
+    def render(self, t: float) -> Image.Image:
+        """A new image of the animation at ``t`` seconds."""
+        return self.scene.render(self.layers_at(t))
+
+    def _clock(self, tick: int) -> int:
+        # Frame times are rounded on the clock, not per frame, so the
+        # durations of merged frames do not drift.
+        return round(tick * 1000 / self.fps)
+
+    def _runs(self) -> Iterator[tuple[list[Layer], int]]:
+        """Layers and duration (ms) of each run of identical ticks."""
+        run = None
+        for tick in range(self.ticks):
+            layers = self.layers_at(tick / self.fps)
+            key = [layer.key() for layer in layers]
+            if run is not None:
+                if key == run[1]:
+                    continue
+                yield run[0], self._clock(tick) - self._clock(run[2])
+            run = (layers, key, tick)
+        yield run[0], self._clock(self.ticks) - self._clock(run[2])
+
+    def frames(self) -> Iterator[AnimationFrame]:
+        """Render the animation as delta frames.
+
+        The first frame is the whole canvas; each later one is the bounding
+        box of the pixels that changed since the previous frame, found by
+        comparing only the regions either frame drew. Frames that change
+        nothing extend the previous frame. Boxes start at even coordinates,
+        as animated WebP requires.
+        """
+        width, height = self.size
+        full = (0, 0, width, height)
+        compositor = self.scene.compositor()
+        masks = _TextMasks()
+        shown = pending = None
+        dirty = []
+        for layers, duration in self._runs():
+            canvas = compositor.render([_reuse(layer, masks) for layer in layers])
+            if shown is None:
+                shown = canvas.copy()
+                pending = AnimationFrame(canvas.copy(), full, duration)
+                dirty = compositor.dirty
+                continue
+            # Only what this frame or the previous one drew can differ.
+            regions = None
+            if dirty is not None and compositor.dirty is not None:
+                regions = dirty + compositor.dirty
+            dirty = compositor.dirty
+            box = _changed(shown, canvas, regions)
+            if box is None:
+                pending.duration += duration
+                continue
+            with span("animation.frame", pixels=(box[2] - box[0]) * (box[3] - box[1])):
+                shown.paste(canvas.crop(box), box[:2])
+            yield pending
+            pending = AnimationFrame(canvas.crop(box), box, duration)
+        yield pending
+
+
+def _changed(before: Image.Image, after: Image.Image, regions: list[Box] | None) -> Box | None:
+    """Even-aligned bounding box of the pixels that differ within ``regions``."""
+    if regions is None:
+        area = (0, 0, *after.size)
+    elif not regions:
+        return None
+    else:
+        area = (
+            min(box[0] for box in regions),
+            min(box[1] for box in regions),
+            max(box[2] for box in regions),
+            max(box[3] for box in regions),
+        )
+    diff = ImageChops.difference(before.crop(area), after.crop(area)).getbbox()
+    if diff is None:
+        return None
+    left, top = area[0] + diff[0], area[1] + diff[1]
+    return (left - left % 2, top - top % 2, area[0] + diff[2], area[1] + diff[3])
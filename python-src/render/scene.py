@@ -0,0 +1,658 @@
+import math
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from typing import Callable, Iterator
+
+from PIL import Image, ImageDraw
+
+from src.dependencies import merge, recording
+from src.profiling import span
+from src.utils.color import Color, to_rgb
+from src.utils.gradient import linear_gradient, linear_gradient_rows
+from src.utils.image import apply_overlay, compact_image
+from src.utils.layout import layout_text
+from src.utils.text import (
+    DEFAULT_FONT_SIZE,
+    SMALL_FONT_SIZE,
+    _load_font,
+    draw_text_centered,
+    draw_text_fitted,
+    draw_text_wrapped,
+    fit_text,
+)
+
+Box = tuple[int, int, int, int]
+
+# Anti-aliased text and stroked outlines can bleed slightly past their
+# nominal bounds; dirty regions are padded by this many pixels.
+DIRTY_PADDING = 4
+
+# Pixels per strip in Scene.strips: 6 MiB of RGB, whatever the canvas size.
+STRIP_PIXELS = 1 << 21
+
+# Largest text coverage mask Scene.strips rasterizes at full size (16 MiB).
+TEXT_MASK_PIXELS = 1 << 24
+
+# Draws the rows of a layer starting at ``top`` onto a strip of the canvas.
+StripDrawer = Callable[[Image.Image, ImageDraw.ImageDraw, int], None]
+
+
+class _Size:
+    """Stands in for the canvas while recording a layer's text."""
+
+    mode = "RGB"
+
+    def __init__(self, size: tuple[int, int]):
+        self.size = size
+        self.width, self.height = size
+
+
+class TextRecorder:
+    """Stands in for ImageDraw, recording ``text`` calls instead of drawing.
+
+    Each run is ``(xy, text, fill, font, kwargs)``. Measuring calls are
+    answered by ``measure``, a real ImageDraw on a 1x1 image, since they do
+    not depend on the canvas. Any other drawing call fails.
+    """
+
+    def __init__(self):
+        self.measure = ImageDraw.Draw(Image.new("RGB", (1, 1)))
+        self.runs = []
+
+    def text(self, xy, text, fill=None, font=None, **kwargs):
+        self.runs.append((xy, text, fill, font, kwargs))
+
+    def textbbox(self, *args, **kwargs):
+        return self.measure.textbbox(*args, **kwargs)
+
+    def textlength(self, *args, **kwargs):
+        return self.measure.textlength(*args, **kwargs)
+
+
+def record_text(layer: "Layer", size: tuple[int, int]) -> TextRecorder | None:
+    """The text runs a layer draws on a canvas of ``size``.
+
+    Returns None unless the layer is ``text_only``.
+    """
+    if not layer.text_only:
+        return None
+    recorder = TextRecorder()
+    layer.draw(_Size(size), recorder)
+    return recorder
+
+
+def _text_strip_drawer(layer: "Layer", size: tuple[int, int]) -> StripDrawer:
+    """Strip drawer for ``text_only`` layers.
+
+    Each text run is rasterized once into a coverage mask the size of its
+    bounding box, then filled into the strips it overlaps with its color,
+    which blends exactly like drawing the text on the full canvas. Runs
+    whose mask would exceed TEXT_MASK_PIXELS (titles on billboards) are
+    rasterized at a smaller font size instead and scaled up strip by strip.
+    """
+    recorder = record_text(layer, size)
+    measure = recorder.measure
+    runs = []
+    for xy, text, fill, font, kwargs in recorder.runs:
+        left, top, right, bottom = measure.textbbox(xy, text, font=font, **kwargs)
+        box = _clip((left, top, right, bottom), size)
+        if box is None:
+            continue
+        area = (right - left) * (bottom - top)
+        if area <= TEXT_MASK_PIXELS or not hasattr(font, "font_variant"):
+            mask = Image.new("L", (right - left, bottom - top))
+            ImageDraw.Draw(mask).text(
+                (xy[0] - left, xy[1] - top), text, fill=255, font=font, **kwargs
+            )
+            # Keep only the part on the canvas.
+            mask = mask.crop((box[0] - left, box[1] - top, box[2] - left, box[3] - top))
+            runs.append((box, fill, mask, None))
+            continue
+        factor = math.ceil(math.sqrt(area / TEXT_MASK_PIXELS))
+        small = font.font_variant(size=max(1, round(font.size / factor)))
+        s_left, s_top, s_right, s_bottom = measure.textbbox((0, 0), text, font=small, **kwargs)
+        mask = Image.new("L", (s_right - s_left, s_bottom - s_top))
+        ImageDraw.Draw(mask).text((-s_left, -s_top), text, fill=255, font=small, **kwargs)
+        # Maps canvas coordinates into the small mask.
+        scale = (mask.width / (right - left), mask.height / (bottom - top))
+        runs.append((box, fill, mask, (left, top, *scale)))
+
+    def draw_rows(canvas, draw, top):
+        bottom = top + canvas.height
+        for (left, y0, right, y1), fill, mask, source in runs:
+            if y1 <= top or y0 >= bottom:
+                continue
+            r0, r1 = max(y0, top), min(y1, bottom)
+            if source is None:
+                rows = mask.crop((0, r0 - y0, right - left, r1 - y0))
+            else:
+                x, y, sx, sy = source
+                region = ((left - x) * sx, (r0 - y) * sy, (right - x) * sx, (r1 - y) * sy)
+                rows = mask.resize((right - left, r1 - r0), Image.BICUBIC, box=region)
+            canvas.paste(fill, (left, r0 - top), rows)
+
+    return draw_rows
+
+
+class Layer(ABC):
+    """A declarative element of a scene, drawn onto an RGB canvas."""
+
+    # Solid colors and text only: a base made of flat layers is cached in an
+    # 8-bit mode (see Scene.base). Photographic layers set this to False.
+    flat = True
+
+    # Draws nothing but ``draw.text`` calls, so it can be recorded with a
+    # TextRecorder (see record_text).
+    text_only = False
+
+    @abstractmethod
+    def draw(self, canvas: Image.Image, draw: ImageDraw.ImageDraw) -> None:
+        """Draw the layer onto the canvas."""
+        ...
+
+    def bounds(self, size: tuple[int, int]) -> Box | None:
+        """Region the layer may touch, or None for the whole canvas."""
+        return None
+
+    def key(self) -> tuple:
+        """Hashable identity used to cache rendered scene bases."""
+        return (type(self).__name__, self)
+
+    def strip_drawer(self, size: tuple[int, int]) -> StripDrawer:
+        """Prepare to draw the layer strip by strip on a ``size`` canvas.
+
+        Returns a function drawing the rows from ``top`` onto a full-width
+        strip (see Scene.strips). Layers that support strip rendering
+        override it.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support strip rendering")
+
+
+@dataclass(frozen=True)
+class Fill(Layer):
+    """Solid background color."""
+
+    color: Color
+
+    def draw(self, canvas, draw):
+        canvas.paste(to_rgb(self.color), (0, 0, *canvas.size))
+
+    def strip_drawer(self, size):
+        return lambda canvas, draw, top: self.draw(canvas, draw)
+
+
+@dataclass(frozen=True)
+class Gradient(Layer):
+    """Linear gradient background (see src.utils.gradient)."""
+
+    stops: tuple
+    angle: float = 90
+
+    flat = False
+
+    def draw(self, canvas, draw):
+        canvas.paste(linear_gradient(canvas.size, self.stops, self.angle))
+
+    def strip_drawer(self, size):
+        def draw_rows(canvas, draw, top):
+            canvas.paste(
+                linear_gradient_rows(size, self.stops, self.angle, top, canvas.height)
+            )
+
+        return draw_rows
+
+
+@dataclass(frozen=True)
+class Rect(Layer):
+    """Filled and/or outlined rectangle."""
+
+    box: Box
+    fill: Color | None = None
+    outline: Color | None = None
+    width: int = 1
+
+    def draw(self, canvas, draw):
+        draw.rectangle(
+            [self.box[:2], self.box[2:]],
+            fill=to_rgb(self.fill) if self.fill is not None else None,
+            outline=to_rgb(self.outline) if self.outline is not None else None,
+            width=self.width,
+        )
+
+    def bounds(self, size):
+        left, top, right, bottom = self.box
+        return (left, top, right + 1, bottom + 1)
+
+    def strip_drawer(self, size):
+        left, top, right, bottom = self.box
+
+        def draw_rows(canvas, draw, y):
+            if bottom >= y and top < y + canvas.height:
+                replace(self, box=(left, top - y, right, bottom - y)).draw(canvas, draw)
+
+        return draw_rows
+
+
+@dataclass(frozen=True, eq=False)
+class ImageLayer(Layer):
+    """An image (e.g. an RGBA cutout or logo) pasted at a position."""
+
+    image: Image.Image
+    position: tuple[int, int] = (0, 0)
+    opacity: float = 1.0
+
+    flat = False
+
+    def draw(self, canvas, draw):
+        apply_overlay(canvas, self.image, self.position, self.opacity, in_place=True)
+
+    def bounds(self, size):
+        x, y = self.position
+        return (x, y, x + self.image.width, y + self.image.height)
+
+    def strip_drawer(self, size):
+        x, y = self.position
+
+        def draw_rows(canvas, draw, top):
+            apply_overlay(canvas, self.image, (x, y - top), self.opacity, in_place=True)
+
+        return draw_rows
+
+    def key(self):
+        # Images are compared by identity; the base cache keeps the layer
+        # (and so the image) alive while the key is in use.
+        return ("ImageLayer", id(self.image), self.position, self.opacity)
+
+
+@dataclass(frozen=True)
+class CenteredText(Layer):
+    """Single line of text centered on the canvas (see draw_text_centered)."""
+
+    text: str
+    color: Color = "#ffffff"
+    font_name: str | None = None
+    font_size: int = DEFAULT_FONT_SIZE
+    y_offset: int = 0
+
+    text_only = True
+
+    def draw(self, canvas, draw):
+        draw_text_centered(
+            draw,
+            self.text,
+            canvas.size,
+            color=self.color,
+            font_name=self.font_name,
+            font_size=self.font_size,
+            y_offset=self.y_offset,
+        )
+
+    def bounds(self, size):
+        font = _load_font(self.font_name, self.font_size)
+        left, top, right, bottom = font.getbbox(self.text)
+        x = (size[0] - (right - left)) // 2
+        y = (size[1] - (bottom - top)) // 2 + self.y_offset
+        return (x + left, y + top, x + right, y + bottom)
+
+    def strip_drawer(self, size):
+        return _text_strip_drawer(self, size)
+
+
+@dataclass(frozen=True)
+class WrappedText(Layer):
+    """Word-wrapped text block (see draw_text_wrapped)."""
+
+    text: str
+    max_width: int
+    position: tuple[int, int] = (0, 0)
+    color: Color = "#ffffff"
+    font_name: str | None = None
+    font_size: int = SMALL_FONT_SIZE
+    line_spacing: int = 8
+
+    text_only = True
+
+    def draw(self, canvas, draw):
+        draw_text_wrapped(
+            draw,
+            self.text,
+            max_width=self.max_width,
+            position=self.position,
+            color=self.color,
+            font_name=self.font_name,
+            font_size=self.font_size,
+            line_spacing=self.line_spacing,
+        )
+
+    def bounds(self, size):
+        font = _load_font(self.font_name, self.font_size)
+        layout = layout_text(self.text, font, self.max_width, self.line_spacing)
+        if not layout.lines:
+            return None
+        x, y = self.position
+        boxes = [
+            (x + dx + b[0], y + dy + b[1], x + dx + b[2], y + dy + b[3])
+            for (dx, dy), b in zip(layout.offsets, layout.bboxes)
+        ]
+        return (
+            min(b[0] for b in boxes),
+            min(b[1] for b in boxes),
+            max(b[2] for b in boxes),
+            max(b[3] for b in boxes),
+        )
+
+    def strip_drawer(self, size):
+        return _text_strip_drawer(self, size)
+
+
+@dataclass(frozen=True)
+class FittedText(Layer):
+    """Text at the largest size that fits a box (see draw_text_fitted)."""
+
+    text: str
+    box: Box
+    color: Color = "#ffffff"
+    font_name: str | None = None
+    max_lines: int = 1
+    min_size: int = 12
+    max_size: int | None = None
+    line_spacing: int = 8
+
+    text_only = True
+
+    def draw(self, canvas, draw):
+        draw_text_fitted(
+            draw,
+            self.text,
+            self.box,
+            color=self.color,
+            font_name=self.font_name,
+            max_lines=self.max_lines,
+            min_size=self.min_size,
+            max_size=self.max_size,
+            line_spacing=self.line_spacing,
+        )
+
+    def bounds(self, size):
+        # The ink is centered in the box as in draw_text_fitted, but at
+        # min_size text that does not fit can overflow it.
+        left, top, right, bottom = self.box
+        width, height = right - left, bottom - top
+        _, layout = fit_text(
+            self.text,
+            (width, height),
+            font_name=self.font_name,
+            max_lines=self.max_lines,
+            min_size=self.min_size,
+            max_size=self.max_size,
+            line_spacing=self.line_spacing,
+        )
+        if not layout.lines:
+            return None
+        y = top + (height - layout.height) // 2
+        lines = [(left + (width - (b[2] - b[0])) // 2, b[2] - b[0]) for b in layout.bboxes]
+        return (
+            min(x for x, _ in lines),
+            y,
+            max(x + w for x, w in lines),
+            y + layout.height,
+        )
+
+    def strip_drawer(self, size):
+        return _text_strip_drawer(self, size)
+
+
+@dataclass(frozen=True)
+class Faded(Layer):
+    """Another layer drawn at partial opacity (0 to 1) over what is below it."""
+
+    layer: Layer
+    opacity: float
+
+    @property
+    def flat(self):
+        return self.layer.flat
+
+    def draw(self, canvas, draw):
+        bounds = self.layer.bounds(canvas.size)
+        if bounds is None:
+            box = (0, 0, *canvas.size)
+        else:
+            box = _clip(bounds, canvas.size, DIRTY_PADDING)
+            if box is None:
+                return
+        below = canvas.crop(box)
+        self.layer.draw(canvas, draw)
+        canvas.paste(Image.blend(below, canvas.crop(box), self.opacity), box[:2])
+
+    def bounds(self, size):
+        return self.layer.bounds(size)
+
+    def strip_drawer(self, size):
+        inner = self.layer.strip_drawer(size)
+        bounds = self.layer.bounds(size)
+        box = (0, 0, *size) if bounds is None else _clip(bounds, size, DIRTY_PADDING)
+
+        def draw_rows(canvas, draw, top):
+            if box is None:
+                return
+            left, y0, right, y1 = box
+            r0, r1 = max(y0, top), min(y1, top + canvas.height)
+            if r1 <= r0:
+                return
+            # The rows of the box in this strip, blended as in draw().
+            region = (left, r0 - top, right, r1 - top)
+            below = canvas.crop(region)
+            inner(canvas, draw, top)
+            canvas.paste(Image.blend(below, canvas.crop(region), self.opacity), region[:2])
+
+        return draw_rows
+
+    def key(self):
+        return ("Faded", self.layer.key(), self.opacity)
+
+
+def _clip(box: Box, size: tuple[int, int], pad: int = 0) -> Box | None:
+    left = max(0, box[0] - pad)
+    top = max(0, box[1] - pad)
+    right = min(size[0], box[2] + pad)
+    bottom = min(size[1], box[3] + pad)
+    if right <= left or bottom <= top:
+        return None
+    return (left, top, right, bottom)
+
+
+class _BaseCache:
+    """Small LRU of rendered scene bases, shared by every Scene in the process.
+
+    A base made of flat layers is converted to an exact 8-bit image when it
+    is reused after other bases (e.g. by the next job in a worker), so
+    one-off renders and carousels reusing their own base skip the
+    conversion, and the bases a worker keeps take a third of the memory.
+    """
+
+    def __init__(self, maxsize: int = 16):
+        self.maxsize = maxsize
+        self._items: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """The cached (image, dependencies) for key, or None."""
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            # Only compact bases that outlive the render that drew them.
+            resident = key != next(reversed(self._items))
+            self._items.move_to_end(key)
+            self.hits += 1
+            layers, image, deps, flat = item
+            if flat and resident:
+                image = compact_image(image)
+                self._items[key] = (layers, image, deps, False)
+            return image, deps
+
+    def put(self, key, layers, image, deps, flat: bool = False) -> None:
+        with self._lock:
+            self._items[key] = (layers, image, deps, flat)
+            if len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self.hits = self.misses = 0
+
+
+base_cache = _BaseCache()
+
+
+class Scene:
+    """A canvas size plus the static layers shared by every render of it.
+
+    The static layers (background, fixed shapes, brand text) are rendered
+    once per distinct (size, layers) and cached; each render copies that
+    base and draws only the changing layers on top. Reused bases made only
+    of flat layers are cached as exact "P"/"L" images (a third of the RGB
+    size) and promoted to RGB when a render composites onto them.
+    """
+
+    def __init__(self, size: tuple[int, int], layers: list[Layer]):
+        self.size = tuple(size)
+        self.layers = list(layers)
+
+    def base(self) -> Image.Image:
+        """The rendered static layers. Shared and cached: do not modify.
+
+        Once reused after other bases, the image is in "P" or "L" mode if
+        the layers are flat and use at most 256 colors; paste or convert it
+        to get RGB.
+        """
+        key = (self.size, tuple(layer.key() for layer in self.layers))
+        cached = base_cache.get(key)
+        if cached is None:
+            # Files read while drawing (fonts) are kept with the base and
+            # replayed on hits, so dependency recording sees them too.
+            with span("scene.base", pixels=self.size[0] * self.size[1]), recording() as deps:
+                image = Image.new("RGB", self.size)
+                draw = ImageDraw.Draw(image)
+                for layer in self.layers:
+                    layer.draw(image, draw)
+            flat = all(layer.flat for layer in self.layers)
+            base_cache.put(key, self.layers, image, deps, flat)
+        else:
+            image, deps = cached
+        merge(deps)
+        return image
+
+    def _area(self, layers: list[Layer]) -> int:
+        """Pixels the layers may touch, for tracing."""
+        total = 0
+        for layer in layers:
+            box = layer.bounds(self.size)
+            box = _clip(box, self.size) if box is not None else (0, 0, *self.size)
+            if box is not None:
+                total += (box[2] - box[0]) * (box[3] - box[1])
+        return total
+
+    def render(self, layers: list[Layer] = ()) -> Image.Image:
+        """Return a new image: the cached base with ``layers`` drawn on top."""
+        base = self.base()
+        canvas = base.copy() if base.mode == "RGB" else base.convert("RGB")
+        if layers:
+            with span("scene.layers", pixels=self._area(layers)):
+                draw = ImageDraw.Draw(canvas)
+                for layer in layers:
+                    layer.draw(canvas, draw)
+        return canvas
+
+    def strips(
+        self, layers: list[Layer] = (), rows: int | None = None
+    ) -> Iterator[tuple[int, Image.Image]]:
+        """Render the scene top to bottom in full-width strips.
+
+        For canvases too large to hold in memory (print sizes): no full
+        canvas or base is ever allocated, so memory is bounded by the strip
+        size plus each text run's coverage mask, one byte per pixel of its
+        bounding box. Every layer is drawn, static or not, and the result
+        matches ``render(layers)`` pixel for pixel.
+
+        Args:
+            layers: Layers drawn over the scene's static layers.
+            rows: Rows per strip. Defaults to STRIP_PIXELS // width.
+
+        Yields:
+            (top, strip) pairs, where strip holds rows top to top + height.
+            The strip image is reused: consume it before the next one.
+        """
+        width, height = self.size
+        rows = rows or max(1, STRIP_PIXELS // width)
+        drawers = [layer.strip_drawer(self.size) for layer in (*self.layers, *layers)]
+        strip = Image.new("RGB", (width, min(rows, height)))
+        for top in range(0, height, rows):
+            if top + rows > height:
+                strip = Image.new("RGB", (width, height - top))
+            elif top:
+                strip.paste(0, (0, 0, *strip.size))
+            with span("scene.strip", pixels=strip.width * strip.height):
+                draw = ImageDraw.Draw(strip)
+                for draw_rows in drawers:
+                    draw_rows(strip, draw, top)
+            yield top, strip
+
+    def compositor(self) -> "Compositor":
+        """A compositor for rendering many frames of this scene in sequence."""
+        return Compositor(self)
+
+
+class Compositor:
+    """Render successive frames of a scene into one reused canvas.
+
+    Before each frame, only the regions touched by the previous frame's
+    layers are restored from the scene base, so a frame costs its dirty
+    area rather than a full-canvas copy. The returned canvas is reused by
+    the next call; copy it if it must outlive that.
+    """
+
+    def __init__(self, scene: Scene):
+        self.scene = scene
+        self._canvas: Image.Image | None = None
+        self._dirty: list[Box] | None = None
+
+    @property
+    def dirty(self) -> list[Box] | None:
+        """Regions the last frame drew over the base, or None for all of it.
+
+        Outside these boxes the frame equals ``scene.base()``.
+        """
+        return self._dirty
+
+    def render(self, layers: list[Layer]) -> Image.Image:
+        base = self.scene.base()
+        if self._canvas is None:
+            self._canvas = base.convert("RGB") if base.mode != "RGB" else base.copy()
+        elif self._dirty is None:
+            self._canvas.paste(base)
+        else:
+            for box in self._dirty:
+                self._canvas.paste(base.crop(box), box[:2])
+
+        dirty: list[Box] | None = []
+        with span("scene.layers", pixels=self.scene._area(layers)):
+            draw = ImageDraw.Draw(self._canvas)
+            for layer in layers:
+                layer.draw(self._canvas, draw)
+                bounds = layer.bounds(self.scene.size)
+                if bounds is None:
+                    dirty = None
+                elif dirty is not None:
+                    box = _clip(bounds, self.scene.size, DIRTY_PADDING)
+                    if box is not None:
+                        dirty.append(box)
+        self._dirty = dirty
+        return self._canvas
@@ -0,0 +1,290 @@
+import asyncio
+import json
+import logging
+import os
+import signal
+from concurrent.futures import ProcessPoolExecutor
+from http import HTTPStatus
+from pathlib import Path
+
+from config import Settings
+from src.batch import BatchJob, init_pool_worker, run_job
+
+logger = logging.getLogger(__name__)
+
+MAX_HEADER_BYTES = 64 * 1024
+MAX_BODY_BYTES = 1024 * 1024
+
+CONTENT_TYPES = {
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".webp": "image/webp",
+    ".pdf": "application/pdf",
+}
+
+
+class HTTPError(Exception):
+    """An error that is reported to the client as an HTTP status."""
+
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def _warm_worker() -> int:
+    """No-op job submitted at startup so every worker is spawned and initialized."""
+    return os.getpid()
+
+
+def _output_path(requested, output_dir: Path) -> str:
+    """Resolve a client's ``output_path`` inside ``output_dir``.
+
+    Absolute paths and ``..`` are refused, so clients cannot write outside it.
+    """
+    if not isinstance(requested, str) or not requested:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, "'output_path' must be a non-empty string")
+    path = Path(requested)
+    if path.is_absolute() or path.drive or ".." in path.parts:
+        raise HTTPError(
+            HTTPStatus.BAD_REQUEST, "'output_path' must be relative to the output directory"
+        )
+    return str(output_dir / path)
+
+
+def _render(job: BatchJob, return_bytes: bool) -> dict:
+    """Run a render job in a worker; optionally encode the result in memory."""
+    if return_bytes:
+        result = run_job(job, in_memory=True)
+        if not result.ok:
+            return {"error": result.error}
+        if len(result.outputs) != 1:
+            return {"error": "Byte responses need a single-image generator"}
+        requested = Path(job.params.get("output_path") or "")
+        suffix = requested.suffix or f".{Settings.OUTPUT_FORMAT}"
+        return {"bytes": result.outputs[0].getvalue(), "suffix": suffix}
+
+    result = run_job(job)
+    if not result.ok:
+        return {"error": result.error}
+    return {"paths": [str(p) for p in result.outputs], "elapsed": result.elapsed}
+
+
+class RenderServer:
+    """asyncio HTTP/JSON front end over a pool of pre-warmed render workers.
+
+    Endpoints:
+        GET  /health  - worker, queue and request counters.
+        POST /render  - ``{"generator": ..., "params": {...}, "return": "path"|"bytes"}``.
+
+    At most ``workers + queue_size`` renders are admitted at once; beyond
+    that requests get 503 so clients back off instead of piling up. A
+    render exceeding ``timeout`` seconds gets 504; the worker still finishes
+    the job, since processes cannot be interrupted mid-render, and it counts
+    as in flight until then.
+
+    A request's ``output_path`` is relative to ``output_dir`` (default
+    OUTPUT_DIR). Failed renders get 422 with the exception message only;
+    the traceback is logged.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 8765,
+        workers: int | None = None,
+        queue_size: int = 32,
+        timeout: float = 30.0,
+        use_cache: bool = False,
+        profile_dir: str | None = None,
+        output_dir: str | Path | None = None,
+    ):
+        self.host = host
+        self.port = port
+        self.workers = workers or os.cpu_count() or 1
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.use_cache = use_cache
+        self.profile_dir = profile_dir
+        self.output_dir = Path(output_dir or Settings.OUTPUT_DIR)
+        self.in_flight = 0
+        self.stats = {"served": 0, "rejected": 0, "timeouts": 0, "errors": 0}
+        self._pool: ProcessPoolExecutor | None = None
+        self._server: asyncio.AbstractServer | None = None
+
+    async def start(self) -> asyncio.AbstractServer:
+        """Start and warm the worker pool, then begin accepting connections."""
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=init_pool_worker,
+            initargs=(self.use_cache, self.profile_dir),
+        )
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(
+            *(loop.run_in_executor(self._pool, _warm_worker) for _ in range(self.workers))
+        )
+        self._server = await asyncio.start_server(
+            self._handle, self.host, self.port, limit=MAX_HEADER_BYTES
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self._server
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+
+    async def serve_forever(self) -> None:
+        """Serve until cancelled or sent SIGINT/SIGTERM, then stop the workers."""
+        server = await self.start()
+        task = asyncio.current_task()
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(signum, task.cancel)
+            except (NotImplementedError, RuntimeError):
+                pass  # Not supported on this platform/thread
+        try:
+            async with server:
+                await server.serve_forever()
+        except asyncio.CancelledError:
+            pass
+        finally:
+            await self.close()
+
+    async def _read_request(self, reader: asyncio.StreamReader):
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except asyncio.IncompleteReadError as exc:
+            if not exc.partial:
+                return None
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Incomplete request")
+        except asyncio.LimitOverrunError:
+            raise HTTPError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, "Headers too large")
+
+        request_line, *header_lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, path, version = request_line.split(" ")
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Malformed request line")
+        headers = {}
+        for line in header_lines:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get("content-length", 0))
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length")
+        if length < 0:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length")
+        if length > MAX_BODY_BYTES:
+            raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Body too large")
+        body = await reader.readexactly(length) if length else b""
+        keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+        return method, path, body, keep_alive
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                    if request is None:
+                        break
+                    method, path, body, keep_alive = request
+                    status, content_type, payload = await self._dispatch(method, path, body)
+                except HTTPError as exc:
+                    keep_alive = False
+                    status, content_type, payload = self._json_error(exc)
+                await self._respond(writer, status, content_type, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, writer, status, content_type, payload, keep_alive):
+        headers = [
+            f"HTTP/1.1 {status.value} {status.phrase}",
+            f"Content-Type: {content_type}",
+            f"Content-Length: {len(payload)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        ]
+        if status == HTTPStatus.SERVICE_UNAVAILABLE:
+            headers.append("Retry-After: 1")
+        writer.write(("\r\n".join(headers) + "\r\n\r\n").encode() + payload)
+        await writer.drain()
+
+    @staticmethod
+    def _json(status: HTTPStatus, data: dict):
+        return status, "application/json", json.dumps(data).encode()
+
+    def _json_error(self, exc: HTTPError):
+        return self._json(exc.status, {"error": exc.message})
+
+    async def _dispatch(self, method: str, path: str, body: bytes):
+        if path == "/health" and method == "GET":
+            return self._json(
+                HTTPStatus.OK,
+                {
+                    "workers": self.workers,
+                    "in_flight": self.in_flight,
+                    "capacity": self.workers + self.queue_size,
+                    **self.stats,
+                },
+            )
+        if path == "/render":
+            if method != "POST":
+                raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED, "Use POST")
+            return await self._render(body)
+        raise HTTPError(HTTPStatus.NOT_FOUND, f"No route for {path}")
+
+    def _job_done(self) -> None:
+        self.in_flight -= 1
+
+    async def _render(self, body: bytes):
+        try:
+            request = json.loads(body or b"{}")
+            job = BatchJob(
+                generator=request["generator"],
+                params=dict(request.get("params", {})),
+                id=request.get("id"),
+            )
+        except (ValueError, KeyError, TypeError):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Expected JSON with 'generator' and 'params'")
+        if "output_path" in job.params:
+            job.params["output_path"] = _output_path(job.params["output_path"], self.output_dir)
+        return_bytes = request.get("return", "path") == "bytes"
+
+        if self.in_flight >= self.workers + self.queue_size:
+            self.stats["rejected"] += 1
+            raise HTTPError(HTTPStatus.SERVICE_UNAVAILABLE, "Render queue is full")
+
+        loop = asyncio.get_running_loop()
+        self.in_flight += 1
+        submitted = self._pool.submit(_render, job, return_bytes)
+        # A job stays in flight until its worker is done with it, including
+        # after its request timed out (a job still queued is cancelled then).
+        submitted.add_done_callback(lambda _: loop.call_soon_threadsafe(self._job_done))
+        try:
+            result = await asyncio.wait_for(asyncio.wrap_future(submitted), self.timeout)
+        except asyncio.TimeoutError:
+            self.stats["timeouts"] += 1
+            raise HTTPError(HTTPStatus.GATEWAY_TIMEOUT, f"Render exceeded {self.timeout}s")
+
+        if "error" in result:
+            self.stats["errors"] += 1
+            logger.error("Render %s (%s) failed:\n%s", job.id, job.generator, result["error"])
+            # Only the exception line of a worker traceback goes to the client.
+            message = result["error"].strip().splitlines()[-1]
+            return self._json(HTTPStatus.UNPROCESSABLE_ENTITY, {"error": message})
+        self.stats["served"] += 1
+        if return_bytes:
+            content_type = CONTENT_TYPES.get(result["suffix"], "application/octet-stream")
+            return HTTPStatus.OK, content_type, result["bytes"]
+        return self._json(HTTPStatus.OK, {"id": job.id, **result})
@@ -1,30 +1,180 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from jinja2 import Environment, FileSystemLoader
+from typing import Iterable
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, meta
 
 from config import Settings
 
 
+def _context_key(context: dict) -> str | None:
+    """Stable hash of a render context, or None if it is not JSON data."""
+    try:
+        canonical = json.dumps(context, sort_keys=True, separators=(",", ":"))
+    except (TypeError, ValueError):
+        return None
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
 class TemplateEngine:
-    """Jinja2-based template engine for loading platform-specific templates."""
+    """Jinja2-based template engine for loading platform-specific templates.
+
+    Compiled templates are kept in memory by Jinja and, with
+    ``bytecode_cache``, on disk under ``CACHE_DIR/templates``, so a new
+    process skips parsing large templates (e.g. the HTML concepts in ads/).
+    Rendered output is memoized by (template, context) while the template
+    file, and every template it extends, includes or imports, is unchanged;
+    contexts that are not plain JSON data, and templates that reference
+    others by a computed name, are always rendered.
+    """
 
-    def __init__(self, settings: Settings):
-        self.templates_dir = settings.TEMPLATES_DIR
+    def __init__(
+        self,
+        settings: Settings,
+        templates_dir: str | Path | None = None,
+        bytecode_cache: bool = True,
+        render_cache_size: int = 128,
+    ):
+        self.templates_dir = Path(templates_dir or settings.TEMPLATES_DIR)
+        cache = None
+        if bytecode_cache:
+            cache_dir = Path(settings.CACHE_DIR) / "templates"
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            cache = FileSystemBytecodeCache(str(cache_dir))
         self.env = Environment(
             loader=FileSystemLoader(str(self.templates_dir)),
             autoescape=False,
+            bytecode_cache=cache,
         )
+        self.render_cache_size = render_cache_size
+        self._rendered: OrderedDict = OrderedDict()
+        # Template name -> (loaded template, names it references or None).
+        self._references: dict = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        # Template names, and the mtime of every directory they were listed
+        # from; adding or removing a file changes its directory's mtime.
+        self._index: list[str] | None = None
+        self._dir_mtimes: dict[str, int] = {}
+
+    def _index_stale(self) -> bool:
+        if self._index is None:
+            return True
+        for directory, mtime in self._dir_mtimes.items():
+            try:
+                if os.stat(directory).st_mtime_ns != mtime:
+                    return True
+            except OSError:
+                return True
+        return False
+
+    def _build_index(self) -> None:
+        names = []
+        mtimes = {}
+        for directory, subdirs, files in os.walk(self.templates_dir):
+            mtimes[directory] = os.stat(directory).st_mtime_ns
+            subdirs[:] = sorted(d for d in subdirs if not d.startswith("."))
+            relative = Path(directory).relative_to(self.templates_dir)
+            for name in sorted(files):
+                if not name.startswith("."):
+                    names.append((relative / name).as_posix())
+        self._index = names
+        self._dir_mtimes = mtimes
 
     def list_templates(self, platform: str | None = None) -> list[str]:
-        """List available templates, optionally filtered by platform."""
-        all_templates = self.env.list_templates()
+        """List available templates, optionally filtered by platform.
+
+        The directory tree is walked once and again only after a file is
+        added or removed. Hidden files such as .gitkeep are not listed.
+        """
+        with self._lock:
+            if self._index_stale():
+                self._build_index()
+            templates = self._index
         if platform:
-            return [t for t in all_templates if t.startswith(f"{platform}/")]
-        return all_templates
+            return [t for t in templates if t.startswith(f"{platform}/")]
+        return list(templates)
+
+    def _referenced(self, name: str, template) -> tuple[str, ...] | None:
+        """Names a template extends, includes or imports; None if computed."""
+        cached = self._references.get(name)
+        if cached is not None and cached[0] is template:
+            return cached[1]
+        source = self.env.loader.get_source(self.env, name)[0]
+        names = tuple(meta.find_referenced_templates(self.env.parse(source)))
+        if None in names:
+            names = None
+        self._references[name] = (template, names)
+        return names
+
+    def _load(self, template_name: str):
+        """The template and a snapshot of it and everything it references.
+
+        ``get_template`` reloads any edited file as a new object, so the
+        snapshot (name, template) pairs differ once any of them changed.
+        The snapshot is None when a reference cannot be followed.
+        """
+        template = self.env.get_template(template_name)
+        loaded = {template_name: template}
+        pending = [template_name]
+        while pending:
+            name = pending.pop()
+            names = self._referenced(name, loaded[name])
+            if names is None:
+                return template, None
+            for ref in names:
+                if ref not in loaded:
+                    loaded[ref] = self.env.get_template(ref)
+                    pending.append(ref)
+        return template, tuple(sorted(loaded.items()))
+
+    def _render(self, template, snapshot, template_name: str, context: dict) -> str:
+        key = _context_key(context)
+        if key is None or snapshot is None or not self.render_cache_size:
+            return template.render(**context)
+        key = (template_name, key)
+        with self._lock:
+            item = self._rendered.get(key)
+            # An edited template is reloaded as a new object; ignore old output.
+            if item is not None and item[0] == snapshot:
+                self._rendered.move_to_end(key)
+                self.hits += 1
+                return item[1]
+            self.misses += 1
+        output = template.render(**context)
+        with self._lock:
+            self._rendered[key] = (snapshot, output)
+            self._rendered.move_to_end(key)
+            if len(self._rendered) > self.render_cache_size:
+                self._rendered.popitem(last=False)
+        return output
 
     def render(self, template_name: str, **context) -> str:
         """Render a template with the given context variables."""
-        template = self.env.get_template(template_name)
-        return template.render(**context)
+        template, snapshot = self._load(template_name)
+        return self._render(template, snapshot, template_name, context)
+
+    def render_many(self, template_name: str, contexts: Iterable[dict]) -> list[str]:
+        """Render one template once per context.
+
+        The template and those it references are loaded and checked for
+        changes once for the whole batch rather than once per context.
+        """
+        template, snapshot = self._load(template_name)
+        return [self._render(template, snapshot, template_name, context) for context in contexts]
+
+    def clear_cache(self) -> None:
+        """Drop memoized output and the template index."""
+        with self._lock:
+            self._rendered.clear()
+            self._references.clear()
+            self._index = None
+            self.hits = self.misses = 0
 
     def get_template_path(self, platform: str, name: str) -> Path:
         """Get the full filesystem path for a template."""
@@ -1,13 +1,25 @@
-from src.utils.image import load_image, resize_image, apply_overlay
+from src.utils.image import (
+    load_image,
+    resize_image,
+    ResizePyramid,
+    apply_overlay,
+    apply_overlays,
+    encode_image,
+)
 from src.utils.text import draw_text_centered, draw_text_wrapped
-from src.utils.color import hex_to_rgb, adjust_brightness
+from src.utils.color import Palette, hex_to_rgb, adjust_brightness, palette_for
 
 __all__ = [
     "load_image",
     "resize_image",
+    "ResizePyramid",
     "apply_overlay",
+    "apply_overlays",
+    "encode_image",
     "draw_text_centered",
     "draw_text_wrapped",
     "hex_to_rgb",
     "adjust_brightness",
+    "Palette",
+    "palette_for",
 ]
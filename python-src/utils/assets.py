@@ -0,0 +1,171 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from PIL import Image
+
+from config import Settings
+from src.dependencies import is_recording, record_file
+from src.profiling import span
+from src.utils.image import ResizePyramid, atomic_save
+
+CUTOUT_PATTERN = "dhaval-*-nobg.png"
+
+# Decoded full-size sources kept for scaling to further heights.
+MAX_SOURCES = 4
+
+
+def _pose_name(path: Path) -> str:
+    """'dhaval-awestruck-new-nobg.png' -> 'awestruck'."""
+    name = path.stem.removeprefix("dhaval-").removesuffix("-nobg")
+    return name.removesuffix("-new")
+
+
+class CutoutLibrary:
+    """Decoded, trimmed and pre-scaled character cutouts.
+
+    Each cutout is scaled at most once per requested height: the source PNG
+    is decoded, cropped to its alpha bounding box, scaled (from a
+    ResizePyramid shared by every height of that source, so rendering one
+    pose at several platform sizes decodes it once) and written to a disk
+    cache, so later processes load a small pre-scaled PNG instead of the
+    full source.
+    Scaled images are kept in a bounded in-memory LRU and shared between
+    callers, who must treat them as read-only.
+    """
+
+    def __init__(
+        self,
+        source_dir: str | Path | None = None,
+        cache_dir: str | Path | None = None,
+        max_bytes: int = 256 * 1024 * 1024,
+    ):
+        self.source_dir = Path(source_dir or Settings.CUTOUTS_DIR)
+        self.cache_dir = Path(cache_dir or Settings.CACHE_DIR / "cutouts")
+        self.max_bytes = max_bytes
+        self._images: OrderedDict = OrderedDict()
+        self._bytes = 0
+        self._sources: dict[str, Path] | None = None
+        self._pyramids: OrderedDict = OrderedDict()
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.decodes = 0
+
+    def _index(self) -> dict[str, Path]:
+        if self._sources is None:
+            self._sources = {
+                _pose_name(path): path
+                for path in sorted(self.source_dir.glob(CUTOUT_PATTERN))
+            }
+        return self._sources
+
+    def poses(self) -> list[str]:
+        """Names of the available poses, e.g. 'awestruck', 'shrug'."""
+        return sorted(self._index())
+
+    def _source(self, pose: str) -> Path:
+        try:
+            return self._index()[pose]
+        except KeyError:
+            raise ValueError(
+                f"Unknown pose '{pose}'. Available: {self.poses()}"
+            ) from None
+
+    def _disk_path(self, source: Path, height: int | None) -> Path:
+        stat = source.stat()
+        fingerprint = hashlib.sha256(
+            f"{source.resolve()}:{stat.st_mtime_ns}:{stat.st_size}".encode()
+        ).hexdigest()[:16]
+        suffix = f"h{height}" if height else "full"
+        return self.cache_dir / f"{source.stem}-{fingerprint}-{suffix}.png"
+
+    def _pyramid(self, source: Path) -> ResizePyramid:
+        """The decoded source trimmed to its alpha bounds, as a pyramid."""
+        pyramid = self._pyramids.get(source)
+        if pyramid is not None:
+            self._pyramids.move_to_end(source)
+            return pyramid
+        self.decodes += 1
+        with Image.open(source) as image:
+            image = image.convert("RGBA")
+        bbox = image.getchannel("A").getbbox()
+        if bbox:
+            image = image.crop(bbox)
+        pyramid = ResizePyramid(image, reducing_gap=3.0)
+        self._pyramids[source] = pyramid
+        if len(self._pyramids) > MAX_SOURCES:
+            self._pyramids.popitem(last=False)
+        return pyramid
+
+    def _decode(self, source: Path, height: int | None) -> Image.Image:
+        pyramid = self._pyramid(source)
+        image = pyramid.levels[0]
+        if height and height != image.height:
+            width = max(1, round(image.width * height / image.height))
+            return pyramid.resize(width, height)
+        return image
+
+    def get(self, pose: str, height: int | None = None) -> Image.Image:
+        """Return a pose trimmed to its alpha bounds and scaled to ``height``.
+
+        The returned image is shared; copy it before modifying.
+        """
+        key = (pose, height)
+        if is_recording():
+            record_file(self._source(pose))
+        with self._lock:
+            image = self._images.get(key)
+            if image is not None:
+                self._images.move_to_end(key)
+                self.hits += 1
+                return image
+
+            source = self._source(pose)
+            disk_path = self._disk_path(source, height)
+            if disk_path.exists():
+                self.disk_hits += 1
+                with Image.open(disk_path) as cached:
+                    image = cached.convert("RGBA")
+            else:
+                with span("cutout.decode", pose=pose, height=height):
+                    image = self._decode(source, height)
+                    # A cache file: fast compression beats small size.
+                    atomic_save(image, disk_path, compress_level=1)
+
+            self._images[key] = image
+            self._bytes += image.width * image.height * 4
+            while self._bytes > self.max_bytes and len(self._images) > 1:
+                _, evicted = self._images.popitem(last=False)
+                self._bytes -= evicted.width * evicted.height * 4
+            return image
+
+    def warm(self, poses: list[str] | None = None, heights: list[int] = ()) -> None:
+        """Pre-scale poses at the given heights (all poses by default)."""
+        for pose in poses or self.poses():
+            for height in heights:
+                self.get(pose, height)
+
+    def stats(self) -> dict:
+        """Return cache counters and in-memory size."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "decodes": self.decodes,
+                "entries": len(self._images),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+_library: CutoutLibrary | None = None
+
+
+def get_cutout_library() -> CutoutLibrary:
+    """Process-wide CutoutLibrary using the configured directories."""
+    global _library
+    if _library is None:
+        _library = CutoutLibrary()
+    return _library
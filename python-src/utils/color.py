@@ -1,19 +1,42 @@
-def hex_to_rgb(hex_color: str) -> tuple[int, int, int]:
+from dataclasses import dataclass
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Mapping, Sequence
+
+RGB = tuple[int, int, int]
+Color = str | Sequence[int]
+
+WHITE: RGB = (255, 255, 255)
+BLACK: RGB = (0, 0, 0)
+
+# Tint and shade ramps run from the base color (step 0) to white/black.
+RAMP_STEPS = 10
+
+
+@lru_cache(maxsize=1024)
+def hex_to_rgb(hex_color: str) -> RGB:
     """Convert a hex color string like '#1a73e8' to an (R, G, B) tuple."""
     hex_color = hex_color.lstrip("#")
     return tuple(int(hex_color[i : i + 2], 16) for i in (0, 2, 4))
 
 
+def to_rgb(color: Color) -> RGB:
+    """An (R, G, B) tuple from a hex string or an RGB/RGBA sequence."""
+    if isinstance(color, str):
+        return hex_to_rgb(color)
+    return tuple(color[:3])
+
+
 def rgb_to_hex(r: int, g: int, b: int) -> str:
     """Convert RGB values to a hex color string."""
     return f"#{r:02x}{g:02x}{b:02x}"
 
 
 def adjust_brightness(
-    hex_color: str, factor: float
+    hex_color: Color, factor: float
 ) -> tuple[int, int, int]:
     """Adjust brightness of a hex color. factor > 1 brightens, < 1 darkens."""
-    r, g, b = hex_to_rgb(hex_color)
+    r, g, b = to_rgb(hex_color)
     return (
         min(255, int(r * factor)),
         min(255, int(g * factor)),
@@ -21,14 +44,116 @@ def adjust_brightness(
     )
 
 
+def _mix(c1: RGB, c2: RGB, ratio: float) -> RGB:
+    return (
+        int(c1[0] + (c2[0] - c1[0]) * ratio),
+        int(c1[1] + (c2[1] - c1[1]) * ratio),
+        int(c1[2] + (c2[2] - c1[2]) * ratio),
+    )
+
+
 def blend_colors(
-    color1: str, color2: str, ratio: float = 0.5
+    color1: Color, color2: Color, ratio: float = 0.5
 ) -> tuple[int, int, int]:
     """Blend two hex colors together. ratio=0 is all color1, ratio=1 is all color2."""
-    r1, g1, b1 = hex_to_rgb(color1)
-    r2, g2, b2 = hex_to_rgb(color2)
-    return (
-        int(r1 + (r2 - r1) * ratio),
-        int(g1 + (g2 - g1) * ratio),
-        int(b1 + (b2 - b1) * ratio),
-    )
+    return _mix(to_rgb(color1), to_rgb(color2), ratio)
+
+
+@lru_cache(maxsize=256)
+def blend_lut(color1: RGB, color2: RGB) -> tuple[RGB, ...]:
+    """256 colors blending color1 (index 0) into color2 (index 255)."""
+    return tuple(_mix(color1, color2, i / 255) for i in range(256))
+
+
+def lut_bands(lut: Sequence[RGB]) -> list[list[int]]:
+    """Split a 256-color LUT into per-band tables for ``Image.point``.
+
+    Map an 'L' image to RGB with
+    ``Image.merge("RGB", [l_image.point(band) for band in lut_bands(lut)])``.
+    """
+    return [[c[i] for c in lut] for i in range(3)]
+
+
+def lut_palette(lut: Sequence[RGB]) -> bytes:
+    """Flatten a 256-color LUT into the 768 bytes ``putpalette`` expects."""
+    return bytes(channel for color in lut for channel in color)
+
+
+@dataclass(frozen=True, eq=False)
+class Palette:
+    """Brand colors parsed once into read-only RGB tuples and ramps.
+
+    Index by color name (``palette["primary"]``) for an RGB tuple. Tint and
+    shade ramps are precomputed; blend LUTs between any two colors are
+    built on first use and shared.
+    """
+
+    colors: Mapping[str, RGB]
+    tints: Mapping[str, tuple[RGB, ...]]
+    shades: Mapping[str, tuple[RGB, ...]]
+
+    @classmethod
+    def compile(cls, hex_colors: Mapping[str, str]) -> "Palette":
+        """Compile a name -> hex color mapping (e.g. BrandConfig.colors)."""
+        colors = {name: to_rgb(value) for name, value in hex_colors.items()}
+
+        def ramp(rgb: RGB, target: RGB) -> tuple[RGB, ...]:
+            return tuple(_mix(rgb, target, i / RAMP_STEPS) for i in range(RAMP_STEPS + 1))
+
+        return cls(
+            colors=MappingProxyType(colors),
+            tints=MappingProxyType({n: ramp(c, WHITE) for n, c in colors.items()}),
+            shades=MappingProxyType({n: ramp(c, BLACK) for n, c in colors.items()}),
+        )
+
+    def __getitem__(self, name: str) -> RGB:
+        return self.colors[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.colors
+
+    def rgba(self, name: str, alpha: int = 255) -> tuple[int, int, int, int]:
+        return (*self.colors[name], alpha)
+
+    def tint(self, name: str, step: int) -> RGB:
+        """The color lightened ``step`` of RAMP_STEPS of the way to white."""
+        return self.tints[name][step]
+
+    def shade(self, name: str, step: int) -> RGB:
+        """The color darkened ``step`` of RAMP_STEPS of the way to black."""
+        return self.shades[name][step]
+
+    def _rgb(self, color: str | Sequence[int]) -> RGB:
+        # Palette names first, then hex strings / RGB sequences.
+        if isinstance(color, str) and color in self.colors:
+            return self.colors[color]
+        return to_rgb(color)
+
+    def lut(self, start: Color, end: Color) -> tuple[RGB, ...]:
+        """256-color blend LUT between two palette names or colors."""
+        return blend_lut(self._rgb(start), self._rgb(end))
+
+    def blend(self, start: Color, end: Color, ratio: float = 0.5) -> RGB:
+        """Blend via the LUT (ratio quantized to 1/255)."""
+        return self.lut(start, end)[round(min(max(ratio, 0.0), 1.0) * 255)]
+
+    def point_luts(self, start: Color, end: Color) -> list[list[int]]:
+        """Per-band ``Image.point`` tables mapping 'L' 0-255 from start to end."""
+        return lut_bands(self.lut(start, end))
+
+    def putpalette_data(self, start: Color, end: Color) -> bytes:
+        """768-byte ``putpalette`` data mapping index 0-255 from start to end."""
+        return lut_palette(self.lut(start, end))
+
+
+# Compiled palettes by BrandConfig.content_hash.
+_brand_palettes: dict[str, Palette] = {}
+
+
+def palette_for(brand) -> Palette:
+    """A BrandConfig's colors compiled into a Palette, once per brand content."""
+    key = brand.content_hash
+    palette = _brand_palettes.get(key)
+    if palette is None:
+        palette = _brand_palettes[key] = Palette.compile(brand.colors)
+    return palette
@@ -0,0 +1,204 @@
+import io
+import time
+from dataclasses import dataclass, field
+
+from PIL import Image
+
+from src.utils.image import pillow_format
+
+# Lowest quality the byte-size bisection will go down to, unless a profile
+# sets its own "min_quality".
+MIN_QUALITY = 40
+
+# WebP "auto" mode also tries a lossy encode for images with more colors
+# than this, keeping whichever is smaller.
+LOSSLESS_MAX_COLORS = 4096
+
+
+@dataclass
+class EncodeStats:
+    """What an optimized encode produced and how long it took."""
+
+    format: str
+    bytes: int
+    elapsed: float
+    options: dict = field(default_factory=dict)
+    baseline_bytes: int | None = None
+    over_budget: bool = False
+
+    @property
+    def saved(self) -> int | None:
+        """Bytes saved against the unoptimized encode, if it was measured."""
+        if self.baseline_bytes is None:
+            return None
+        return self.baseline_bytes - self.bytes
+
+    def summary(self) -> str:
+        text = f"{self.format} {self.bytes / 1024:.1f} KB in {self.elapsed * 1000:.0f} ms"
+        notes = [k for k in ("palette", "lossless", "progressive") if self.options.get(k)]
+        if "quality" in self.options and not self.options.get("lossless"):
+            notes.append(f"q{self.options['quality']}")
+        if notes:
+            text += f" ({', '.join(notes)})"
+        if self.saved is not None and self.baseline_bytes:
+            text += f", saved {self.saved / 1024:.1f} KB ({self.saved / self.baseline_bytes:.0%})"
+        if self.over_budget:
+            text += ", over byte budget"
+        return text
+
+
+def encoder_profile(settings, fmt: str, platform: str | None = None) -> dict:
+    """Encoder options for a format, with any per-platform overrides applied.
+
+    Args:
+        settings: Application settings (ENCODER_PROFILES and
+                  PLATFORM_ENCODER_PROFILES).
+        fmt: File extension, e.g. 'png'.
+        platform: A PLATFORM_DIMENSIONS key, e.g. 'youtube_thumbnail'.
+    """
+    profile = dict(settings.ENCODER_PROFILES.get(fmt, {}))
+    if platform:
+        profile.update(settings.PLATFORM_ENCODER_PROFILES.get(platform, {}))
+    return profile
+
+
+def _save(image: Image.Image, fmt: str, options: dict) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format=pillow_format(fmt), **options)
+    return buffer.getvalue()
+
+
+def _palette_image(image: Image.Image, max_source_colors: int) -> Image.Image | None:
+    """A 256-color palette (or 8-bit) version of a flat image, or None.
+
+    Images with at most 256 colors convert exactly. A ``max_source_colors``
+    above 256 opts in to a lossy median-cut palette for images with up to
+    that many colors (anti-aliased text on flat fills; expect channel
+    errors of about 7); beyond it (photos, gradients) quantizing would
+    band, so None is returned.
+    """
+    if image.mode in ("L", "P"):
+        # Already 8-bit (see compact_image).
+        return image
+    if image.mode != "RGB":
+        return None
+    colors = image.getcolors(max(max_source_colors, 256))
+    if colors is None:
+        return None
+    if len(colors) <= 256:
+        palette = Image.new("P", (1, 1))
+        palette.putpalette(bytes(c for _, rgb in colors for c in rgb))
+        return image.quantize(palette=palette, dither=Image.Dither.NONE)
+    return image.quantize(256, method=Image.Quantize.MEDIANCUT, dither=Image.Dither.NONE)
+
+
+def _fit_quality(
+    image: Image.Image, fmt: str, options: dict, max_bytes: int, min_quality: int
+) -> tuple[bytes, dict, bool]:
+    """Highest quality whose encode fits ``max_bytes``, found by bisection."""
+    quality = options.get("quality", 95)
+    data = _save(image, fmt, options)
+    if len(data) <= max_bytes:
+        return data, options, False
+
+    best = None
+    lo, hi = min_quality, quality - 1
+    while lo <= hi:
+        mid = (lo + hi) // 2
+        candidate = {**options, "quality": mid}
+        encoded = _save(image, fmt, candidate)
+        if len(encoded) <= max_bytes:
+            best = (encoded, candidate)
+            lo = mid + 1
+        else:
+            data, options = encoded, candidate
+            hi = mid - 1
+    if best is None:
+        return data, options, True
+    return best[0], best[1], False
+
+
+def encode_optimized(
+    image: Image.Image,
+    fmt: str,
+    profile: dict,
+    baseline: dict | None = None,
+) -> tuple[bytes, EncodeStats]:
+    """Encode an image with an encoder profile, smallest-first.
+
+    Profile keys (anything else is passed to ``Image.save``):
+        palette: PNG only; store flat images as 8-bit palette PNGs.
+        palette_max_colors: Source color count up to which palette applies
+                            (default 256, exact; higher values quantize).
+        lossless: WebP only; True, False or "auto" (lossless, or lossy if
+                  that is smaller for an image with many colors).
+        max_bytes: Byte budget; lossy formats bisect quality down to
+                   min_quality, PNG falls back to a 256-color palette.
+        min_quality: Lower bound for the bisection.
+
+    Args:
+        image: The PIL Image to encode.
+        fmt: File extension of the format, e.g. 'png'.
+        profile: Encoder options, usually from ``encoder_profile``.
+        baseline: If given, save options for a reference encode whose size
+                  is reported as ``EncodeStats.baseline_bytes``.
+
+    Returns:
+        The encoded bytes and their EncodeStats.
+    """
+    start = time.perf_counter()
+    options = dict(profile)
+    palette = options.pop("palette", False)
+    max_colors = options.pop("palette_max_colors", 256)
+    max_bytes = options.pop("max_bytes", None)
+    min_quality = options.pop("min_quality", MIN_QUALITY)
+    lossless = options.pop("lossless", False)
+    over_budget = False
+    used = dict(options)
+
+    if fmt == "png":
+        options.pop("quality", None)
+        source = _palette_image(image, max_colors) if palette else None
+        used = {**options, "palette": source is not None}
+        data = _save(source or image, fmt, options)
+        if max_bytes and len(data) > max_bytes and source is None:
+            # Over budget: accept a lossy 256-color palette.
+            quantized = image.quantize(256, method=Image.Quantize.FASTOCTREE)
+            data = _save(quantized, fmt, options)
+            used["palette"] = True
+        over_budget = bool(max_bytes) and len(data) > max_bytes
+    else:
+        data = None
+        if fmt == "webp" and lossless:
+            used = {**options, "lossless": True}
+            data = _save(image, fmt, used)
+        # Lossless is kept unless it busts the byte budget or, in "auto"
+        # mode, a photo-like image turns out smaller lossy.
+        try_lossy = (
+            data is None
+            or (max_bytes and len(data) > max_bytes)
+            or (lossless == "auto" and image.getcolors(LOSSLESS_MAX_COLORS) is None)
+        )
+        if try_lossy:
+            if max_bytes and "quality" in options:
+                lossy, lossy_used, over_budget = _fit_quality(
+                    image, fmt, options, max_bytes, min_quality
+                )
+            else:
+                lossy, lossy_used = _save(image, fmt, options), dict(options)
+                over_budget = bool(max_bytes) and len(lossy) > max_bytes
+            if data is None or len(lossy) < len(data):
+                data, used = lossy, lossy_used
+            else:
+                over_budget = bool(max_bytes) and len(data) > max_bytes
+
+    elapsed = time.perf_counter() - start
+    baseline_bytes = len(_save(image, fmt, baseline)) if baseline is not None else None
+    return data, EncodeStats(
+        format=fmt,
+        bytes=len(data),
+        elapsed=elapsed,
+        options=used,
+        baseline_bytes=baseline_bytes,
+        over_budget=over_budget,
+    )
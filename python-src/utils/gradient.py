@@ -0,0 +1,228 @@
+import math
+from functools import lru_cache
+from typing import Sequence
+
+from PIL import Image
+
+from src.profiling import span
+from src.utils.color import lut_palette, to_rgb
+
+Stops = tuple[tuple[float, tuple[int, int, int]], ...]
+
+
+def _is_pair(stop) -> bool:
+    return (
+        isinstance(stop, (tuple, list))
+        and len(stop) == 2
+        and isinstance(stop[1], (str, tuple, list))
+    )
+
+
+def normalize_stops(stops: Sequence) -> Stops:
+    """Normalize gradient stops to a hashable ((position, (r, g, b)), ...) tuple.
+
+    Stops may be bare colors (spaced evenly from 0 to 1) or (position, color)
+    pairs. Colors may be hex strings or RGB tuples.
+    """
+    if len(stops) < 2:
+        raise ValueError("A gradient needs at least two color stops")
+    if not any(_is_pair(s) for s in stops):
+        last = len(stops) - 1
+        stops = [(i / last, s) for i, s in enumerate(stops)]
+    normalized = []
+    for position, color in stops:
+        normalized.append((float(position), to_rgb(color)))
+    return tuple(sorted(normalized, key=lambda s: s[0]))
+
+
+def _sample(stops: Stops, t: float) -> tuple[int, int, int]:
+    """Color at position t, linearly interpolated between the enclosing stops."""
+    if t <= stops[0][0]:
+        return stops[0][1]
+    for (p0, c0), (p1, c1) in zip(stops, stops[1:]):
+        if t <= p1:
+            f = (t - p0) / (p1 - p0) if p1 > p0 else 1.0
+            return tuple(int(c0[i] + (c1[i] - c0[i]) * f) for i in range(3))
+    return stops[-1][1]
+
+
+def _ramp(stops: Stops, length: int) -> Image.Image:
+    """A length x 1 RGB strip whose pixel k has the color at t = k / length."""
+    data = bytearray()
+    for k in range(length):
+        data.extend(_sample(stops, k / length))
+    return Image.frombytes("RGB", (length, 1), bytes(data))
+
+
+def _colorize(t_map: Image.Image, stops: Stops) -> Image.Image:
+    """Map an 'L' image of positions (0-255 -> t 0-1) to colors via a palette."""
+    lut = [_sample(stops, v / 255) for v in range(256)]
+    indexed = t_map.copy()
+    indexed.putpalette(lut_palette(lut))
+    return indexed.convert("RGB")
+
+
+@lru_cache(maxsize=None)
+def _numpy():
+    """NumPy, imported on first use since it is slow to import, or None."""
+    try:
+        import numpy
+    except ImportError:  # NumPy is optional; Pillow-only paths are used instead.
+        return None
+    return numpy
+
+
+def _colorize_array(np, t, stops: Stops) -> Image.Image:
+    positions = [p for p, _ in stops]
+    channels = [
+        np.interp(t, positions, [c[i] for _, c in stops]).astype(np.uint8)
+        for i in range(3)
+    ]
+    return Image.fromarray(np.dstack(channels), "RGB")
+
+
+@lru_cache(maxsize=32)
+def _linear(size: tuple[int, int], stops: Stops, angle: float) -> Image.Image:
+    width, height = size
+    angle = angle % 360
+
+    # Axis-aligned gradients: one strip sampled per pixel along the axis,
+    # replicated across the other axis with a nearest-neighbour resize.
+    if angle in (0, 90, 180, 270):
+        vertical = angle in (90, 270)
+        length = height if vertical else width
+        strip = _ramp(stops, length)
+        if angle in (180, 270):
+            strip = strip.transpose(Image.FLIP_LEFT_RIGHT)
+        if vertical:
+            strip = strip.transpose(Image.TRANSPOSE)
+        return strip.resize(size, Image.NEAREST)
+
+    rad = math.radians(angle)
+    cos, sin = math.cos(rad), math.sin(rad)
+    extent = abs(width * cos) + abs(height * sin)
+
+    np = _numpy()
+    if np is not None:
+        xs = np.arange(width, dtype=np.float64) + 0.5 - width / 2
+        ys = np.arange(height, dtype=np.float64) + 0.5 - height / 2
+        t = (xs[None, :] * cos + ys[:, None] * sin) / extent + 0.5
+        return _colorize_array(np, t, stops)
+
+    # Pillow-only: a strip along the gradient axis, stretched into a band
+    # that covers the canvas once rotated, then center-cropped.
+    across = math.ceil(abs(width * sin) + abs(height * cos))
+    band = _ramp(stops, math.ceil(extent)).resize(
+        (math.ceil(extent), across), Image.NEAREST
+    )
+    rotated = band.rotate(-angle, resample=Image.BILINEAR, expand=True)
+    left = (rotated.width - width) // 2
+    top = (rotated.height - height) // 2
+    return rotated.crop((left, top, left + width, top + height))
+
+
+@lru_cache(maxsize=32)
+def _radial(
+    size: tuple[int, int], stops: Stops, center: tuple[float, float]
+) -> Image.Image:
+    width, height = size
+    cx, cy = center[0] * width, center[1] * height
+    # t reaches 1 at the farthest corner from the center.
+    fx = max(cx, width - cx) or 1
+    fy = max(cy, height - cy) or 1
+
+    np = _numpy()
+    if np is not None:
+        xs = (np.arange(width, dtype=np.float64) + 0.5 - cx) / fx
+        ys = (np.arange(height, dtype=np.float64) + 0.5 - cy) / fy
+        t = np.sqrt(xs[None, :] ** 2 + ys[:, None] ** 2) / math.sqrt(2)
+        return _colorize_array(np, t, stops)
+
+    t_map = Image.radial_gradient("L").resize(
+        (round(fx * 2), round(fy * 2)), Image.BILINEAR
+    )
+    left, top = round(fx - cx), round(fy - cy)
+    t_map = t_map.crop((left, top, left + width, top + height))
+    return _colorize(t_map, stops)
+
+
+def linear_gradient(
+    size: tuple[int, int], stops: Sequence, angle: float = 90
+) -> Image.Image:
+    """Render a linear gradient as an RGB image.
+
+    Args:
+        size: (width, height) of the image.
+        stops: Colors or (position, color) pairs, positions from 0 to 1.
+        angle: Direction in degrees, clockwise from left-to-right. 90 runs
+               top-to-bottom, 180 right-to-left, 270 bottom-to-top.
+
+    Results are memoized by (size, stops, angle); callers get a fresh copy
+    they are free to draw on.
+    """
+    with span("gradient", pixels=size[0] * size[1]):
+        return _linear(tuple(size), normalize_stops(stops), float(angle)).copy()
+
+
+@lru_cache(maxsize=8)
+def _axis_ramp(stops: Stops, length: int, reverse: bool) -> Image.Image:
+    strip = _ramp(stops, length)
+    return strip.transpose(Image.FLIP_LEFT_RIGHT) if reverse else strip
+
+
+def linear_gradient_rows(
+    size: tuple[int, int], stops: Sequence, angle: float, top: int, rows: int
+) -> Image.Image:
+    """Rows ``top`` to ``top + rows`` of ``linear_gradient(size, stops, angle)``.
+
+    Used to render very large canvases strip by strip: axis-aligned
+    gradients, and any angle when NumPy is installed, are computed for the
+    rows alone. The Pillow-only path for other angles crops the full
+    gradient.
+    """
+    width, height = size
+    stops = normalize_stops(stops)
+    angle = float(angle) % 360
+    with span("gradient", pixels=width * rows):
+        if angle in (90, 270):
+            ramp = _axis_ramp(stops, height, angle == 270)
+            column = ramp.crop((top, 0, top + rows, 1)).transpose(Image.TRANSPOSE)
+            return column.resize((width, rows), Image.NEAREST)
+        if angle in (0, 180):
+            return _axis_ramp(stops, width, angle == 180).resize((width, rows), Image.NEAREST)
+        np = _numpy()
+        if np is None:
+            # Uncached: a full canvas-sized gradient is not worth keeping.
+            full = _linear.__wrapped__(tuple(size), stops, angle)
+            return full.crop((0, top, width, top + rows))
+        rad = math.radians(angle)
+        cos, sin = math.cos(rad), math.sin(rad)
+        extent = abs(width * cos) + abs(height * sin)
+        xs = np.arange(width, dtype=np.float64) + 0.5 - width / 2
+        ys = np.arange(top, top + rows, dtype=np.float64) + 0.5 - height / 2
+        t = (xs[None, :] * cos + ys[:, None] * sin) / extent + 0.5
+        return _colorize_array(np, t, stops)
+
+
+def radial_gradient(
+    size: tuple[int, int],
+    stops: Sequence,
+    center: tuple[float, float] = (0.5, 0.5),
+) -> Image.Image:
+    """Render a radial gradient as an RGB image.
+
+    Args:
+        size: (width, height) of the image.
+        stops: Colors or (position, color) pairs, positions from 0 to 1.
+        center: Center as fractions of width and height. Position 1 lies on
+                the farthest corner.
+    """
+    with span("gradient", pixels=size[0] * size[1]):
+        return _radial(tuple(size), normalize_stops(stops), tuple(center)).copy()
+
+
+def clear_gradient_cache() -> None:
+    """Drop all memoized gradients."""
+    _linear.cache_clear()
+    _radial.cache_clear()
+    _axis_ramp.cache_clear()
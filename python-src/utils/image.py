@@ -1,6 +1,12 @@
+import io
+import os
+import stat
+import tempfile
+from functools import lru_cache
 from pathlib import Path
+from typing import Callable
 
-from PIL import Image
+from PIL import Image, ImageChops
 
 
 def load_image(path: str | Path) -> Image.Image:
@@ -8,8 +14,148 @@ def load_image(path: str | Path) -> Image.Image:
     return Image.open(str(path)).convert("RGBA")
 
 
+# Read once at import: os.umask can only be queried by setting it, which
+# is not safe while export threads are creating files.
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def _file_mode(path: Path) -> int:
+    """Mode for a new file at path: the existing file's, else 0666 less umask."""
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except OSError:
+        return 0o666 & ~_UMASK
+
+
+def atomic_write(path: str | Path, writer: Callable[[str], None]) -> Path:
+    """Write a file via a temp file in the same directory and an atomic rename.
+
+    ``writer`` is called with the temp file's path and must write the whole
+    file there. Readers never see a half-written file, and a target that is
+    a hardlink (e.g. into the render cache) is replaced rather than
+    rewritten in place.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.stem}.", suffix=path.suffix)
+    os.close(fd)
+    try:
+        writer(tmp)
+        # mkstemp creates the file 0600; give it the mode a plain save would.
+        os.chmod(tmp, _file_mode(path))
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    return path
+
+
+def atomic_save(image: Image.Image, path: str | Path, **save_kwargs) -> Path:
+    """Save an image with the guarantees of atomic_write."""
+    return atomic_write(path, lambda tmp: image.save(tmp, **save_kwargs))
+
+
+def atomic_write_bytes(path: str | Path, data: bytes | memoryview) -> Path:
+    """Write already-encoded bytes with the guarantees of atomic_write."""
+    return atomic_write(path, lambda tmp: Path(tmp).write_bytes(data))
+
+
+def pillow_format(ext: str) -> str:
+    """Pillow format name for a file extension, e.g. 'jpg' -> 'JPEG'."""
+    ext = "." + ext.lower().lstrip(".")
+    try:
+        return Image.registered_extensions()[ext]
+    except KeyError:
+        raise ValueError(f"No image format for extension '{ext}'") from None
+
+
+def encode_image(image: Image.Image, fmt: str, **save_kwargs) -> io.BytesIO:
+    """Encode an image into an in-memory buffer, rewound to the start.
+
+    Args:
+        image: The PIL Image to encode.
+        fmt: File extension of the format, e.g. 'png' or 'jpg'.
+        **save_kwargs: Passed to ``Image.save`` (e.g. quality).
+    """
+    buffer = io.BytesIO()
+    image.save(buffer, format=pillow_format(fmt), **save_kwargs)
+    buffer.seek(0)
+    return buffer
+
+
+def compact_image(image: Image.Image) -> Image.Image:
+    """An exact 8-bit ("L" or "P") copy of a flat RGB image.
+
+    Solid fills, shapes and anti-aliased text on them usually use at most
+    256 colors and take a third of the memory this way; ``convert("RGB")``
+    restores the original pixels. Other images (photos, gradients) are
+    returned unchanged. Converting a large image takes tens of
+    milliseconds, so this suits images that are kept and reused.
+    """
+    if image.mode != "RGB":
+        return image
+    colors = image.getcolors(256)
+    if colors is None:
+        return image
+    if all(r == g == b for _, (r, g, b) in colors):
+        # Grays convert exactly (the luma weights sum to 1).
+        return image.convert("L")
+    # Pillow's palette lookup is approximate, but max-coverage quantizing
+    # keeps every color when there are no more than requested; check anyway.
+    compact = image.quantize(
+        len(colors), method=Image.Quantize.MAXCOVERAGE, dither=Image.Dither.NONE
+    )
+    if ImageChops.difference(compact.convert("RGB"), image).getbbox() is not None:
+        return image
+    return compact
+
+
+class ResizePyramid:
+    """An image and its successive 2x reductions, for resizing to many sizes.
+
+    Levels are made with ``Image.reduce(2)``, each from the one above, and
+    only as far down as the requested sizes need. A resize starts from the
+    smallest level at least ``reducing_gap`` times the target size, so the
+    LANCZOS pass never works on more pixels than that however small the
+    target. As with Pillow's own ``reducing_gap``, larger gaps trade speed
+    for quality. Levels are shared by every resize; treat them as read-only.
+    """
+
+    def __init__(self, image: Image.Image, reducing_gap: float = 1.0):
+        self.levels = [image]
+        self.reducing_gap = reducing_gap
+
+    @property
+    def size(self) -> tuple[int, int]:
+        return self.levels[0].size
+
+    def level_for(self, width: int, height: int) -> Image.Image:
+        """The level a ``width`` x ``height`` resize starts from."""
+        min_width = width * self.reducing_gap
+        min_height = height * self.reducing_gap
+        index = 0
+        while True:
+            if index + 1 == len(self.levels):
+                last = self.levels[index]
+                if last.width // 2 < min_width or last.height // 2 < min_height:
+                    return last
+                self.levels.append(last.reduce(2))
+            following = self.levels[index + 1]
+            if following.width < min_width or following.height < min_height:
+                return self.levels[index]
+            index += 1
+
+    def resize(self, width: int, height: int) -> Image.Image:
+        """A new image of the source resized to exactly ``width`` x ``height``."""
+        level = self.level_for(width, height)
+        if level.size == (width, height):
+            return level.copy()
+        return level.resize((width, height), Image.LANCZOS)
+
+
 def resize_image(
-    image: Image.Image,
+    image: Image.Image | ResizePyramid,
     width: int,
     height: int,
     method: str = "cover",
@@ -17,27 +163,65 @@ def resize_image(
     """Resize an image using the specified method.
 
     Args:
-        image: Source PIL Image.
+        image: Source PIL Image, or a ResizePyramid of it when the same
+               source is resized to several sizes.
         width: Target width.
         height: Target height.
         method: 'cover' crops to fill, 'contain' fits within bounds.
     """
+    if isinstance(image, ResizePyramid):
+        scale = image.resize
+    else:
+        def scale(w, h):
+            return image.resize((w, h), Image.LANCZOS)
+
+    source_width, source_height = image.size
     if method == "cover":
-        ratio = max(width / image.width, height / image.height)
-        resized = image.resize(
-            (int(image.width * ratio), int(image.height * ratio)),
-            Image.LANCZOS,
+        ratio = max(width / source_width, height / source_height)
+        # max() guards against float error leaving an edge 1px short.
+        resized = scale(
+            max(width, int(source_width * ratio)), max(height, int(source_height * ratio))
         )
         left = (resized.width - width) // 2
         top = (resized.height - height) // 2
         return resized.crop((left, top, left + width, top + height))
 
     # contain
-    ratio = min(width / image.width, height / image.height)
-    return image.resize(
-        (int(image.width * ratio), int(image.height * ratio)),
-        Image.LANCZOS,
-    )
+    ratio = min(width / source_width, height / source_height)
+    return scale(int(source_width * ratio), int(source_height * ratio))
+
+
+@lru_cache(maxsize=256)
+def _opacity_lut(opacity: float) -> tuple[int, ...]:
+    """256-entry table scaling an alpha channel by ``opacity``."""
+    return tuple(int(p * opacity) for p in range(256))
+
+
+def _paste_overlay(
+    base: Image.Image,
+    overlay: Image.Image,
+    position: tuple[int, int],
+    opacity: float,
+) -> None:
+    """Blend overlay into base in place, touching only the overlapped region."""
+    x, y = position
+    left, top = max(0, -x), max(0, -y)
+    right = min(overlay.width, base.width - x)
+    bottom = min(overlay.height, base.height - y)
+    if right <= left or bottom <= top:
+        return
+    if (left, top, right, bottom) != (0, 0, overlay.width, overlay.height):
+        overlay = overlay.crop((left, top, right, bottom))
+
+    if overlay.mode in ("RGBA", "LA"):
+        mask = overlay.getchannel("A")
+        if opacity < 1.0:
+            mask = mask.point(_opacity_lut(opacity))
+    elif opacity < 1.0:
+        mask = Image.new("L", overlay.size, int(255 * opacity))
+    else:
+        mask = None
+    base.paste(overlay, (x + left, y + top), mask)
 
 
 def apply_overlay(
@@ -45,13 +229,32 @@ def apply_overlay(
     overlay: Image.Image,
     position: tuple[int, int] = (0, 0),
     opacity: float = 1.0,
+    in_place: bool = False,
+) -> Image.Image:
+    """Composite an overlay image onto a base image with optional opacity.
+
+    Only the region where the overlay overlaps the base is processed. With
+    ``in_place=True`` the base itself is modified and returned instead of a
+    copy.
+    """
+    result = base if in_place else base.copy()
+    _paste_overlay(result, overlay, position, opacity)
+    return result
+
+
+def apply_overlays(
+    base: Image.Image,
+    overlays: list[tuple],
+    in_place: bool = False,
 ) -> Image.Image:
-    """Composite an overlay image onto a base image with optional opacity."""
-    if opacity < 1.0:
-        overlay = overlay.copy()
-        alpha = overlay.getchannel("A")
-        alpha = alpha.point(lambda p: int(p * opacity))
-        overlay.putalpha(alpha)
-    result = base.copy()
-    result.paste(overlay, position, overlay)
+    """Composite several overlays in order, copying the base at most once.
+
+    Args:
+        base: Image to composite onto.
+        overlays: (image, position) or (image, position, opacity) tuples.
+        in_place: Modify base directly instead of a copy.
+    """
+    result = base if in_place else base.copy()
+    for image, position, *rest in overlays:
+        _paste_overlay(result, image, position, rest[0] if rest else 1.0)
     return result
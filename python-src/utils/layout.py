@@ -0,0 +1,200 @@
+import threading
+from bisect import bisect_right
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable
+
+from PIL import ImageFont
+
+from src.profiling import span
+
+Font = ImageFont.FreeTypeFont | ImageFont.ImageFont
+
+
+@dataclass(frozen=True)
+class TextLayout:
+    """Result of laying out text: lines, their placement and overall size.
+
+    ``offsets`` are line origins relative to the layout origin, and
+    ``bboxes`` are each line's ink bounding box relative to its own origin
+    (as returned by ``font.getbbox``).
+    """
+
+    lines: tuple[str, ...]
+    offsets: tuple[tuple[int, int], ...]
+    bboxes: tuple[tuple[int, int, int, int], ...]
+    width: int
+    height: int
+
+
+def font_key(font: Font) -> tuple:
+    """Hashable identity for a font: (path, size, index) for TrueType fonts."""
+    path = getattr(font, "path", None)
+    if path is None:
+        return ("default", id(font))
+    return (path, font.size, getattr(font, "index", 0))
+
+
+def _greedy(
+    widths: list[float], space: float, max_width: float, fits: Callable[[int, int], bool]
+) -> list[int]:
+    """Break points (end index of each line) for greedy wrapping.
+
+    With cumulative widths ``edges[k] = sum(widths[:k]) + space * k``, the
+    line starting at word i can run to about the last j where
+    ``edges[j] - edges[i] - space <= max_width``; that j is found by
+    bisection. Advance widths ignore kerning and side bearings, so the
+    estimate is then corrected with ``fits(i, j)``, which measures the ink
+    of the joined line: a line takes words while its ink fits.
+    """
+    edges = [0.0]
+    for width in widths:
+        edges.append(edges[-1] + width + space)
+
+    breaks = []
+    start = 0
+    n = len(widths)
+    while start < n:
+        end = bisect_right(edges, edges[start] + space + max_width) - 1
+        # A word wider than the line still gets a line of its own.
+        end = min(max(end, start + 1), n)
+        while end > start + 1 and not fits(start, end):
+            end -= 1
+        while end < n and fits(start, end + 1):
+            end += 1
+        breaks.append(end)
+        start = end
+    return breaks
+
+
+def _optimal(widths: list[float], space: float, max_width: float) -> list[int]:
+    """Break points minimizing the sum of squared trailing space (last line free)."""
+    n = len(widths)
+    cost = [0.0] * (n + 1)
+    choice = [n] * (n + 1)
+    for i in range(n - 1, -1, -1):
+        cost[i] = float("inf")
+        line = -space
+        for j in range(i + 1, n + 1):
+            line += widths[j - 1] + space
+            if line > max_width and j > i + 1:
+                break
+            slack = 0.0 if j == n else (max_width - line) ** 2
+            if slack + cost[j] < cost[i]:
+                cost[i] = slack + cost[j]
+                choice[i] = j
+    breaks = []
+    i = 0
+    while i < n:
+        i = choice[i]
+        breaks.append(i)
+    return breaks
+
+
+def _layout(
+    text: str,
+    font: Font,
+    max_width: int | None,
+    line_spacing: int,
+    wrap: str,
+) -> TextLayout:
+    lines: list[str] = []
+    if max_width is None:
+        lines = text.split("\n")
+    else:
+        # Wrapped text is a run of words: newlines are whitespace like any other.
+        words = text.split()
+        space = font.getlength(" ")
+        word_widths: dict[str, float] = {}
+        widths = []
+        for word in words:
+            if word not in word_widths:
+                word_widths[word] = font.getlength(word)
+            widths.append(word_widths[word])
+
+        def fits(start: int, end: int) -> bool:
+            bbox = font.getbbox(" ".join(words[start:end]))
+            return bbox[2] - bbox[0] <= max_width
+
+        if wrap == "optimal":
+            breaks = _optimal(widths, space, max_width)
+        else:
+            breaks = _greedy(widths, space, max_width, fits)
+        start = 0
+        for end in breaks:
+            lines.append(" ".join(words[start:end]))
+            start = end
+
+    offsets = []
+    bboxes = []
+    y = 0
+    width = 0
+    for line in lines:
+        bbox = font.getbbox(line)
+        offsets.append((0, y))
+        bboxes.append(bbox)
+        width = max(width, bbox[2] - bbox[0])
+        y += (bbox[3] - bbox[1]) + line_spacing
+    height = y - line_spacing if lines else 0
+    return TextLayout(tuple(lines), tuple(offsets), tuple(bboxes), width, height)
+
+
+class _LayoutCache:
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._items: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_build(self, key, build):
+        with self._lock:
+            layout = self._items.get(key)
+            if layout is not None:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return layout
+            self.misses += 1
+        layout = build()
+        with self._lock:
+            self._items[key] = layout
+            if len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+        return layout
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self.hits = self.misses = 0
+
+
+layout_cache = _LayoutCache()
+
+
+def layout_text(
+    text: str,
+    font: Font,
+    max_width: int | None = None,
+    line_spacing: int = 8,
+    wrap: str = "greedy",
+) -> TextLayout:
+    """Lay out text in a font, wrapping words to ``max_width`` if given.
+
+    Words are wrapped as a single run; newlines in wrapped text are
+    whitespace. Word widths are measured once with ``font.getlength``.
+    Greedy wrapping (the default) estimates each break from those widths and
+    confirms it by measuring the joined line's ink, so a line holds the
+    words whose ink fits ``max_width``. ``wrap="optimal"`` minimizes ragged
+    line ends using the advance widths alone. Without ``max_width`` each
+    newline starts a line. Layouts are memoized by (text, font, max_width,
+    line_spacing, wrap).
+    """
+    if wrap not in ("greedy", "optimal"):
+        raise ValueError(f"Unknown wrap mode '{wrap}'. Use 'greedy' or 'optimal'.")
+    key = (text, font_key(font), max_width, line_spacing, wrap)
+
+    def build() -> TextLayout:
+        with span("text.layout", chars=len(text)):
+            return _layout(text, font, max_width, line_spacing, wrap)
+
+    return layout_cache.get_or_build(key, build)
@@ -0,0 +1,251 @@
+import struct
+import zlib
+from pathlib import Path
+from typing import BinaryIO, Iterable
+
+from PIL import Image, ImageChops
+
+from src.utils.image import atomic_write
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# PNG row filter 2 ("Up"): each byte minus the byte above it.
+_PNG_FILTER_UP = 2
+
+# TIFF field types.
+_SHORT, _LONG, _RATIONAL = 3, 4, 5
+
+# TIFF compression values for the ``compression`` option, named as in Pillow.
+_TIFF_COMPRESSION = {"raw": 1, "tiff_adobe_deflate": 8}
+
+
+def _check_strip(strip: Image.Image, width: int, row: int, height: int) -> None:
+    if strip.mode != "RGB" or strip.width != width:
+        raise ValueError(f"Strips must be RGB and {width} pixels wide")
+    if row + strip.height > height:
+        raise ValueError(f"Strips exceed the image height of {height} rows")
+
+
+class PngStripWriter:
+    """Write an RGB PNG from strips of rows, without holding the whole image.
+
+    Rows use the "Up" filter, computed for a strip at a time with Pillow, so
+    repeated rows of flat graphics compress to almost nothing.
+    """
+
+    def __init__(
+        self,
+        file: BinaryIO,
+        size: tuple[int, int],
+        dpi: int | None = None,
+        compress_level: int = 6,
+    ):
+        self.file = file
+        self.size = tuple(size)
+        self.rows = 0
+        self._compressor = zlib.compressobj(compress_level)
+        self._previous: Image.Image | None = None
+        width, height = self.size
+        file.write(_PNG_SIGNATURE)
+        self._chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+        if dpi:
+            per_metre = round(dpi / 0.0254)
+            self._chunk(b"pHYs", struct.pack(">IIB", per_metre, per_metre, 1))
+
+    def _chunk(self, kind: bytes, data: bytes) -> None:
+        self.file.write(struct.pack(">I", len(data)))
+        self.file.write(kind)
+        self.file.write(data)
+        self.file.write(struct.pack(">I", zlib.crc32(data, zlib.crc32(kind))))
+
+    def write(self, strip: Image.Image) -> None:
+        """Append the next rows of the image."""
+        width, height = self.size
+        _check_strip(strip, width, self.rows, height)
+        rows = strip.height
+        # The row above each row; zeros above the first row of the image.
+        above = Image.new("RGB", strip.size)
+        if self._previous is not None:
+            above.paste(self._previous, (0, 0))
+        if rows > 1:
+            above.paste(strip.crop((0, 0, width, rows - 1)), (0, 1))
+        self._previous = strip.crop((0, rows - 1, width, rows))
+        filtered = ImageChops.subtract_modulo(strip, above)
+        # Prefix every row with its filter type byte.
+        data = Image.new("L", (width * 3 + 1, rows), _PNG_FILTER_UP)
+        data.paste(Image.frombytes("L", (width * 3, rows), filtered.tobytes()), (1, 0))
+        compressed = self._compressor.compress(data.tobytes())
+        if compressed:
+            self._chunk(b"IDAT", compressed)
+        self.rows += rows
+
+    def close(self) -> None:
+        """Finish the image; every row must have been written."""
+        if self.rows != self.size[1]:
+            raise ValueError(f"Wrote {self.rows} of {self.size[1]} rows")
+        self._chunk(b"IDAT", self._compressor.flush())
+        self._chunk(b"IEND", b"")
+
+
+class TiffStripWriter:
+    """Write an RGB TIFF from strips of rows, without holding the whole image.
+
+    Each strip written becomes a TIFF strip, so all strips but the last must
+    have the same number of rows. Strips are Deflate-compressed with the
+    horizontal predictor by default. Classic TIFF offsets are 32 bits, so
+    the compressed file must stay under 4 GiB (use PNG beyond that).
+    The file must be seekable: the directory is written last and the
+    header patched to point at it.
+    """
+
+    def __init__(
+        self,
+        file: BinaryIO,
+        size: tuple[int, int],
+        dpi: int | None = None,
+        compression: str = "tiff_adobe_deflate",
+        compress_level: int = 6,
+    ):
+        if compression not in _TIFF_COMPRESSION:
+            raise ValueError(
+                f"Unsupported TIFF compression '{compression}'. "
+                f"Available: {sorted(_TIFF_COMPRESSION)}"
+            )
+        self.file = file
+        self.size = tuple(size)
+        self.dpi = dpi
+        self.compression = compression
+        self.compress_level = compress_level
+        self.rows = 0
+        self._rows_per_strip: int | None = None
+        self._offsets: list[int] = []
+        self._counts: list[int] = []
+        self._start = file.tell()
+        # Byte order, magic number, and a placeholder for the IFD offset.
+        file.write(b"II" + struct.pack("<HI", 42, 0))
+
+    def write(self, strip: Image.Image) -> None:
+        """Append the next rows of the image."""
+        width, height = self.size
+        _check_strip(strip, width, self.rows, height)
+        if self._rows_per_strip is None:
+            self._rows_per_strip = strip.height
+        elif self.rows % self._rows_per_strip or (
+            strip.height != self._rows_per_strip
+            and self.rows + strip.height != height
+        ):
+            raise ValueError("Only the last TIFF strip may have fewer rows")
+
+        if self.compression == "raw":
+            data = strip.tobytes()
+        else:
+            # Horizontal predictor: each sample minus the one to its left.
+            left = strip.crop((-1, 0, width - 1, strip.height))
+            data = ImageChops.subtract_modulo(strip, left).tobytes()
+            data = zlib.compress(data, self.compress_level)
+        self._offsets.append(self._tell())
+        self._counts.append(len(data))
+        self.file.write(data)
+        self.rows += strip.height
+
+    def _tell(self) -> int:
+        offset = self.file.tell() - self._start
+        if offset >= 1 << 32:
+            raise ValueError("TIFF output exceeds 4 GiB; write a PNG instead")
+        return offset
+
+    def close(self) -> None:
+        """Write the image directory; every row must have been written."""
+        width, height = self.size
+        if self.rows != height:
+            raise ValueError(f"Wrote {self.rows} of {height} rows")
+        # Values that do not fit in an entry are stored after the directory.
+        entries = [
+            (256, _LONG, [width]),
+            (257, _LONG, [height]),
+            (258, _SHORT, [8, 8, 8]),
+            (259, _SHORT, [_TIFF_COMPRESSION[self.compression]]),
+            (262, _SHORT, [2]),  # RGB
+            (273, _LONG, self._offsets),
+            (277, _SHORT, [3]),
+            (278, _LONG, [self._rows_per_strip]),
+            (279, _LONG, self._counts),
+            (284, _SHORT, [1]),  # Contiguous samples
+        ]
+        if self.compression != "raw":
+            entries.append((317, _SHORT, [2]))  # Horizontal predictor
+        if self.dpi:
+            entries += [
+                (282, _RATIONAL, [self.dpi, 1]),
+                (283, _RATIONAL, [self.dpi, 1]),
+                (296, _SHORT, [2]),  # Inches
+            ]
+        # Directory entries must be sorted by tag.
+        entries.sort(key=lambda entry: entry[0])
+
+        if self._tell() % 2:
+            self.file.write(b"\0")
+        ifd = self._tell()
+        extra = ifd + 2 + 12 * len(entries) + 4
+        directory = [struct.pack("<H", len(entries))]
+        values = []
+        for tag, kind, items in entries:
+            fmt = f"<{len(items)}{'H' if kind == _SHORT else 'I'}"
+            packed = struct.pack(fmt, *items)
+            count = len(items) // 2 if kind == _RATIONAL else len(items)
+            if len(packed) <= 4:
+                field = packed.ljust(4, b"\0")
+            else:
+                field = struct.pack("<I", extra)
+                values.append(packed)
+                extra += len(packed)
+            directory.append(struct.pack("<HHI", tag, kind, count) + field)
+        directory.append(struct.pack("<I", 0))
+        self.file.write(b"".join(directory + values))
+        end = self.file.tell()
+        self.file.seek(self._start + 4)
+        self.file.write(struct.pack("<I", ifd))
+        self.file.seek(end)
+
+
+STRIP_WRITERS = {
+    "png": PngStripWriter,
+    "tif": TiffStripWriter,
+    "tiff": TiffStripWriter,
+}
+
+
+def write_strips(
+    path: str | Path,
+    size: tuple[int, int],
+    strips: Iterable[Image.Image],
+    dpi: int | None = None,
+    **options,
+) -> Path:
+    """Stream strips of rows (e.g. from ``Scene.strips``) into an image file.
+
+    Args:
+        path: Output file; its suffix (.png, .tif or .tiff) picks the format.
+              Written via a temp file and an atomic rename.
+        size: (width, height) of the whole image.
+        strips: Full-width RGB strips, top to bottom.
+        dpi: Resolution stored in the file, for print.
+        **options: Passed to the writer (e.g. compress_level).
+    """
+    path = Path(path)
+    ext = path.suffix.lower().lstrip(".")
+    try:
+        writer_class = STRIP_WRITERS[ext]
+    except KeyError:
+        raise ValueError(
+            f"Cannot stream '{ext}' images. Available: {sorted(STRIP_WRITERS)}"
+        ) from None
+
+    def write(tmp):
+        with open(tmp, "wb") as f:
+            writer = writer_class(f, size, dpi=dpi, **options)
+            for strip in strips:
+                writer.write(strip)
+            writer.close()
+
+    return atomic_write(path, write)
@@ -1,38 +1,176 @@
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
 from PIL import ImageDraw, ImageFont
 
-from src.utils.color import hex_to_rgb
+from config import Settings
+from src.dependencies import record_file
+from src.utils.color import Color, to_rgb
+from src.utils.layout import TextLayout, layout_text
 
 # Default font size when custom fonts aren't available
 DEFAULT_FONT_SIZE = 48
 SMALL_FONT_SIZE = 24
 
+FALLBACK_FONT = "DejaVuSans.ttf"
+FONT_EXTENSIONS = (".ttf", ".otf", ".ttc")
+
+
+def _normalize_font_name(name: str) -> str:
+    """Normalize a font name so 'Open Sans', 'OpenSans' and 'open-sans' match."""
+    stem = Path(name).stem if Path(name).suffix.lower() in FONT_EXTENSIONS else name
+    return "".join(ch for ch in stem.lower() if ch.isalnum())
+
+
+class FontCache:
+    """Bounded, thread-safe LRU cache of loaded fonts.
+
+    Fonts are keyed by (resolved font path, size, face index). Names that
+    fail to resolve are remembered in a negative cache so the fallback font
+    is used without attempting (and failing) the lookup again.
+    """
+
+    def __init__(self, maxsize: int = 128, font_dirs: list[Path] | None = None):
+        self.maxsize = maxsize
+        self.font_dirs = font_dirs
+        self._fonts: OrderedDict = OrderedDict()
+        self._resolved: dict[str, str] = {}
+        self._missing: set[str] = set()
+        self._index: dict[str, str] | None = None
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.negative_hits = 0
+        self.evictions = 0
+
+    def _discover(self) -> dict[str, str]:
+        """Index font files under the font directories (done once)."""
+        if self._index is None:
+            dirs = self.font_dirs
+            if dirs is None:
+                dirs = [Settings.ASSETS_DIR / "fonts"]
+            index = {}
+            for font_dir in dirs:
+                if not Path(font_dir).is_dir():
+                    continue
+                for path in sorted(Path(font_dir).rglob("*")):
+                    if path.suffix.lower() in FONT_EXTENSIONS:
+                        index.setdefault(_normalize_font_name(path.name), str(path))
+            self._index = index
+        return self._index
+
+    def resolve(self, font_name: str) -> str | None:
+        """Resolve a font name or path to a loadable font file, or None."""
+        with self._lock:
+            if font_name in self._resolved:
+                return self._resolved[font_name]
+            if font_name in self._missing:
+                self.negative_hits += 1
+                return None
+
+            path = self._discover().get(_normalize_font_name(font_name))
+            if path is None:
+                try:
+                    # Let FreeType search the system font directories.
+                    path = ImageFont.truetype(font_name, DEFAULT_FONT_SIZE).path
+                except OSError:
+                    self._missing.add(font_name)
+                    return None
+            self._resolved[font_name] = path
+            return path
+
+    def get(
+        self, path: str, size: int, index: int = 0
+    ) -> ImageFont.FreeTypeFont:
+        """Return the font at a resolved path, loading it on a cache miss."""
+        record_file(path)
+        key = (path, size, index)
+        with self._lock:
+            font = self._fonts.get(key)
+            if font is not None:
+                self._fonts.move_to_end(key)
+                self.hits += 1
+                return font
+            self.misses += 1
+            font = ImageFont.truetype(path, size, index=index)
+            self._fonts[key] = font
+            if len(self._fonts) > self.maxsize:
+                self._fonts.popitem(last=False)
+                self.evictions += 1
+            return font
+
+    def load(
+        self, font_name: str | None, size: int, index: int = 0
+    ) -> ImageFont.FreeTypeFont | ImageFont.ImageFont:
+        """Load a named font, falling back to DejaVuSans, then Pillow's default."""
+        for name in (font_name, FALLBACK_FONT):
+            if not name:
+                continue
+            path = self.resolve(name)
+            if path is not None:
+                return self.get(path, size, index if name == font_name else 0)
+        return ImageFont.load_default()
+
+    def warmup(self, font_names: list[str | None], sizes: list[int]) -> None:
+        """Preload fonts, e.g. once per worker process before rendering."""
+        for name in font_names:
+            for size in sizes:
+                self.load(name, size)
+
+    def stats(self) -> dict:
+        """Return cache counters."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "negative_hits": self.negative_hits,
+                "evictions": self.evictions,
+                "size": len(self._fonts),
+                "maxsize": self.maxsize,
+                "missing": sorted(self._missing),
+            }
+
+    def clear(self) -> None:
+        """Drop all cached fonts, resolutions and counters."""
+        with self._lock:
+            self._fonts.clear()
+            self._resolved.clear()
+            self._missing.clear()
+            self._index = None
+            self.hits = self.misses = self.negative_hits = self.evictions = 0
+
+
+font_cache = FontCache()
+
 
 def _load_font(font_name: str | None, size: int) -> ImageFont.FreeTypeFont | ImageFont.ImageFont:
     """Try to load a named font, fall back to default."""
-    if font_name:
-        try:
-            return ImageFont.truetype(font_name, size)
-        except OSError:
-            pass
-    try:
-        return ImageFont.truetype("DejaVuSans.ttf", size)
-    except OSError:
-        return ImageFont.load_default()
+    return font_cache.load(font_name, size)
+
+
+def warm_font_cache(brand, sizes: tuple[int, ...] = (DEFAULT_FONT_SIZE, SMALL_FONT_SIZE)) -> None:
+    """Preload every brand typography font at the given sizes."""
+    font_cache.warmup(list(brand.typography.values()), list(sizes))
 
 
 def draw_text_centered(
     draw: ImageDraw.ImageDraw,
     text: str,
     canvas_size: tuple[int, int],
-    color: str = "#ffffff",
+    color: Color = "#ffffff",
     font_name: str | None = None,
     font_size: int = DEFAULT_FONT_SIZE,
     y_offset: int = 0,
 ) -> None:
     """Draw text centered on the canvas."""
     font = _load_font(font_name, font_size)
-    rgb = hex_to_rgb(color)
-    bbox = draw.textbbox((0, 0), text, font=font)
+    rgb = to_rgb(color)
+    if "\n" in text:
+        # Multi-line titles keep Pillow's own multiline layout.
+        bbox = draw.textbbox((0, 0), text, font=font)
+    else:
+        bbox = layout_text(text, font).bboxes[0]
     text_width = bbox[2] - bbox[0]
     text_height = bbox[3] - bbox[1]
     x = (canvas_size[0] - text_width) // 2
@@ -45,32 +183,112 @@ def draw_text_wrapped(
     text: str,
     max_width: int,
     position: tuple[int, int] = (0, 0),
-    color: str = "#ffffff",
+    color: Color = "#ffffff",
     font_name: str | None = None,
     font_size: int = SMALL_FONT_SIZE,
     line_spacing: int = 8,
-) -> None:
-    """Draw text with word wrapping within the given max width."""
+    wrap: str = "greedy",
+) -> TextLayout:
+    """Draw text with word wrapping within the given max width.
+
+    Returns the layout that was drawn, so callers can place content below it.
+    """
     font = _load_font(font_name, font_size)
-    rgb = hex_to_rgb(color)
-    words = text.split()
-    lines: list[str] = []
-    current_line = ""
-
-    for word in words:
-        test_line = f"{current_line} {word}".strip()
-        bbox = draw.textbbox((0, 0), test_line, font=font)
-        if bbox[2] - bbox[0] <= max_width:
-            current_line = test_line
-        else:
-            if current_line:
-                lines.append(current_line)
-            current_line = word
-    if current_line:
-        lines.append(current_line)
+    rgb = to_rgb(color)
+    layout = layout_text(text, font, max_width, line_spacing, wrap)
 
     x, y = position
-    for line in lines:
-        draw.text((x, y), line, fill=rgb, font=font)
-        bbox = draw.textbbox((0, 0), line, font=font)
-        y += (bbox[3] - bbox[1]) + line_spacing
+    for line, (dx, dy) in zip(layout.lines, layout.offsets):
+        draw.text((x + dx, y + dy), line, fill=rgb, font=font)
+    return layout
+
+
+# Reference size used to estimate how large a text can be before bisecting.
+_FIT_REFERENCE_SIZE = 100
+
+
+def fit_text(
+    text: str,
+    size: tuple[int, int],
+    font_name: str | None = None,
+    max_lines: int = 1,
+    min_size: int = 12,
+    max_size: int | None = None,
+    line_spacing: int = 8,
+) -> tuple[ImageFont.FreeTypeFont | ImageFont.ImageFont, TextLayout]:
+    """Find the largest font size at which text fits a (width, height) size.
+
+    Text is wrapped to the width and must fit in ``max_lines`` lines and
+    the height. Advance width scales roughly linearly with size, so one
+    measurement at a reference size bounds the search before bisecting over
+    integer sizes; fonts and layouts come from the shared caches.
+
+    Returns:
+        (font, layout) at the chosen size. If nothing fits, ``min_size``.
+    """
+    box_width, box_height = size
+    hi = max_size or box_height
+    reference = _load_font(font_name, _FIT_REFERENCE_SIZE)
+    advance = reference.getlength(text.replace("\n", " "))
+    if advance > 0:
+        estimate = _FIT_REFERENCE_SIZE * box_width * max_lines / advance
+        hi = min(hi, int(estimate * 1.1) + 1)
+    lo = min_size
+
+    def fits(size: int) -> TextLayout | None:
+        font = _load_font(font_name, size)
+        layout = layout_text(text, font, box_width, line_spacing)
+        if (
+            len(layout.lines) <= max_lines
+            and layout.width <= box_width
+            and layout.height <= box_height
+        ):
+            return layout
+        return None
+
+    best = lo
+    while lo <= hi:
+        mid = (lo + hi) // 2
+        if fits(mid) is not None:
+            best = mid
+            lo = mid + 1
+        else:
+            hi = mid - 1
+
+    font = _load_font(font_name, best)
+    return font, layout_text(text, font, box_width, line_spacing)
+
+
+def draw_text_fitted(
+    draw: ImageDraw.ImageDraw,
+    text: str,
+    box: tuple[int, int, int, int],
+    color: Color = "#ffffff",
+    font_name: str | None = None,
+    max_lines: int = 1,
+    min_size: int = 12,
+    max_size: int | None = None,
+    line_spacing: int = 8,
+) -> TextLayout:
+    """Draw text at the largest size that fits the box, centered within it.
+
+    Each line's ink (not its origin) is centered, so side bearings and the
+    space above the glyphs do not shift it off-center.
+    """
+    left, top, right, bottom = box
+    width, height = right - left, bottom - top
+    font, layout = fit_text(
+        text,
+        (width, height),
+        font_name=font_name,
+        max_lines=max_lines,
+        min_size=min_size,
+        max_size=max_size,
+        line_spacing=line_spacing,
+    )
+    rgb = to_rgb(color)
+    y = top + (height - layout.height) // 2
+    for line, (_, dy), bbox in zip(layout.lines, layout.offsets, layout.bboxes):
+        x = left + (width - (bbox[2] - bbox[0])) // 2
+        draw.text((x - bbox[0], y + dy - bbox[1]), line, fill=rgb, font=font)
+    return layout
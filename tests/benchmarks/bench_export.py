@@ -0,0 +1,54 @@
+"""Compare serial and parallel Exporter encoding.
+
+Run with ``python -m tests.benchmarks.bench_export [--images N]``.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from PIL import Image, ImageDraw
+
+from config import Settings
+from src.exporters import Exporter
+from src.utils.gradient import radial_gradient
+
+FORMATS = ["png", "jpg", "webp"]
+
+
+def make_banner(seed: int) -> Image.Image:
+    """A 2560x1440 RGBA banner with enough detail to make encoding realistic."""
+    image = radial_gradient((2560, 1440), ["#1a73e8", "#0d1117", "#fbbc04"]).convert("RGBA")
+    draw = ImageDraw.Draw(image)
+    for i in range(0, 2560, 40):
+        draw.line([(i, 0), ((i * 7 + seed * 13) % 2560, 1440)], fill=(255, 255, 255, 90), width=3)
+    return image
+
+
+def run(exporter: Exporter, images: list[tuple[Image.Image, str]]) -> float:
+    start = time.perf_counter()
+    exporter.export_batch(images, FORMATS)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--images", type=int, default=4)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    images = [(make_banner(i), f"banner_{i}") for i in range(args.images)]
+    settings = Settings()
+    with tempfile.TemporaryDirectory() as out:
+        serial = run(Exporter(settings, output_dir=out, max_workers=1), images)
+        parallel = run(Exporter(settings, output_dir=out, max_workers=args.workers), images)
+
+    pairs = len(images) * len(FORMATS)
+    print(f"{pairs} encodes of 2560x1440 ({', '.join(FORMATS)}) on {os.cpu_count()} CPUs")
+    print(f"serial:   {serial:.2f}s")
+    print(f"parallel: {parallel:.2f}s")
+    print(f"speedup:  {serial / parallel:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
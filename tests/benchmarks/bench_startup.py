@@ -0,0 +1,67 @@
+"""Measure CLI startup: wall time per command and the slowest imports.
+
+Run with ``python -m tests.benchmarks.bench_startup [--runs N] [--top N]``.
+Each command runs in a fresh interpreter under ``python -X importtime``;
+the import table is taken from the median run.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+COMMANDS = {
+    "import src.main": ["-c", "import src.main"],
+    "sigma --help": ["-m", "src.main", "--help"],
+    "sigma thumbnail": ["-m", "src.main", "thumbnail", "--title", "Startup", "--output"],
+}
+
+
+def parse_importtime(stderr: str) -> list[tuple[int, int, str]]:
+    """(self_us, cumulative_us, module) for each line of -X importtime output."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:"):].split("|")
+        rows.append((int(self_us), int(cumulative_us), module[1:].rstrip()))
+    return rows
+
+
+def run_once(args: list[str]) -> tuple[float, list[tuple[int, int, str]]]:
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return time.perf_counter() - start, parse_importtime(proc.stderr)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=8, help="Slowest top-level imports to list")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as out:
+        for label, command in COMMANDS.items():
+            if command[-1] == "--output":
+                command = [*command, os.path.join(out, "startup.png")]
+            runs = sorted((run_once(command) for _ in range(args.runs)), key=lambda r: r[0])
+            wall, imports = runs[len(runs) // 2]
+            total_ms = sum(self_us for self_us, _, _ in imports) / 1000
+            print(f"{label}: median {wall * 1000:.0f} ms "
+                  f"(min {runs[0][0] * 1000:.0f}, max {runs[-1][0] * 1000:.0f}), "
+                  f"imports {total_ms:.0f} ms, {len(imports)} modules")
+            top_level = [row for row in imports if not row[2].startswith(" ")]
+            for _, cumulative_us, module in sorted(top_level, reverse=True, key=lambda r: r[1])[: args.top]:
+                print(f"    {cumulative_us / 1000:7.1f} ms  {module}")
+            print(f"    (median of {args.runs}; stdev {statistics.pstdev(r[0] for r in runs) * 1000:.0f} ms)")
+
+
+if __name__ == "__main__":
+    main()
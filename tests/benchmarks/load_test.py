@@ -0,0 +1,120 @@
+"""Load-test a running ``sigma serve`` instance and report latency percentiles.
+
+Run with ``python -m tests.benchmarks.load_test --requests 200 --concurrency 8``
+against ``sigma serve`` (or pass ``--spawn`` to start one on a free port).
+"""
+import argparse
+import http.client
+import json
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def wait_until_healthy(host: str, port: int, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection(host, port, timeout=2)
+            try:
+                conn.request("GET", "/health")
+                if conn.getresponse().status == 200:
+                    return
+            finally:
+                conn.close()
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Server on {host}:{port} did not become healthy")
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--generator", default="thumbnail")
+    parser.add_argument("--return", dest="return_mode", default="bytes", choices=["bytes", "path"])
+    parser.add_argument("--spawn", action="store_true", help="Start a server for the test")
+    parser.add_argument("--workers", type=int, default=None, help="Workers for --spawn")
+    args = parser.parse_args()
+
+    server = None
+    if args.spawn:
+        args.port = free_port()
+        command = [sys.executable, "-m", "src.main", "serve", "--port", str(args.port), "--no-cache"]
+        if args.workers:
+            command += ["--workers", str(args.workers)]
+        server = subprocess.Popen(command)
+
+    try:
+        wait_until_healthy(args.host, args.port)
+        local = threading.local()
+        statuses: dict[int, int] = {}
+        lock = threading.Lock()
+
+        def one(i: int) -> float:
+            if not hasattr(local, "conn"):
+                local.conn = http.client.HTTPConnection(args.host, args.port, timeout=120)
+            text_param = "text" if args.generator == "social" else "title"
+            body = json.dumps(
+                {
+                    "generator": args.generator,
+                    "params": {text_param: f"Load test request {i}"},
+                    "return": args.return_mode,
+                }
+            )
+            start = time.perf_counter()
+            try:
+                local.conn.request("POST", "/render", body, {"Content-Type": "application/json"})
+                response = local.conn.getresponse()
+                response.read()
+                status = response.status
+                if response.getheader("Connection") == "close":
+                    local.conn.close()
+                    del local.conn
+            except (OSError, http.client.HTTPException):
+                local.conn.close()
+                del local.conn
+                status = 0
+            elapsed = time.perf_counter() - start
+            with lock:
+                statuses[status] = statuses.get(status, 0) + 1
+            return elapsed
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            latencies = list(pool.map(one, range(args.requests)))
+        wall = time.perf_counter() - start
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    ms = [t * 1000 for t in latencies]
+    print(f"{args.requests} requests, concurrency {args.concurrency}, {wall:.2f}s")
+    print(f"throughput: {args.requests / wall:.1f} req/s")
+    print(f"p50: {percentile(ms, 50):.1f} ms  p90: {percentile(ms, 90):.1f} ms  "
+          f"p99: {percentile(ms, 99):.1f} ms  mean: {statistics.mean(ms):.1f} ms")
+    print(f"status codes: {dict(sorted(statuses.items()))}")
+
+
+if __name__ == "__main__":
+    main()
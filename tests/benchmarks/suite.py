@@ -0,0 +1,334 @@
+"""Benchmark suite for the generator, text, overlay and export hot paths.
+
+Run with ``python -m tests.benchmarks.suite``. Each case runs in its own
+interpreter and records median wall time, peak RSS and peak traced Python
+allocations, compared with the stored baseline
+(``tests/benchmarks/baseline.json``); the run exits 1 if any metric
+regresses by more than ``--threshold``. ``--update-baseline`` rewrites the
+baseline from the current run.
+
+Render caches (scene bases, text layouts, gradients) are cleared before
+every iteration so each one pays the full render cost; fonts and cutouts
+stay loaded, as in a warm worker. Everything runs offline.
+"""
+import argparse
+import json
+import os
+import platform as platform_module
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+
+METRICS = ("wall_ms", "rss_mb", "alloc_kb")
+
+# Changes smaller than this are noise, whatever the relative change.
+MIN_DELTA = {"wall_ms": 2.0, "rss_mb": 4.0, "alloc_kb": 64.0}
+
+LONG_TEXT = " ".join(
+    ["Build real projects, learn the tools the industry uses, and ship a "
+     "portfolio recruiters actually read."] * 12
+)
+
+
+@dataclass
+class Case:
+    """A named benchmark; ``setup`` runs untimed and returns the timed call."""
+
+    name: str
+    setup: Callable[[], Callable[[], object]]
+
+
+def reset_render_caches() -> None:
+    from src.render.scene import base_cache
+    from src.utils.gradient import clear_gradient_cache
+    from src.utils.layout import layout_cache
+
+    base_cache.clear()
+    layout_cache.clear()
+    clear_gradient_cache()
+
+
+def generator_cases(settings, brand) -> list[Case]:
+    """Each generator at each PLATFORM_DIMENSIONS size it can render."""
+    from src.batch import PLATFORM_KINDS, get_generator_class
+    from src.utils.assets import get_cutout_library
+
+    poses = get_cutout_library().poses()
+    cases = []
+    for dim_key in settings.PLATFORM_DIMENSIONS:
+        platform, _, kind = dim_key.partition("_")
+        if kind not in PLATFORM_KINDS:
+            continue
+        name, text_param = PLATFORM_KINDS[kind]
+        params = {text_param: "Master Python for Data Science", "platform": platform}
+        if name == "thumbnail" and poses:
+            params["pose"] = poses[0]
+
+        def setup(name=name, params=params):
+            generator = get_generator_class(name)(settings, brand)
+
+            def run():
+                reset_render_caches()
+                return generator.render(**params)
+            return run
+
+        cases.append(Case(f"generator/{name}/{dim_key}", setup))
+    return cases
+
+
+def text_case() -> Case:
+    def setup():
+        from PIL import Image, ImageDraw
+
+        from src.utils.text import draw_text_wrapped
+
+        def run():
+            reset_render_caches()
+            canvas = Image.new("RGB", (1080, 1920))
+            draw_text_wrapped(ImageDraw.Draw(canvas), LONG_TEXT, 960, (60, 60))
+            return canvas
+        return run
+    return Case("text/draw_text_wrapped", setup)
+
+
+def overlay_cases(settings) -> list[Case]:
+    """Scale and composite the real cutout PNGs onto a thumbnail canvas."""
+    from src.utils.assets import CUTOUT_PATTERN
+
+    sources = sorted(Path(settings.CUTOUTS_DIR).glob(CUTOUT_PATTERN))[:2]
+
+    def setup(source):
+        from PIL import Image
+
+        from src.utils.image import apply_overlay, load_image, resize_image
+
+        cutout = load_image(source)
+        canvas = Image.new("RGB", (1280, 720), "#0d1117")
+
+        def run():
+            scaled = resize_image(cutout, 1280, 612, method="contain")
+            return apply_overlay(canvas, scaled, (1280 - scaled.width, 720 - scaled.height))
+        return run
+
+    return [
+        Case(f"overlay/{source.stem}", lambda source=source: setup(source))
+        for source in sources
+    ]
+
+
+def export_cases(settings, brand) -> list[Case]:
+    """Every Exporter format, encoding a rendered thumbnail into memory."""
+
+    def setup(fmt):
+        from src.exporters import Exporter, MemorySink
+        from src.generators.thumbnail import ThumbnailGenerator
+
+        image = ThumbnailGenerator(settings, brand).render("Export benchmark")
+
+        def run():
+            exporter = Exporter(settings, max_workers=1, sink=MemorySink())
+            return exporter.export(image, "bench", [fmt])
+        return run
+
+    return [
+        Case(f"export/{fmt}", lambda fmt=fmt: setup(fmt))
+        for fmt in settings.SUPPORTED_FORMATS
+    ]
+
+
+def animation_cases(settings, brand) -> list[Case]:
+    """A 3-second animated story, rendered and encoded in each format."""
+
+    def setup(fmt):
+        import tempfile
+
+        from src.generators.story import StoryGenerator
+
+        generator = StoryGenerator(settings, brand)
+        output = Path(tempfile.mkdtemp()) / f"story.{fmt}"
+
+        def run():
+            reset_render_caches()
+            return generator.generate(
+                "Master Python for Data Science", LONG_TEXT[:120], output_path=output
+            )
+        return run
+
+    return [
+        Case(f"animation/instagram_story/{fmt}", lambda fmt=fmt: setup(fmt))
+        for fmt in ("webp", "gif", "png")
+    ]
+
+
+def all_cases() -> list[Case]:
+    from config import BrandConfig, Settings
+
+    settings = Settings()
+    brand = BrandConfig()
+    return [
+        *generator_cases(settings, brand),
+        text_case(),
+        *overlay_cases(settings),
+        *export_cases(settings, brand),
+        *animation_cases(settings, brand),
+    ]
+
+
+def _peak_rss_kb() -> int:
+    import resource
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kB elsewhere.
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def measure(case: Case, repeat: int) -> dict:
+    """Time ``repeat`` iterations after a warmup, then trace one more.
+
+    Meant to run in a fresh interpreter (see ``run_isolated``), so the
+    process peak RSS is this case's.
+    """
+    run = case.setup()
+    run()
+
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        run()
+        _, alloc_peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "wall_ms": round(statistics.median(times) * 1000, 2),
+        "rss_mb": round(_peak_rss_kb() / 1024, 1),
+        "alloc_kb": round(alloc_peak / 1024, 1),
+    }
+
+
+def run_isolated(name: str, repeat: int, cache_dir: str) -> dict:
+    """Measure one case in a child interpreter and return its metrics."""
+    proc = subprocess.run(
+        [sys.executable, "-m", __spec__.name, "--case", name, "--repeat", str(repeat)],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=dict(os.environ, CACHE_DIR=cache_dir),
+    )
+    return json.loads(proc.stdout.splitlines()[-1])
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """Regressions of ``results`` against ``baseline``, as readable lines.
+
+    A metric regresses when it grows by more than ``threshold`` (a fraction,
+    0.25 = 25%) and by more than its MIN_DELTA.
+    """
+    regressions = []
+    for name, metrics in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        for metric in METRICS:
+            old, new = base.get(metric), metrics.get(metric)
+            if old is None or new is None:
+                continue
+            if new - old > MIN_DELTA[metric] and new > old * (1 + threshold):
+                change = (new - old) / old if old else float("inf")
+                regressions.append(f"{name}: {metric} {old} -> {new} (+{change:.0%})")
+    return regressions
+
+
+def _environment() -> dict:
+    import PIL
+
+    return {
+        "python": platform_module.python_version(),
+        "pillow": PIL.__version__,
+        "machine": platform_module.machine(),
+        "system": platform_module.system(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def _print_row(name: str, metrics: dict, base: dict | None) -> None:
+    cells = []
+    for metric in METRICS:
+        cell = f"{metrics[metric]:>9}"
+        if base and base.get(metric):
+            cell += f" ({(metrics[metric] - base[metric]) / base[metric]:+.0%})"
+        cells.append(f"{cell:<17}")
+    print(f"{name:<44}{''.join(cells)}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeat", type=int, default=5, help="Timed iterations per case")
+    parser.add_argument("--filter", default="", help="Only run cases containing this text")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=float(os.getenv("SIGMA_BENCH_THRESHOLD", "0.25")),
+        help="Allowed relative growth per metric (default 0.25, or SIGMA_BENCH_THRESHOLD)",
+    )
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--json", type=Path, help="Also write this run's results here")
+    parser.add_argument("--case", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.case:
+        # Child mode: measure one case and print its metrics as JSON.
+        case = next(case for case in all_cases() if case.name == args.case)
+        print(json.dumps(measure(case, args.repeat)))
+        return
+
+    baseline = {}
+    if args.baseline.exists() and not args.update_baseline:
+        baseline = json.loads(args.baseline.read_text())["cases"]
+
+    print(f"{'case':<44}" + "".join(f"{m:<17}" for m in METRICS))
+    results = {}
+    # Keep cutout and brand caches out of the working tree.
+    with tempfile.TemporaryDirectory(prefix="sigma-bench-") as cache_dir:
+        for case in all_cases():
+            if args.filter not in case.name:
+                continue
+            results[case.name] = run_isolated(case.name, args.repeat, cache_dir)
+            _print_row(case.name, results[case.name], baseline.get(case.name))
+
+    report = {"environment": _environment(), "cases": results}
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2) + "\n")
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"Baseline written to {args.baseline}")
+        return
+
+    if not baseline:
+        print(f"No baseline at {args.baseline}; run with --update-baseline")
+        return
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}:")
+        for line in regressions:
+            print(f"  {line}")
+        sys.exit(1)
+    print(f"\nNo regressions over {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
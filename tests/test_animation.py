@@ -0,0 +1,186 @@
+import io
+import random
+
+import pytest
+from PIL import Image, ImageChops
+
+from src.exporters import global_palette, write_animation
+from src.exporters.animation import ApngWriter, WebpWriter
+from src.render import (
+    Animated,
+    Animation,
+    AnimationFrame,
+    CenteredText,
+    Faded,
+    Fill,
+    Rect,
+    Scene,
+    Track,
+    WrappedText,
+)
+
+
+def _story(duration=1.0, fps=10):
+    scene = Scene((160, 120), [Fill("#0d1117")])
+    layers = [
+        Rect((0, 0, 160, 6), fill="#fbbc04"),
+        Animated(
+            CenteredText("Title", font_size=24),
+            {
+                "y_offset": Track(((0, 20), (0.5, 0)), "ease_out"),
+                "opacity": Track(((0, 0.0), (0.5, 1.0))),
+            },
+        ),
+        Animated(
+            WrappedText("one two three four", max_width=150, position=(4, 90), font_size=14),
+            {"reveal": Track(((0.3, 0.0), (0.7, 1.0)))},
+        ),
+    ]
+    return Animation(scene, layers, duration, fps)
+
+
+def _blocks(duration=1.0, fps=10):
+    """An animation without anti-aliasing: a few exact colors."""
+    scene = Scene((64, 48), [Fill("#0d1117")])
+    layers = [
+        Animated(
+            Rect((0, 10, 8, 18), fill="#1a73e8"),
+            {"box": Track(((0, (0, 10, 8, 18)), (0.6, (50, 10, 58, 18))))},
+        ),
+        Animated(
+            Rect((10, 30, 20, 40), fill="#fbbc04"),
+            {"fill": Track(((0, "#fbbc04"), (0.5, "#ffffff")))},
+        ),
+    ]
+    return Animation(scene, layers, duration, fps)
+
+
+def _replay(frames):
+    """The full image shown by each frame, with its start time in ms."""
+    canvas, clock = None, 0
+    for frame in frames:
+        if canvas is None:
+            canvas = frame.image.copy()
+        else:
+            canvas.paste(frame.image, frame.box[:2])
+        yield clock, canvas
+        clock += frame.duration
+
+
+class TestTrack:
+    def test_interpolation(self):
+        track = Track(((1, (0, 0)), (2, (100, 50))))
+        assert track.at(0) == (0, 0)
+        assert track.at(1.5) == (50, 25)
+        assert track.at(3) == (100, 50)
+        assert Track(((0, 0.0), (1, 1.0)), "ease_in").at(0.5) == 0.25
+
+    def test_non_numbers_hold(self):
+        track = Track(((0, "#000000"), (1, "#ffffff")))
+        assert track.at(0.99) == "#000000"
+        assert track.at(1) == "#ffffff"
+
+    def test_invalid(self):
+        with pytest.raises(ValueError, match="time order"):
+            Track(((1, 0), (0, 1)))
+        with pytest.raises(ValueError, match="easing"):
+            Track(((0, 0),), "bounce")
+
+
+class TestAnimated:
+    def test_reveal_whole_words(self):
+        layer = Animated(CenteredText("one two  three"), {"reveal": Track(((0, 0.0), (1, 1.0)))})
+        assert layer.at(0) is None
+        assert layer.at(0.5).text == "one"
+        assert layer.at(0.7).text == "one two"
+        assert layer.at(1).text == "one two  three"
+
+    def test_opacity(self):
+        layer = Animated(CenteredText("Hi"), {"opacity": Track(((0, 0.0), (1, 1.0)))})
+        assert layer.at(0) is None
+        assert layer.at(0.5) == Faded(CenteredText("Hi"), 0.5)
+        assert layer.at(1) == CenteredText("Hi")
+
+    def test_unknown_property(self):
+        with pytest.raises(ValueError, match="reveal"):
+            Animated(Rect((0, 0, 1, 1)), {"reveal": Track(((0, 1.0),))})
+
+
+class TestAnimation:
+    def test_frames_match_renders(self):
+        animation = _story()
+        frames = list(animation.frames())
+        assert frames[0].box == (0, 0, 160, 120)
+        for clock, canvas in _replay(frames):
+            tick = round(clock * animation.fps / 1000)
+            expected = animation.render(tick / animation.fps)
+            assert ImageChops.difference(expected, canvas).getbbox() is None
+
+    def test_identical_frames_are_merged(self):
+        frames = list(_story(duration=2.0).frames())
+        # Nothing moves after 0.7 s: the last frame holds to the end.
+        assert sum(frame.duration for frame in frames) == 2000
+        assert frames[-1].duration >= 1300
+        assert len(frames) < 20
+
+    def test_frames_store_changed_regions(self):
+        frames = list(_blocks().frames())
+        areas = []
+        for frame in frames[1:]:
+            left, top, right, bottom = frame.box
+            assert left % 2 == 0 and top % 2 == 0
+            areas.append((right - left) * (bottom - top))
+        # Only the frame where both blocks change covers them both.
+        assert sum(area > 14 * 12 for area in areas) == 1
+
+    def test_static_layers_join_the_base(self):
+        animation = _story()
+        assert Rect((0, 0, 160, 6), fill="#fbbc04") in animation.scene.layers
+        assert all(isinstance(layer, Animated) for layer in animation.layers)
+
+
+class TestAnimationWriters:
+    @pytest.mark.parametrize("ext", ["gif", "png", "webp"])
+    def test_round_trip(self, tmp_path, ext):
+        animation = _blocks()
+        frames = list(animation.frames())
+        path = write_animation(tmp_path / f"blocks.{ext}", animation)
+        image = Image.open(path)
+        assert image.size == (64, 48)
+        assert image.n_frames == len(frames)
+        assert image.info.get("loop") == 0
+        # Few colors: the global palette holds them all, so frames are exact.
+        for i, (clock, canvas) in enumerate(_replay(frames)):
+            image.seek(i)
+            assert ImageChops.difference(image.convert("RGB"), canvas).getbbox() is None
+            assert image.info["duration"] == frames[i].duration
+
+    @pytest.mark.parametrize("ext", ["png", "webp"])
+    def test_many_colors_stay_exact(self, tmp_path, ext):
+        animation = _story()
+        frames = list(animation.frames())
+        assert global_palette(frames)[1] > 256
+        image = Image.open(write_animation(tmp_path / f"story.{ext}", animation))
+        for i, (clock, canvas) in enumerate(_replay(frames)):
+            image.seek(i)
+            assert ImageChops.difference(image.convert("RGB"), canvas).getbbox() is None
+
+    def test_global_palette(self):
+        palette, colors = global_palette(_blocks().frames())
+        assert colors == 4
+        rng = random.Random(0)
+        noise = Image.frombytes("RGB", (100, 100), rng.randbytes(30000))
+        palette, colors = global_palette([AnimationFrame(noise, (0, 0, 100, 100), 100)])
+        assert colors is None
+        assert len(palette.getpalette("RGB")) == 768
+
+    def test_frame_constraints(self):
+        frame = AnimationFrame(Image.new("RGB", (4, 4)), (1, 2, 5, 6), 100)
+        with pytest.raises(ValueError, match="whole canvas"):
+            ApngWriter(io.BytesIO(), (8, 8)).write(frame)
+        with pytest.raises(ValueError, match="even"):
+            WebpWriter(io.BytesIO(), (8, 8)).write(frame)
+
+    def test_unsupported_format(self, tmp_path):
+        with pytest.raises(ValueError, match="Cannot animate"):
+            write_animation(tmp_path / "story.jpg", _blocks())
@@ -0,0 +1,54 @@
+import pytest
+from PIL import Image
+
+from src.utils.assets import CutoutLibrary
+
+
+@pytest.fixture
+def source_dir(tmp_path):
+    source = tmp_path / "src"
+    source.mkdir()
+    image = Image.new("RGBA", (400, 800), (0, 0, 0, 0))
+    image.paste((200, 100, 50, 255), (100, 200, 300, 800))
+    image.save(source / "dhaval-shrug-new-nobg.png")
+    image.save(source / "dhaval-music-nobg.png")
+    return source
+
+
+@pytest.fixture
+def library(source_dir, tmp_path):
+    return CutoutLibrary(source_dir=source_dir, cache_dir=tmp_path / "cache")
+
+
+class TestCutoutLibrary:
+    def test_pose_names(self, library):
+        assert library.poses() == ["music", "shrug"]
+
+    def test_trimmed_and_scaled(self, library):
+        image = library.get("shrug", 300)
+        assert image.size == (100, 300)
+        assert image.mode == "RGBA"
+        assert image.getpixel((0, 0)) == (200, 100, 50, 255)
+
+    def test_memory_cache_shares_images(self, library):
+        assert library.get("shrug", 300) is library.get("shrug", 300)
+        assert library.stats()["decodes"] == 1
+        assert library.stats()["hits"] == 1
+
+    def test_disk_cache_avoids_decoding_source(self, library, source_dir, tmp_path):
+        library.get("shrug", 120)
+        fresh = CutoutLibrary(source_dir=source_dir, cache_dir=tmp_path / "cache")
+        image = fresh.get("shrug", 120)
+        assert image.size == (40, 120)
+        assert fresh.stats()["decodes"] == 0
+        assert fresh.stats()["disk_hits"] == 1
+
+    def test_bounded_memory(self, source_dir, tmp_path):
+        library = CutoutLibrary(source_dir=source_dir, cache_dir=tmp_path / "c", max_bytes=60_000)
+        for height in (100, 150, 200):
+            library.get("shrug", height)
+        assert library.stats()["bytes"] <= 60_000
+
+    def test_unknown_pose(self, library):
+        with pytest.raises(ValueError):
+            library.get("moonwalk")
@@ -0,0 +1,107 @@
+import json
+
+import pytest
+
+from config import Settings
+from src import batch
+from src.batch import BatchJob, BatchRunner, campaign_jobs, load_manifest
+
+
+@pytest.fixture
+def settings():
+    return Settings()
+
+
+@pytest.fixture
+def courses_file(tmp_path):
+    path = tmp_path / "courses.json"
+    path.write_text(
+        json.dumps(
+            {
+                "courses": [
+                    {"id": "excel", "name": "Excel Course"},
+                    {"id": "sql", "name": "SQL Course"},
+                ]
+            }
+        )
+    )
+    return path
+
+
+class TestCampaignJobs:
+    def test_expands_courses_by_platform(self, settings, courses_file, tmp_path):
+        jobs = campaign_jobs(
+            courses_file,
+            settings,
+            platforms=["youtube_thumbnail", "linkedin_post"],
+            output_dir=tmp_path / "out",
+        )
+        assert [job.id for job in jobs] == [
+            "excel/youtube_thumbnail",
+            "excel/linkedin_post",
+            "sql/youtube_thumbnail",
+            "sql/linkedin_post",
+        ]
+        assert jobs[1].generator == "social"
+        assert jobs[1].params["text"] == "Excel Course"
+        assert jobs[1].params["platform"] == "linkedin"
+
+    def test_skips_platforms_without_generator(self, settings, courses_file):
+        jobs = campaign_jobs(courses_file, settings, platforms=["instagram_story"])
+        assert jobs == []
+
+
+class TestLoadManifest:
+    def test_json_manifest_with_defaults(self, settings, tmp_path):
+        manifest = tmp_path / "jobs.json"
+        manifest.write_text(
+            json.dumps(
+                {
+                    "defaults": {"platform": "youtube"},
+                    "jobs": [{"generator": "thumbnail", "params": {"title": "A"}}],
+                }
+            )
+        )
+        (job,) = load_manifest(manifest, settings)
+        assert job.generator == "thumbnail"
+        assert job.params == {"platform": "youtube", "title": "A"}
+
+
+class TestBatchRunner:
+    def test_inline_run_reports_results_and_failures(self, tmp_path):
+        jobs = [
+            BatchJob(
+                "thumbnail",
+                {"title": "Batch", "output_path": str(tmp_path / "a.png")},
+                id="good",
+            ),
+            BatchJob("hologram", {}, id="bad"),
+        ]
+        results = {r.job_id: r for r in BatchRunner(workers=1).run(jobs)}
+        assert results["good"].ok
+        assert results["good"].outputs[0].exists()
+        assert results["good"].peak_rss_kb > 0
+        assert not results["bad"].ok
+        assert "Unknown generator" in results["bad"].error
+
+    def test_inline_run_leaves_allocator_alone(self, monkeypatch, tmp_path):
+        tuned = []
+        monkeypatch.setattr(batch, "_tune_allocator", lambda: tuned.append(True))
+        job = BatchJob("thumbnail", {"title": "A", "output_path": str(tmp_path / "a.png")})
+        assert all(r.ok for r in BatchRunner(workers=1).run([job]))
+        assert not tuned
+        batch.init_pool_worker()
+        assert tuned
+
+    def test_process_pool_streams_all_results(self, tmp_path):
+        jobs = [
+            BatchJob(
+                "banner",
+                {"title": f"Banner {i}", "output_path": str(tmp_path / f"b{i}.png")},
+                id=str(i),
+            )
+            for i in range(4)
+        ]
+        results = list(BatchRunner(workers=2).run(jobs))
+        assert sorted(r.job_id for r in results) == ["0", "1", "2", "3"]
+        assert all(r.ok for r in results)
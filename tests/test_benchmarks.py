@@ -0,0 +1,31 @@
+from tests.benchmarks.suite import Case, compare, measure
+
+BASELINE = {"export/png": {"wall_ms": 40.0, "rss_mb": 44.0, "alloc_kb": 60.0}}
+
+
+class TestCompare:
+    def test_within_threshold_passes(self):
+        results = {"export/png": {"wall_ms": 48.0, "rss_mb": 45.0, "alloc_kb": 60.0}}
+        assert compare(results, BASELINE, 0.25) == []
+
+    def test_regression_reported(self):
+        results = {"export/png": {"wall_ms": 80.0, "rss_mb": 44.0, "alloc_kb": 60.0}}
+        [line] = compare(results, BASELINE, 0.25)
+        assert line.startswith("export/png: wall_ms 40.0 -> 80.0")
+
+    def test_small_absolute_change_is_noise(self):
+        baseline = {"export/pdf": {"wall_ms": 2.0, "rss_mb": 44.0, "alloc_kb": 10.0}}
+        results = {"export/pdf": {"wall_ms": 3.5, "rss_mb": 44.0, "alloc_kb": 20.0}}
+        assert compare(results, baseline, 0.25) == []
+
+    def test_new_cases_are_not_regressions(self):
+        results = {"export/tiff": {"wall_ms": 1000.0, "rss_mb": 99.0, "alloc_kb": 1.0}}
+        assert compare(results, BASELINE, 0.25) == []
+
+
+def test_measure_reports_all_metrics():
+    calls = []
+    metrics = measure(Case("noop", lambda: lambda: calls.append(bytearray(1 << 20))), repeat=2)
+    assert len(calls) == 4  # warmup, two timed runs, one traced run
+    assert metrics["alloc_kb"] >= 1024
+    assert metrics["wall_ms"] >= 0 and metrics["rss_mb"] > 0
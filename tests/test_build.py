@@ -0,0 +1,103 @@
+import os
+
+import pytest
+
+from config import BrandConfig, Settings
+from src import batch, build
+from src.batch import BatchJob
+from src.build import Builder, BuildManifest
+
+
+@pytest.fixture
+def jobs(tmp_path):
+    return [
+        BatchJob(
+            "thumbnail",
+            {"title": "Power BI", "pose": "confident", "output_path": str(tmp_path / "thumb.png")},
+            id="thumb",
+        ),
+        BatchJob("banner", {"title": "Power BI", "output_path": str(tmp_path / "banner.png")}, id="banner"),
+    ]
+
+
+@pytest.fixture
+def builder(tmp_path, monkeypatch):
+    monkeypatch.setattr(batch, "_worker_state", {})
+    return Builder(Settings(), BrandConfig(), manifest_path=tmp_path / "manifest.json", workers=1)
+
+
+def _rebuilt(builder, jobs):
+    return {result.job_id: reason for result, reason in builder.build(jobs)}
+
+
+class _EditedBrand:
+    def __init__(self, brand, key, value):
+        self.brand, self.key, self.value = brand, key, value
+
+    def lookup(self, key):
+        return self.value if key == self.key else self.brand.lookup(key)
+
+
+class TestBuilder:
+    def test_second_build_renders_nothing(self, builder, jobs, tmp_path):
+        assert _rebuilt(builder, jobs) == {"thumb": "new", "banner": "new"}
+        fresh = Builder(Settings(), BrandConfig(), manifest_path=tmp_path / "manifest.json", workers=1)
+        assert _rebuilt(fresh, jobs) == {}
+
+    def test_records_config_keys_and_files(self, builder, jobs):
+        _rebuilt(builder, jobs)
+        thumb = builder.manifest.outputs["thumb"]
+        assert "typography.heading_font" in thumb["config"]
+        assert "brand.tagline" not in thumb["config"]
+        assert any(path.endswith("dhaval-confident-new-nobg.png") for path in thumb["files"])
+
+    def test_brand_edit_only_invalidates_readers(self, builder, jobs):
+        _rebuilt(builder, jobs)
+        edited = Builder(Settings(), _EditedBrand(BrandConfig(), "brand.tagline", "New"),
+                         manifest_path=builder.manifest.path, workers=1)
+        assert [(job.id, reason) for job, reason in edited.plan(jobs)] == [
+            ("banner", "brand key 'brand.tagline' changed")
+        ]
+
+    def test_code_change_invalidates_all(self, builder, jobs, monkeypatch):
+        _rebuilt(builder, jobs)
+        monkeypatch.setattr(build, "code_fingerprint", lambda: "edited")
+        edited = Builder(Settings(), BrandConfig(), manifest_path=builder.manifest.path, workers=1)
+        assert {reason for _, reason in edited.plan(jobs)} == {"generator changed"}
+
+    def test_deleted_output_is_rebuilt(self, builder, jobs, tmp_path):
+        _rebuilt(builder, jobs)
+        os.unlink(tmp_path / "banner.png")
+        assert _rebuilt(builder, jobs) == {"banner": "output missing"}
+        assert (tmp_path / "banner.png").exists()
+
+    def test_changed_data_record(self, builder, tmp_path):
+        job = BatchJob("social", {"text": "SQL", "output_path": str(tmp_path / "sql.png")},
+                       id="sql/linkedin_post", record={"id": "sql", "price": 10})
+        _rebuilt(builder, [job])
+        job.record = {"id": "sql", "price": 12}
+        assert builder.stale_reason(job) == "data record changed"
+
+
+class TestBuildManifest:
+    def test_hashes_only_when_stat_changes(self, tmp_path, monkeypatch):
+        source = tmp_path / "cutout.png"
+        source.write_bytes(b"pixels")
+        manifest = BuildManifest(tmp_path / "manifest.json")
+        digest = manifest.file_digest(str(source))
+        manifest.save()
+
+        def fail(path):
+            raise AssertionError("re-hashed an unchanged file")
+
+        monkeypatch.setattr(build, "_hash_file", fail)
+        assert BuildManifest(tmp_path / "manifest.json").file_digest(str(source)) == digest
+
+    def test_touched_file_keeps_digest(self, tmp_path):
+        source = tmp_path / "cutout.png"
+        source.write_bytes(b"pixels")
+        digest = BuildManifest(tmp_path / "m.json").file_digest(str(source))
+        os.utime(source, ns=(1, 1))
+        assert BuildManifest(tmp_path / "m.json").file_digest(str(source)) == digest
+        source.write_bytes(b"other pixels")
+        assert BuildManifest(tmp_path / "m.json").file_digest(str(source)) != digest
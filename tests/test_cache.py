@@ -0,0 +1,67 @@
+import pytest
+
+from config import Settings, BrandConfig
+from src.cache import PACKAGE_DIR, RenderCache, _source_files
+from src.generators.carousel import CarouselGenerator
+from src.generators.thumbnail import ThumbnailGenerator
+
+
+@pytest.fixture
+def settings():
+    return Settings()
+
+
+@pytest.fixture
+def brand():
+    return BrandConfig()
+
+
+class TestRenderCache:
+    def test_key_depends_on_params_not_output_name(self, settings, brand, tmp_path):
+        cache = RenderCache(settings, cache_dir=tmp_path / "cache")
+        gen = ThumbnailGenerator(settings, brand)
+        a = cache.key(gen, {"title": "A", "output_path": "x.png"})
+        b = cache.key(gen, {"title": "A", "output_path": "y.png"})
+        c = cache.key(gen, {"title": "B", "output_path": "x.png"})
+        assert a == b
+        assert a != c
+
+    def test_hit_restores_output_without_rendering(self, settings, brand, tmp_path):
+        cache = RenderCache(settings, cache_dir=tmp_path / "cache", max_bytes=None)
+        gen = ThumbnailGenerator(settings, brand)
+        first = cache.render(gen, title="Cached", output_path=str(tmp_path / "a.png"))
+        second = cache.render(gen, title="Cached", output_path=str(tmp_path / "b.png"))
+        assert (cache.hits, cache.misses) == (1, 1)
+        assert second == tmp_path / "b.png"
+        assert first.read_bytes() == second.read_bytes()
+
+    def test_output_format_is_part_of_key(self, settings, brand, tmp_path):
+        cache = RenderCache(settings, cache_dir=tmp_path / "cache", max_bytes=None)
+        gen = ThumbnailGenerator(settings, brand)
+        cache.render(gen, title="Cached", output_path=str(tmp_path / "a.jpg"))
+        png = cache.render(gen, title="Cached", output_path=str(tmp_path / "b.png"))
+        assert (cache.hits, cache.misses) == (0, 2)
+        assert png.read_bytes().startswith(b"\x89PNG")
+
+    def test_fingerprint_covers_render_path(self):
+        files = {path.relative_to(PACKAGE_DIR).as_posix() for path in _source_files()}
+        assert {"render/scene.py", "exporters/pdf.py", "utils/text.py", "profiling.py"} <= files
+
+    def test_list_outputs(self, settings, brand, tmp_path):
+        cache = RenderCache(settings, cache_dir=tmp_path / "cache", max_bytes=None)
+        gen = CarouselGenerator(settings, brand)
+        cache.render(gen, title="Deck", num_slides=2, output_path=str(tmp_path / "one"))
+        slides = cache.render(gen, title="Deck", num_slides=2, output_path=str(tmp_path / "two"))
+        assert cache.hits == 1
+        assert [p.name for p in slides] == ["slide_01.png", "slide_02.png"]
+        assert all(p.parent == tmp_path / "two" and p.exists() for p in slides)
+
+    def test_prune_evicts_least_recently_used(self, settings, brand, tmp_path):
+        cache = RenderCache(settings, cache_dir=tmp_path / "cache", max_bytes=None)
+        gen = ThumbnailGenerator(settings, brand)
+        for title in ("one", "two"):
+            cache.render(gen, title=title, output_path=str(tmp_path / f"{title}.png"))
+        assert cache.stats()["entries"] == 2
+        removed, freed = cache.prune(0)
+        assert removed == 2 and freed > 0
+        assert cache.stats()["entries"] == 0
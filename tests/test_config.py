@@ -0,0 +1,62 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from config import BrandConfig, Settings
+from config import brand as brand_module
+
+BRAND_YAML = """\
+brand:
+  name: {name}
+  tagline: Test
+colors: {{}}
+typography: {{}}
+logo: {{}}
+defaults: {{}}
+"""
+
+
+@pytest.fixture
+def brand_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(Settings, "CACHE_DIR", tmp_path / "cache")
+    monkeypatch.setattr(brand_module, "_parsed", {})
+    path = tmp_path / "brand.yaml"
+    path.write_text(BRAND_YAML.format(name="First"))
+    return path
+
+
+class TestBrandConfigCache:
+    def test_reuses_parse_while_unchanged(self, brand_file):
+        first = BrandConfig(str(brand_file))
+        second = BrandConfig(str(brand_file))
+        assert second._config is first._config
+
+    def test_reloads_when_file_changes(self, brand_file):
+        assert BrandConfig(str(brand_file)).name == "First"
+        brand_file.write_text(BRAND_YAML.format(name="Second name"))
+        assert BrandConfig(str(brand_file)).name == "Second name"
+
+    def test_fresh_process_state_uses_disk_cache(self, brand_file, monkeypatch):
+        original = BrandConfig(str(brand_file))
+        monkeypatch.setattr(brand_module, "_parsed", {})
+
+        def fail(path):
+            raise AssertionError("brand.yaml was re-parsed")
+
+        monkeypatch.setattr(brand_module, "_parse_yaml", fail)
+        reloaded = BrandConfig(str(brand_file))
+        assert reloaded.content_hash == original.content_hash
+
+
+def test_cli_import_is_lightweight():
+    code = (
+        "import sys, src.main; "
+        "print(sorted(m for m in ('PIL', 'yaml', 'numpy', 'config') if m in sys.modules))"
+    )
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True, env=env
+    )
+    assert result.stdout.strip() == "[]"
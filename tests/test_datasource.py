@@ -0,0 +1,132 @@
+import json
+import tracemalloc
+from pathlib import Path
+
+import pytest
+
+from config import Settings
+from src.batch import iter_manifest
+from src.datasource import fill_template, iter_records, source_jobs
+
+CATALOG = Path(__file__).resolve().parents[1] / "data" / "courses.json"
+
+
+class TestIterRecords:
+    def test_streams_catalog_courses(self):
+        expected = json.loads(CATALOG.read_text())["courses"]
+        # A tiny chunk size splits strings, numbers and escapes across reads.
+        assert list(iter_records(CATALOG, "courses", chunk_size=7)) == expected
+
+    def test_nested_path_and_skipped_values(self, tmp_path):
+        path = tmp_path / "data.json"
+        data = {
+            "meta": {"note": "brackets ] } and \\\" quotes", "n": [1, [2, {}]]},
+            "export": {"count": 3, "rows": [{"a": 1}, {"a": -2.5e3}, {"a": None}]},
+        }
+        path.write_text(json.dumps(data, indent=2))
+        rows = list(iter_records(path, "export.rows", chunk_size=5))
+        assert rows == data["export"]["rows"]
+
+    @pytest.mark.parametrize("chunk_size", [1, 2, 3])
+    def test_values_across_chunks(self, tmp_path, chunk_size):
+        path = tmp_path / "data.json"
+        path.write_text(
+            '{"skip": 12.5e-3, "n": -0.25, "rows": [1.5e3, 20, -7E+2, {"a": 10.75, "p": "₹499"}]}',
+            encoding="utf-8",
+        )
+        rows = list(iter_records(path, "rows", chunk_size=chunk_size))
+        assert rows == [1500.0, 20, -700.0, {"a": 10.75, "p": "₹499"}]
+
+    def test_missing_key(self, tmp_path):
+        path = tmp_path / "data.json"
+        path.write_text('{"courses": []}')
+        assert list(iter_records(path, "courses")) == []
+        with pytest.raises(ValueError, match="no key 'rows'"):
+            list(iter_records(path, "rows"))
+
+    def test_jsonl_and_csv(self, tmp_path):
+        jsonl = tmp_path / "rows.jsonl"
+        jsonl.write_text('{"id": "a"}\n\n{"id": "b"}\n')
+        assert [r["id"] for r in iter_records(jsonl)] == ["a", "b"]
+
+        csv_path = tmp_path / "rows.csv"
+        csv_path.write_text('id,name\nsql,"SQL, Basics"\n')
+        assert list(iter_records(csv_path)) == [{"id": "sql", "name": "SQL, Basics"}]
+
+    def test_memory_stays_flat(self, tmp_path):
+        path = tmp_path / "big.json"
+        with open(path, "w") as f:
+            f.write('{"courses": [')
+            f.write(",".join(
+                json.dumps({"id": f"c{i}", "name": "Course " * 20}) for i in range(20000)
+            ))
+            f.write("]}")
+
+        tracemalloc.start()
+        try:
+            count = sum(1 for _ in iter_records(path, "courses"))
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        assert count == 20000
+        assert peak < path.stat().st_size / 10
+
+
+class TestMapping:
+    def test_fill_template(self):
+        record = {"id": "pbi", "name": "Power BI", "price": {"INR": 4999}, "slides": "5"}
+        template = {
+            "title": "Learn {name} for ₹{price.INR}",
+            "price": "{price.INR}",
+            "num_slides": "{slides!i}",
+            "tags": ["{id}", 3],
+        }
+        assert fill_template(template, record) == {
+            "title": "Learn Power BI for ₹4999",
+            "price": 4999,
+            "num_slides": 5,
+            "tags": ["pbi", 3],
+        }
+
+    def test_source_jobs_filter_and_limit(self, tmp_path):
+        spec = {
+            "path": str(CATALOG),
+            "records": "courses",
+            "where": {"partOfBootcamp": "ds-bootcamp", "category": ["AI", "Data Science"]},
+            "limit": 2,
+            "jobs": [
+                {
+                    "generator": "thumbnail",
+                    "id": "ads/{id}",
+                    "params": {"title": "{name}", "output_path": "out/{id}.png"},
+                }
+            ],
+        }
+        jobs = list(source_jobs(spec, defaults={"platform": "youtube"}))
+        assert len(jobs) == 2
+        assert jobs[0].id == f"ads/{jobs[0].record['id']}"
+        assert jobs[0].params["title"] == jobs[0].record["name"]
+        assert jobs[0].params["platform"] == "youtube"
+
+    def test_missing_field_names_record(self, tmp_path):
+        path = tmp_path / "rows.jsonl"
+        path.write_text('{"id": "a"}\n')
+        spec = {"path": str(path), "jobs": [{"generator": "banner", "params": {"title": "{name}"}}]}
+        with pytest.raises(ValueError, match="Record 1 .* no field"):
+            list(source_jobs(spec))
+
+
+def test_manifest_sources_are_lazy(tmp_path):
+    (tmp_path / "rows.csv").write_text("id,title\na,Alpha\nb,Beta\n")
+    manifest = tmp_path / "ads.json"
+    manifest.write_text(json.dumps({
+        "sources": [{
+            "path": "rows.csv",
+            "jobs": [{"generator": "banner", "params": {"title": "{title}"}}],
+        }],
+    }))
+    jobs = iter_manifest(manifest, Settings())
+    first = next(jobs)
+    assert first.params == {"title": "Alpha"}
+    assert first.record == {"id": "a", "title": "Alpha"}
+    assert [job.params["title"] for job in jobs] == ["Beta"]
@@ -0,0 +1,96 @@
+import io
+import os
+
+import pytest
+from PIL import Image, ImageDraw
+
+from config import Settings
+from src.utils.encode import encode_optimized, encoder_profile
+from src.utils.gradient import linear_gradient
+
+
+def _flat_graphic() -> Image.Image:
+    image = Image.new("RGB", (400, 200), "#0d1117")
+    draw = ImageDraw.Draw(image)
+    draw.rectangle([0, 0, 400, 20], fill="#fbbc04")
+    draw.ellipse([100, 50, 300, 150], fill="#1a73e8")
+    return image
+
+
+def _noise(size=(256, 256)) -> Image.Image:
+    return Image.frombytes("RGB", size, os.urandom(size[0] * size[1] * 3))
+
+
+class TestEncodeOptimized:
+    def test_flat_png_becomes_exact_palette(self):
+        image = _flat_graphic()
+        data, stats = encode_optimized(
+            image, "png", {"palette": True}, baseline={}
+        )
+        decoded = Image.open(io.BytesIO(data))
+        assert decoded.mode == "P"
+        assert decoded.convert("RGB").tobytes() == image.tobytes()
+        assert stats.options["palette"] is True
+        assert stats.saved > 0
+
+    def test_gradient_png_is_exact(self):
+        # A two-stop ramp has at most 256 distinct colors, so it converts
+        # to a palette without loss.
+        image = linear_gradient((64, 600), ["#000000", "#1a73e8"])
+        data, _ = encode_optimized(image, "png", {"palette": True})
+        assert Image.open(io.BytesIO(data)).convert("RGB").tobytes() == image.tobytes()
+
+    def test_lossy_palette_is_opt_in(self):
+        image = linear_gradient((16, 600), ["#000000", "#1a73e8", "#fbbc04"])
+        assert len(image.getcolors(4096)) > 256
+        data, stats = encode_optimized(image, "png", encoder_profile(Settings(), "png"))
+        assert Image.open(io.BytesIO(data)).convert("RGB").tobytes() == image.tobytes()
+        assert stats.options["palette"] is False
+        data, stats = encode_optimized(image, "png", {"palette": True, "palette_max_colors": 4096})
+        assert Image.open(io.BytesIO(data)).mode == "P"
+
+    def test_photo_like_png_keeps_truecolor(self):
+        data, stats = encode_optimized(
+            _noise(), "png", {"palette": True, "palette_max_colors": 512}
+        )
+        assert Image.open(io.BytesIO(data)).mode == "RGB"
+        assert stats.options["palette"] is False
+
+    def test_webp_auto_lossless_for_flat_images(self):
+        image = _flat_graphic()
+        data, stats = encode_optimized(image, "webp", {"quality": 90, "lossless": "auto"})
+        assert stats.options.get("lossless") is True
+        assert Image.open(io.BytesIO(data)).convert("RGB").tobytes() == image.tobytes()
+
+    def test_jpeg_quality_bisected_to_byte_budget(self):
+        image = _noise()
+        full, _ = encode_optimized(image, "jpg", {"quality": 95})
+        budget = len(full) // 2
+        data, stats = encode_optimized(image, "jpg", {"quality": 95, "max_bytes": budget})
+        assert len(data) <= budget
+        assert 40 <= stats.options["quality"] < 95
+        assert not stats.over_budget
+
+    def test_unreachable_budget_is_flagged(self):
+        data, stats = encode_optimized(_noise(), "jpg", {"quality": 95, "max_bytes": 100})
+        assert stats.over_budget
+        assert stats.options["quality"] == 40
+
+    def test_progressive_jpeg(self):
+        data, _ = encode_optimized(_flat_graphic(), "jpg", {"quality": 90, "progressive": True})
+        assert Image.open(io.BytesIO(data)).info.get("progressive")
+
+
+def test_encoder_profile_platform_overrides():
+    settings = Settings()
+    profile = encoder_profile(settings, "jpg", "youtube_thumbnail")
+    assert profile["max_bytes"] == 2 * 1024 * 1024
+    assert profile["progressive"] is True
+    assert "max_bytes" not in encoder_profile(settings, "jpg", "linkedin_banner")
+
+
+@pytest.mark.parametrize("fmt", ["png", "jpg", "webp", "pdf"])
+def test_every_supported_format_encodes(fmt):
+    profile = encoder_profile(Settings(), fmt)
+    data, stats = encode_optimized(_flat_graphic(), fmt, profile)
+    assert stats.bytes == len(data) > 0
@@ -0,0 +1,74 @@
+import io
+import tarfile
+import zipfile
+
+import pytest
+from PIL import Image
+
+from config import Settings
+from src.exporters import Exporter, MemorySink, TarSink, ZipSink
+
+
+@pytest.fixture
+def exporter(tmp_path):
+    return Exporter(Settings(), output_dir=tmp_path, max_workers=4)
+
+
+class TestExporter:
+    def test_export_returns_paths_in_requested_order(self, exporter, tmp_path):
+        image = Image.new("RGB", (64, 32), (26, 115, 232))
+        paths = exporter.export(image, "asset", ["webp", "png", "jpg"])
+        assert paths == [tmp_path / "asset.webp", tmp_path / "asset.png", tmp_path / "asset.jpg"]
+        assert all(p.exists() for p in paths)
+
+    def test_rgba_exports_to_jpeg(self, exporter):
+        image = Image.new("RGBA", (64, 32), (26, 115, 232, 128))
+        (jpg, png) = exporter.export(image, "alpha", ["jpg", "png"])
+        assert Image.open(jpg).mode == "RGB"
+        assert Image.open(png).mode == "RGBA"
+
+    def test_export_batch_orders_by_image_then_format(self, exporter, tmp_path):
+        images = [(Image.new("RGB", (16, 16)), f"img{i}") for i in range(3)]
+        paths = exporter.export_batch(images, ["png", "jpg"])
+        assert [p.name for p in paths] == [
+            "img0.png", "img0.jpg", "img1.png", "img1.jpg", "img2.png", "img2.jpg",
+        ]
+
+    def test_unsupported_format_writes_nothing(self, exporter, tmp_path):
+        with pytest.raises(ValueError):
+            exporter.export(Image.new("RGB", (8, 8)), "bad", ["png", "tiff"])
+        assert list(tmp_path.iterdir()) == []
+
+    def test_no_temp_files_left_behind(self, exporter, tmp_path):
+        exporter.export(Image.new("RGB", (8, 8)), "clean", ["png", "webp"])
+        assert sorted(p.name for p in tmp_path.iterdir()) == ["clean.png", "clean.webp"]
+
+
+class TestSinks:
+    def test_memory_sink(self):
+        sink = MemorySink()
+        exporter = Exporter(Settings(), sink=sink, max_workers=2)
+        (png, jpg) = exporter.export(Image.new("RGB", (16, 8)), "mem", ["png", "jpg"])
+        assert isinstance(png, memoryview)
+        assert sorted(sink.files) == ["mem.jpg", "mem.png"]
+        assert Image.open(io.BytesIO(sink.files["mem.jpg"])).format == "JPEG"
+
+    def test_zip_sink(self, tmp_path):
+        archive = tmp_path / "assets.zip"
+        images = [(Image.new("RGB", (16, 16)), f"img{i}") for i in range(3)]
+        with ZipSink(archive) as sink:
+            names = Exporter(Settings(), sink=sink).export_batch(images, ["png", "webp"])
+        assert names[:2] == ["img0.png", "img0.webp"]
+        with zipfile.ZipFile(archive) as zf:
+            assert sorted(zf.namelist()) == sorted(names)
+            assert Image.open(io.BytesIO(zf.read("img2.webp"))).size == (16, 16)
+        assert [p.name for p in tmp_path.iterdir()] == ["assets.zip"]
+
+    def test_tar_sink_streams_to_file_object(self):
+        stream = io.BytesIO()
+        with TarSink(stream) as sink:
+            Exporter(Settings(), sink=sink).export(Image.new("RGB", (8, 8)), "t", ["png"])
+        stream.seek(0)
+        with tarfile.open(fileobj=stream) as tf:
+            assert tf.getnames() == ["t.png"]
+            assert Image.open(tf.extractfile("t.png")).size == (8, 8)
@@ -2,10 +2,13 @@ from pathlib import Path
 from unittest.mock import patch
 
 import pytest
+from PIL import Image
 
 from config import Settings, BrandConfig
 from src.generators.thumbnail import ThumbnailGenerator
 from src.generators.banner import BannerGenerator
+from src.generators.carousel import CarouselGenerator
+from src.generators.story import StoryGenerator
 
 
 @pytest.fixture
@@ -30,11 +33,40 @@ class TestThumbnailGenerator:
         gen = ThumbnailGenerator(settings, brand)
         output = tmp_path / "thumb.png"
         gen.generate(title="Test", output_path=str(output))
-        from PIL import Image
-
         img = Image.open(output)
         assert img.size == (1280, 720)
 
+    def test_generate_bytes_matches_file(self, settings, brand, tmp_path):
+        gen = ThumbnailGenerator(settings, brand)
+        output = tmp_path / "thumb.png"
+        gen.generate(title="Same", output_path=str(output))
+        buffer = gen.generate_bytes(title="Same")
+        assert buffer.getvalue() == output.read_bytes()
+        assert list(tmp_path.iterdir()) == [output]
+
+    def test_render_returns_image(self, settings, brand):
+        image = ThumbnailGenerator(settings, brand).render(title="Raw")
+        assert image.mode == "RGB"
+        assert image.size == (1280, 720)
+
+
+    def test_render_all_sizes(self, settings, brand):
+        gen = ThumbnailGenerator(settings, brand)
+        images = gen.render_all(["twitter_post", "instagram_post", "instagram_carousel"], title="All")
+        assert list(images) == ["twitter_post", "instagram_post", "instagram_carousel"]
+        assert images["twitter_post"].size == (1200, 675)
+        # Keys of the same size are rendered once and copied.
+        assert images["instagram_post"] is not images["instagram_carousel"]
+        assert images["instagram_post"].tobytes() == images["instagram_carousel"].tobytes()
+        native = gen.render("All", size=(1200, 675))
+        assert images["twitter_post"].tobytes() == native.tobytes()
+
+    def test_generate_all_uses_platform_profiles(self, settings, brand, tmp_path):
+        gen = ThumbnailGenerator(settings, brand)
+        saved = gen.generate_all(tmp_path, ["youtube_thumbnail", "linkedin_banner"], title="All")
+        assert saved["linkedin_banner"] == tmp_path / "linkedin_banner.png"
+        assert all(path.exists() for path in saved.values())
+
 
 class TestBannerGenerator:
     def test_generate_creates_file(self, settings, brand, tmp_path):
@@ -43,3 +75,100 @@ class TestBannerGenerator:
         result = gen.generate(title="Test Banner", output_path=str(output))
         assert result.exists()
         assert result.suffix == ".png"
+
+    def test_fit_title_long_course_name(self, settings, brand, tmp_path):
+        gen = BannerGenerator(settings, brand)
+        output = tmp_path / "fit_banner.png"
+        gen.generate(
+            title="Data Engineering Bootcamp with Virtual Internship and Projects",
+            platform="linkedin",
+            output_path=str(output),
+            fit_title=True,
+        )
+        assert Image.open(output).size == (1584, 396)
+
+    def test_generate_print_streams_strips(self, settings, brand, tmp_path):
+        gen = BannerGenerator(settings, brand)
+        with patch.object(Settings, "PRINT_SIZES", {"poster": (12, 4)}):
+            path = gen.generate_print("Print", "poster", str(tmp_path / "p.tif"), dpi=50)
+        image = Image.open(path)
+        assert image.size == (600, 200)
+        assert image.info["dpi"] == (50, 50)
+        with pytest.raises(ValueError, match="Unknown print size"):
+            gen.generate_print("Print", "mural")
+
+    @pytest.mark.skipif(not Path("/proc/self/clear_refs").exists(), reason="Linux only")
+    def test_generate_print_memory_is_bounded(self, settings, brand, tmp_path):
+        from src.profiling import peak_memory
+
+        gen = BannerGenerator(settings, brand)
+        with peak_memory() as idle:
+            pass
+        with peak_memory() as job:
+            # 12000 x 4500: a 162 MB canvas if rendered whole.
+            gen.generate_print("Print", "event_banner", str(tmp_path / "p.png"), dpi=125)
+        assert job["peak_rss_kb"] - idle["peak_rss_kb"] < 60 * 1024
+
+
+class TestCarouselGenerator:
+    def test_generate_bytes_per_slide(self, settings, brand):
+        buffers = CarouselGenerator(settings, brand).generate_bytes(
+            "jpg", title="Slides", num_slides=3
+        )
+        assert len(buffers) == 3
+        assert {Image.open(b).format for b in buffers} == {"JPEG"}
+
+    def test_render_all_returns_slides_per_size(self, settings, brand):
+        gen = CarouselGenerator(settings, brand)
+        slides = gen.render_all(["linkedin_post"], title="Deck", num_slides=2)
+        assert [s.size for s in slides["linkedin_post"]] == [(1200, 627)] * 2
+
+    def test_render_slides_are_independent(self, settings, brand):
+        slides = CarouselGenerator(settings, brand).render(title="Slides", num_slides=2)
+        assert slides[0].tobytes() != slides[1].tobytes()
+
+    def test_generate_pdf_pages_match_slides(self, settings, brand, tmp_path):
+        from tests.test_pdf import _pages
+
+        gen = CarouselGenerator(settings, brand)
+        (path,) = gen.generate(title="Deck", num_slides=4, output_path=str(tmp_path / "deck.pdf"))
+        pages = _pages(path.read_bytes())
+        slides = gen.render(title="Deck", num_slides=4)
+        assert [page.tobytes() for page in pages] == [slide.tobytes() for slide in slides]
+
+    def test_generate_pdf_stays_small_and_flat(self, settings, brand, tmp_path):
+        from src.profiling import peak_memory
+
+        gen = CarouselGenerator(settings, brand)
+        with peak_memory() as short:
+            gen.generate_pdf("Deck", 10, "linkedin", str(tmp_path / "short.pdf"))
+        with peak_memory() as long:
+            path = gen.generate_pdf("Deck", 50, "linkedin", str(tmp_path / "long.pdf"))
+        data = path.read_bytes()
+        # One shared background; each slide adds only its counter and title.
+        assert data.count(b"/Subtype /Image") <= 2 * 50 + 3
+        assert len(data) < 2 * 1024 * 1024
+        assert long["peak_rss_kb"] - short["peak_rss_kb"] < 10 * 1024
+
+
+class TestStoryGenerator:
+    def test_generate_animated_webp(self, settings, brand, tmp_path):
+        gen = StoryGenerator(settings, brand)
+        path = gen.generate(
+            title="SQL Bootcamp", text="Joins and windows", output_path=str(tmp_path / "story.webp")
+        )
+        image = Image.open(path)
+        assert image.size == (1080, 1920)
+        assert 1 < image.n_frames < 90
+        total = 0
+        for i in range(image.n_frames):
+            image.seek(i)
+            image.load()
+            total += image.info["duration"]
+        assert total == 3000
+
+    def test_still_formats_save_last_frame(self, settings, brand, tmp_path):
+        gen = StoryGenerator(settings, brand)
+        path = gen.generate(title="SQL Bootcamp", output_path=str(tmp_path / "story.jpg"))
+        assert Image.open(path).format == "JPEG"
+        assert gen.render(title="SQL Bootcamp").size == (1080, 1920)
@@ -0,0 +1,117 @@
+import io
+import random
+import re
+import zlib
+
+import pytest
+from PIL import Image
+
+from src.exporters import PdfWriter, write_pdf
+
+
+def _objects(data):
+    """Object number -> (dictionary, stream), located through the xref table."""
+    xref = int(re.search(rb"startxref\n(\d+)", data).group(1))
+    count = int(re.match(rb"xref\n0 (\d+)\n", data[xref:]).group(1))
+    rows = data[xref:].split(b"\n")[3 : 2 + count]
+    objects = {}
+    for number, row in enumerate(rows, start=1):
+        offset = int(row[:10])
+        header = b"%d 0 obj\n" % number
+        assert data[offset : offset + len(header)] == header
+        start = offset + len(header)
+        length = re.match(rb"<<[^\n]*?/Length (\d+)", data[start:])
+        if length:
+            body_end = data.index(b"\nstream\n", start)
+            stream_start = body_end + len(b"\nstream\n")
+            stream = data[stream_start : stream_start + int(length.group(1))]
+        else:
+            body_end = data.index(b"\nendobj", start)
+            stream = None
+        objects[number] = (data[start:body_end], stream)
+    return objects
+
+
+def _decode_image(body, stream):
+    width = int(re.search(rb"/Width (\d+)", body).group(1))
+    height = int(re.search(rb"/Height (\d+)", body).group(1))
+    if b"/DCTDecode" in body:
+        return Image.open(io.BytesIO(stream)).convert("RGB")
+    pixels = zlib.decompress(stream)
+    indexed = re.search(rb"/Indexed /DeviceRGB \d+ <([0-9a-f]+)>", body)
+    if indexed:
+        image = Image.frombytes("P", (width, height), pixels)
+        image.putpalette(bytes.fromhex(indexed.group(1).decode()))
+    elif b"/DeviceGray" in body:
+        image = Image.frombytes("L", (width, height), pixels)
+    else:
+        image = Image.frombytes("RGB", (width, height), pixels)
+    return image.convert("RGB")
+
+
+def _pages(data):
+    """Rasterize every page by replaying its image placements."""
+    objects = _objects(data)
+    kids = re.search(rb"/Kids \[([^\]]*)\]", objects[2][0]).group(1)
+    pages = []
+    for kid in re.findall(rb"(\d+) 0 R", kids):
+        body = objects[int(kid)][0]
+        width, height = map(int, re.search(rb"/MediaBox \[0 0 (\d+) (\d+)\]", body).groups())
+        names = dict(re.findall(rb"/(Im\d+) (\d+) 0 R", body))
+        contents = int(re.search(rb"/Contents (\d+) 0 R", body).group(1))
+        page = Image.new("RGB", (width, height))
+        for w, h, x, y, name in re.findall(
+            rb"q (\d+) 0 0 (\d+) (\d+) (\d+) cm /(Im\d+) Do Q",
+            zlib.decompress(objects[contents][1]),
+        ):
+            image = _decode_image(*objects[int(names[name])])
+            assert image.size == (int(w), int(h))
+            page.paste(image, (int(x), height - int(y) - int(h)))
+        pages.append(page)
+    return pages
+
+
+def _noise(size, seed=0):
+    rng = random.Random(seed)
+    return Image.frombytes("RGB", size, rng.randbytes(size[0] * size[1] * 3))
+
+
+class TestPdfWriter:
+    def test_pages_round_trip(self, tmp_path):
+        background = Image.new("RGB", (120, 80), (13, 17, 23))
+        bars = [Image.new("RGB", (120, 8), color) for color in ((26, 115, 232), (251, 188, 4))]
+        pages = [
+            ((120, 80), [(background, (0, 0, 120, 80)), (bars[i % 2], (0, 0, 120, 8))])
+            for i in range(4)
+        ]
+        path = write_pdf(tmp_path / "deck.pdf", pages)
+        data = path.read_bytes()
+        assert data.startswith(b"%PDF-1.4") and data.endswith(b"%%EOF\n")
+        rendered = _pages(data)
+        assert len(rendered) == 4
+        for i, page in enumerate(rendered):
+            expected = background.copy()
+            expected.paste(bars[i % 2], (0, 0))
+            assert page.tobytes() == expected.tobytes()
+        # The background and both bars are embedded once each.
+        assert data.count(b"/Subtype /Image") == 3
+
+    def test_compression_chosen_per_image(self):
+        writer = PdfWriter(io.BytesIO())
+        flat = writer.add_image(Image.new("RGB", (64, 64), (26, 115, 232)))
+        photo = writer.add_image(_noise((128, 128)))
+        assert writer.images[flat][1] == "FlateDecode"
+        assert writer.images[photo][1] == "DCTDecode"
+
+    def test_gray_and_rgba_images(self, tmp_path):
+        gray = Image.linear_gradient("L").resize((32, 32))
+        rgba = Image.new("RGBA", (32, 32), (255, 0, 0, 255))
+        pages = [((64, 32), [(gray, (0, 0, 32, 32)), (rgba, (32, 0, 64, 32))])]
+        page = _pages(write_pdf(tmp_path / "modes.pdf", pages).read_bytes())[0]
+        assert page.getpixel((5, 31)) == (gray.getpixel((5, 31)),) * 3
+        assert page.getpixel((40, 10)) == (255, 0, 0)
+
+    def test_empty_document(self, tmp_path):
+        with pytest.raises(ValueError, match="at least one page"):
+            write_pdf(tmp_path / "empty.pdf", [])
+        assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,90 @@
+import json
+import pstats
+
+from PIL import Image
+
+from config import BrandConfig, Settings
+from src import batch
+from src.batch import BatchJob, BatchRunner
+from src.exporters import Exporter, MemorySink
+from src.generators.banner import BannerGenerator
+from src.profiling import Tracer, current, peak_memory, profile_job, span
+from src.render.scene import base_cache
+
+
+class TestTracer:
+    def test_span_records_duration_and_pixels(self):
+        tracer = Tracer("unit")
+        with tracer.activate():
+            with span("stage", pixels=100) as info:
+                info["extra"] = 1
+            with span("stage", pixels=50):
+                pass
+        assert [e["name"] for e in tracer.events] == ["stage", "stage"]
+        assert tracer.events[0]["args"] == {"pixels": 100, "extra": 1}
+        assert tracer.counters["pixels.stage"] == 150
+
+    def test_span_is_a_no_op_without_tracer(self):
+        assert current() is None
+        with span("stage", pixels=1) as info:
+            assert info is None
+
+    def test_chrome_trace_format(self):
+        tracer = Tracer("unit")
+        with tracer.span("stage"):
+            pass
+        events = tracer.chrome_trace()["traceEvents"]
+        assert [e["ph"] for e in events] == ["M", "X", "C"]
+
+
+def test_generator_stages_and_cache_counters():
+    base_cache.clear()
+    generator = BannerGenerator(Settings(), BrandConfig())
+    generator.tracer = Tracer("banner")
+    generator.generate_bytes("png", title="Traced")
+    stages = generator.tracer.stage_totals()
+    assert {"generate_bytes", "render", "scene.base", "scene.layers", "encode"} <= set(stages)
+    assert generator.tracer.counters["scene_cache.misses"] == 1
+    assert generator.tracer.counters["pixels.encode"] == 2560 * 1440
+
+
+def test_exporter_threads_record_into_caller_tracer():
+    exporter = Exporter(Settings(), max_workers=3, sink=MemorySink())
+    exporter.tracer = Tracer("export")
+    exporter.export(Image.new("RGB", (32, 32)), "asset", ["png", "jpg", "webp"])
+    encodes = [e for e in exporter.tracer.events if e["name"] == "encode"]
+    assert sorted(e["args"]["format"] for e in encodes) == ["jpg", "png", "webp"]
+
+
+def test_profile_job_writes_trace_files(tmp_path):
+    with profile_job(tmp_path, "job1"):
+        with span("stage", pixels=4):
+            pass
+    lines = [json.loads(line) for line in (tmp_path / "job1.trace.jsonl").read_text().splitlines()]
+    assert lines[-1]["type"] == "counters" and lines[-1]["pixels.stage"] == 4
+    assert json.loads((tmp_path / "job1.trace.json").read_text())["traceEvents"]
+    assert pstats.Stats(str(tmp_path / "job1.prof")).total_calls > 0
+
+
+def test_peak_memory_reports_job_peak():
+    tracer = Tracer("memory")
+    with tracer.activate(), peak_memory() as memory:
+        block = bytearray(32 * 1024 * 1024)
+        block[::4096] = b"x" * len(block[::4096])
+        del block
+    assert memory["peak_rss_kb"] >= 32 * 1024
+    assert tracer.counters["memory.peak_rss_kb"] == memory["peak_rss_kb"]
+
+
+def test_batch_profiles_each_job(tmp_path, monkeypatch):
+    # Inline runs keep worker state in this process; don't leak profile_dir.
+    monkeypatch.setattr(batch, "_worker_state", {})
+    jobs = [
+        BatchJob("social", {"text": "One", "output_path": str(tmp_path / "one.png")}, id="one"),
+        BatchJob("social", {"text": "Two", "output_path": str(tmp_path / "two.png")}, id="two"),
+    ]
+    profile_dir = tmp_path / "profile"
+    results = list(BatchRunner(workers=1, profile_dir=profile_dir).run(jobs))
+    assert all(r.ok for r in results)
+    assert len(list(profile_dir.glob("*.trace.jsonl"))) == 2
+    assert len(list(profile_dir.glob("*.prof"))) == 2
@@ -0,0 +1,162 @@
+from dataclasses import dataclass
+
+import pytest
+from PIL import Image, ImageDraw
+
+from src.render import (
+    CenteredText,
+    Faded,
+    Fill,
+    FittedText,
+    Gradient,
+    ImageLayer,
+    Layer,
+    Rect,
+    Scene,
+    WrappedText,
+)
+
+
+def _slide_layers(i):
+    return [
+        Rect((0, 0, 400, 8), fill="#1a73e8" if i % 2 == 0 else "#fbbc04"),
+        CenteredText(f"{i + 1}/5", y_offset=-60, font_size=24),
+        CenteredText(f"Slide title {i}" * (i % 3 + 1)),
+    ]
+
+
+class TestScene:
+    def test_base_is_rendered_once(self):
+        scene = Scene((200, 100), [Fill("#0d1117"), Rect((0, 0, 200, 10), fill="#fbbc04")])
+        again = Scene((200, 100), [Fill("#0d1117"), Rect((0, 0, 200, 10), fill="#fbbc04")])
+        assert again.base() is scene.base()
+        assert scene.base().mode == "RGB"
+        # Flat bases reused after another base are cached in palette mode.
+        Scene((20, 20), [Fill("#ffffff")]).base()
+        assert scene.base().mode == "P"
+        base = scene.base().convert("RGB")
+        assert base.getpixel((5, 5)) == (251, 188, 4)
+        assert base.getpixel((5, 50)) == (13, 17, 23)
+
+    def test_render_does_not_modify_base(self):
+        scene = Scene((200, 100), [Fill("#0d1117")])
+        canvas = scene.render([Rect((0, 0, 50, 50), fill="#ffffff")])
+        assert canvas.getpixel((10, 10)) == (255, 255, 255)
+        assert scene.base().convert("RGB").getpixel((10, 10)) == (13, 17, 23)
+
+    def test_image_layer_with_opacity(self):
+        overlay = Image.new("RGBA", (10, 10), (255, 255, 255, 255))
+        scene = Scene((20, 20), [Fill("#000000")])
+        canvas = scene.render([ImageLayer(overlay, (5, 5), opacity=0.5)])
+        assert canvas.getpixel((0, 0)) == (0, 0, 0)
+        assert 120 <= canvas.getpixel((7, 7))[0] <= 135
+
+    def test_compact_base_renders_identically(self):
+        layers = [
+            Fill("#0d1117"),
+            Rect((10, 10, 190, 90), outline="#4285f4", width=3),
+            CenteredText("Flat", color="#ffffff"),
+        ]
+        expected = Image.new("RGB", (200, 100))
+        draw = ImageDraw.Draw(expected)
+        for layer in layers:
+            layer.draw(expected, draw)
+        scene = Scene((200, 100), layers)
+        assert scene.render().tobytes() == expected.tobytes()
+        # Once another base is used, renders composite onto a compacted base.
+        Scene((20, 20), [Fill("#ffffff")]).base()
+        assert scene.render().tobytes() == expected.tobytes()
+        assert scene.base().mode == "P"
+
+    def test_photographic_base_stays_rgb(self):
+        scene = Scene((50, 300), [Gradient(((0.0, "#000000"), (1.0, "#4285f4")))])
+        assert scene.base().mode == "RGB"
+
+
+class TestCompositor:
+    def test_frames_match_full_renders(self):
+        scene = Scene((400, 400), [Fill("#0d1117")])
+        compositor = scene.compositor()
+        for i in range(5):
+            frame = compositor.render(_slide_layers(i))
+            expected = scene.render(_slide_layers(i))
+            assert frame.tobytes() == expected.tobytes()
+
+    def test_fitted_text_bounds_cover_its_ink(self):
+        layer = FittedText("Fitted title gjpq", (20, 40, 380, 140), max_lines=2)
+        canvas = Image.new("RGB", (400, 300))
+        layer.draw(canvas, ImageDraw.Draw(canvas))
+        left, top, right, bottom = layer.bounds(canvas.size)
+        ink = canvas.getbbox()
+        assert left <= ink[0] and top <= ink[1] and right >= ink[2] and bottom >= ink[3]
+
+    def test_wrapped_text_region_is_restored(self):
+        scene = Scene((300, 300), [Fill("#0d1117")])
+        compositor = scene.compositor()
+        compositor.render([WrappedText("a long caption " * 10, max_width=280, position=(10, 100))])
+        frame = compositor.render([WrappedText("short", max_width=280, position=(10, 100))])
+        expected = scene.render([WrappedText("short", max_width=280, position=(10, 100))])
+        assert frame.tobytes() == expected.tobytes()
+
+
+@dataclass(frozen=True)
+class _Ellipse(Layer):
+    def draw(self, canvas, draw):
+        draw.ellipse((0, 0, 10, 10), fill="#ffffff")
+
+
+@dataclass(frozen=True)
+class _BrokenText(CenteredText):
+    def draw(self, canvas, draw):
+        draw.txt((0, 0), self.text)
+
+
+def _assemble(scene, layers, rows):
+    image = Image.new("RGB", scene.size)
+    for top, strip in scene.strips(layers, rows=rows):
+        image.paste(strip, (0, top))
+    return image
+
+
+class TestStrips:
+    LAYERS = [
+        ImageLayer(Image.new("RGBA", (120, 90), (255, 0, 0, 128)), (500, 330)),
+        WrappedText("wrapped caption " * 12, max_width=300, position=(20, 200)),
+        FittedText("Fitted title", (50, 40, 590, 150), max_lines=2),
+    ]
+
+    @pytest.mark.parametrize("angle", [90, 0, 270, 35])
+    @pytest.mark.parametrize("rows", [1, 7, None])
+    def test_strips_match_render(self, angle, rows):
+        scene = Scene((640, 397), [
+            Gradient(((0.0, "#0d1117"), (1.0, "#4285f4")), angle=angle),
+            Rect((0, 0, 640, 30), fill="#fbbc04"),
+            Rect((100, 50, 400, 300), outline="#ffffff", width=5),
+            CenteredText("Two\nlines", font_size=60, y_offset=-50),
+        ])
+        expected = scene.render(self.LAYERS)
+        assert _assemble(scene, self.LAYERS, rows).tobytes() == expected.tobytes()
+
+    @pytest.mark.parametrize("rows", [1, 7, None])
+    def test_faded_strips_match_render(self, rows):
+        scene = Scene((640, 397), [
+            Gradient(((0.0, "#0d1117"), (1.0, "#4285f4")), angle=35),
+            Faded(Rect((0, 0, 640, 30), fill="#fbbc04"), 0.4),
+            Faded(Fill("#ffffff"), 0.1),
+        ])
+        layers = [
+            Faded(ImageLayer(Image.new("RGBA", (120, 90), (255, 0, 0, 200)), (500, 330)), 0.5),
+            Faded(WrappedText("faded caption " * 12, max_width=300, position=(20, 200)), 0.7),
+        ]
+        expected = scene.render(layers)
+        assert _assemble(scene, layers, rows).tobytes() == expected.tobytes()
+
+    def test_unsupported_layer(self):
+        scene = Scene((20, 20), [Fill("#000000"), _Ellipse()])
+        with pytest.raises(NotImplementedError, match="_Ellipse"):
+            next(scene.strips())
+
+    def test_text_layer_errors_propagate(self):
+        scene = Scene((20, 20), [Fill("#000000"), _BrokenText("oops")])
+        with pytest.raises(AttributeError, match="txt"):
+            next(scene.strips())
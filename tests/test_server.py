@@ -0,0 +1,146 @@
+import asyncio
+import json
+
+import pytest
+from PIL import Image
+
+from src.server import RenderServer
+
+
+async def _request(port, method, path, body=None):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    payload = json.dumps(body).encode() if body is not None else b""
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: test\r\nConnection: close\r\n"
+        f"Content-Length: {len(payload)}\r\n\r\n".encode() + payload
+    )
+    await writer.drain()
+    raw = await reader.read()
+    writer.close()
+    head, _, content = raw.partition(b"\r\n\r\n")
+    status = int(head.split(b" ")[1])
+    return status, content
+
+
+@pytest.fixture
+def run_with_server():
+    def run(check, **kwargs):
+        async def main():
+            server = RenderServer(port=0, workers=1, **kwargs)
+            await server.start()
+            try:
+                return await check(server)
+            finally:
+                await server.close()
+
+        return asyncio.run(main())
+
+    return run
+
+
+class TestRenderServer:
+    def test_health(self, run_with_server):
+        async def check(server):
+            status, content = await _request(server.port, "GET", "/health")
+            assert status == 200
+            assert json.loads(content)["workers"] == 1
+
+        run_with_server(check)
+
+    def test_render_to_path(self, run_with_server, tmp_path):
+        async def check(server):
+            output = tmp_path / "served" / "thumb.png"
+            status, content = await _request(
+                server.port,
+                "POST",
+                "/render",
+                {"generator": "thumbnail", "params": {"title": "Served", "output_path": "served/thumb.png"}},
+            )
+            assert status == 200
+            assert json.loads(content)["paths"] == [str(output)]
+            assert output.exists()
+
+        run_with_server(check, output_dir=tmp_path)
+
+    def test_output_path_stays_in_output_dir(self, run_with_server, tmp_path):
+        async def check(server):
+            for requested in (str(tmp_path / "escape.png"), "../escape.png", "a/../../escape.png"):
+                status, content = await _request(
+                    server.port,
+                    "POST",
+                    "/render",
+                    {"generator": "thumbnail", "params": {"title": "x", "output_path": requested}},
+                )
+                assert status == 400
+                assert "relative" in json.loads(content)["error"]
+            assert not list(tmp_path.rglob("escape.png"))
+
+        run_with_server(check, output_dir=tmp_path / "out")
+
+    def test_render_bytes(self, run_with_server, tmp_path):
+        async def check(server):
+            status, content = await _request(
+                server.port,
+                "POST",
+                "/render",
+                {"generator": "banner", "params": {"title": "Bytes"}, "return": "bytes"},
+            )
+            assert status == 200
+            image_path = tmp_path / "bytes.png"
+            image_path.write_bytes(content)
+            assert Image.open(image_path).size == (2560, 1440)
+
+        run_with_server(check)
+
+    def test_render_errors(self, run_with_server):
+        async def check(server):
+            status, _ = await _request(server.port, "POST", "/render", {"params": {}})
+            assert status == 400
+            status, content = await _request(
+                server.port, "POST", "/render", {"generator": "hologram", "params": {}}
+            )
+            assert status == 422
+            error = json.loads(content)["error"]
+            assert "Unknown generator" in error
+            assert "Traceback" not in error
+
+        run_with_server(check)
+
+    def test_negative_content_length(self, run_with_server):
+        async def check(server):
+            reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+            writer.write(b"POST /render HTTP/1.1\r\nHost: test\r\nContent-Length: -5\r\n\r\n")
+            await writer.drain()
+            raw = await reader.read()
+            writer.close()
+            assert raw.startswith(b"HTTP/1.1 400 ")
+            assert b"Invalid Content-Length" in raw
+
+        run_with_server(check)
+
+    def test_timed_out_job_stays_in_flight(self, run_with_server):
+        async def check(server):
+            status, _ = await _request(
+                server.port, "POST", "/render", {"generator": "banner", "params": {"title": "Slow"}, "return": "bytes"}
+            )
+            assert status == 504
+            # The worker is still rendering, so it still takes up capacity.
+            assert server.in_flight == 1
+            for _ in range(200):
+                if not server.in_flight:
+                    break
+                await asyncio.sleep(0.05)
+            assert server.in_flight == 0
+
+        run_with_server(check, timeout=0.001)
+
+    def test_rejects_when_queue_full(self, run_with_server):
+        async def check(server):
+            server.in_flight = server.workers + server.queue_size
+            status, _ = await _request(
+                server.port, "POST", "/render", {"generator": "thumbnail", "params": {"title": "x"}}
+            )
+            assert status == 503
+            assert server.stats["rejected"] == 1
+
+        run_with_server(check, queue_size=0)
@@ -0,0 +1,60 @@
+import io
+
+import pytest
+from PIL import Image, ImageDraw
+
+from src.utils.stream import PngStripWriter, TiffStripWriter, write_strips
+
+
+def _graphic() -> Image.Image:
+    image = Image.new("RGB", (301, 203), "#0d1117")
+    draw = ImageDraw.Draw(image)
+    draw.ellipse((10, 10, 250, 190), fill="#fbbc04")
+    draw.text((20, 20), "Strips", fill="#ffffff")
+    image.putpixel((0, 0), (255, 0, 0))
+    return image
+
+
+def _strips(image, rows):
+    for top in range(0, image.height, rows):
+        yield image.crop((0, top, image.width, min(image.height, top + rows)))
+
+
+@pytest.mark.parametrize(
+    "writer, options",
+    [(PngStripWriter, {}), (TiffStripWriter, {}), (TiffStripWriter, {"compression": "raw"})],
+)
+def test_round_trip(writer, options):
+    image = _graphic()
+    buffer = io.BytesIO()
+    stream = writer(buffer, image.size, dpi=300, **options)
+    for strip in _strips(image, 50):
+        stream.write(strip)
+    stream.close()
+
+    decoded = Image.open(io.BytesIO(buffer.getvalue()))
+    assert decoded.size == image.size
+    assert round(decoded.info["dpi"][0]) == 300
+    assert decoded.tobytes() == image.tobytes()
+
+
+def test_incomplete_or_uneven_strips_fail():
+    image = _graphic()
+    png = PngStripWriter(io.BytesIO(), image.size)
+    png.write(image.crop((0, 0, 301, 10)))
+    with pytest.raises(ValueError, match="10 of 203 rows"):
+        png.close()
+
+    tiff = TiffStripWriter(io.BytesIO(), image.size)
+    tiff.write(image.crop((0, 0, 301, 10)))
+    with pytest.raises(ValueError, match="last TIFF strip"):
+        tiff.write(image.crop((0, 10, 301, 15)))
+
+
+def test_write_strips_picks_format_by_suffix(tmp_path):
+    image = _graphic()
+    path = write_strips(tmp_path / "print.tif", image.size, _strips(image, 64))
+    assert Image.open(path).format == "TIFF"
+    with pytest.raises(ValueError, match="Cannot stream 'jpg'"):
+        write_strips(tmp_path / "print.jpg", image.size, _strips(image, 64))
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["print.tif"]
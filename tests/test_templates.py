@@ -0,0 +1,65 @@
+import os
+
+import pytest
+
+from config import Settings
+from src.templates import TemplateEngine
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    monkeypatch.setattr(Settings, "CACHE_DIR", tmp_path / "cache")
+    root = tmp_path / "templates"
+    (root / "youtube").mkdir(parents=True)
+    (root / "youtube" / ".gitkeep").write_text("")
+    (root / "youtube" / "title.html").write_text("<h1>{{ title }}</h1>")
+    (root / "linkedin").mkdir()
+    return TemplateEngine(Settings(), templates_dir=root)
+
+
+def _edit(path, text):
+    path.write_text(text)
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+
+def test_list_templates_refreshes_on_change(engine):
+    assert engine.list_templates() == ["youtube/title.html"]
+    (engine.templates_dir / "linkedin" / "post.html").write_text("{{ text }}")
+    assert engine.list_templates("linkedin") == ["linkedin/post.html"]
+    assert engine.list_templates("youtube") == ["youtube/title.html"]
+
+
+def test_render_is_memoized_until_template_changes(engine):
+    assert engine.render("youtube/title.html", title="A") == "<h1>A</h1>"
+    assert engine.render("youtube/title.html", title="A") == "<h1>A</h1>"
+    assert (engine.hits, engine.misses) == (1, 1)
+
+    _edit(engine.templates_dir / "youtube" / "title.html", "<h2>{{ title }}</h2>")
+    assert engine.render("youtube/title.html", title="A") == "<h2>A</h2>"
+
+
+def test_memo_follows_extends_and_include(engine):
+    root = engine.templates_dir / "youtube"
+    (root / "base.html").write_text("v1/{% block body %}{% endblock %}")
+    (root / "part.html").write_text("P1")
+    (root / "page.html").write_text(
+        '{% extends "youtube/base.html" %}{% block body %}{% include "youtube/part.html" %}{% endblock %}'
+    )
+    assert engine.render("youtube/page.html") == "v1/P1"
+    assert engine.render("youtube/page.html") == "v1/P1"
+    assert engine.hits == 1
+
+    _edit(root / "base.html", "v2/{% block body %}{% endblock %}")
+    assert engine.render("youtube/page.html") == "v2/P1"
+    _edit(root / "part.html", "P2")
+    assert engine.render("youtube/page.html") == "v2/P2"
+
+
+def test_render_many_and_bytecode_cache(engine):
+    contexts = [{"title": "A"}, {"title": "B"}, {"title": object()}]
+    outputs = engine.render_many("youtube/title.html", contexts)
+    assert outputs[:2] == ["<h1>A</h1>", "<h1>B</h1>"]
+    # Contexts that are not JSON data are rendered, not memoized.
+    assert engine.misses == 2
+    assert list((Settings.CACHE_DIR / "templates").iterdir())
@@ -1,4 +1,32 @@
-from src.utils.color import hex_to_rgb, rgb_to_hex, adjust_brightness, blend_colors
+import os
+import shutil
+import stat
+
+import pytest
+from PIL import Image, ImageDraw, ImageFont
+
+from config import BrandConfig
+
+from src.utils.color import (
+    Palette,
+    hex_to_rgb,
+    rgb_to_hex,
+    adjust_brightness,
+    blend_colors,
+    palette_for,
+)
+from src.utils.gradient import linear_gradient, radial_gradient
+from src.utils.image import (
+    ResizePyramid,
+    apply_overlay,
+    apply_overlays,
+    atomic_save,
+    atomic_write_bytes,
+    compact_image,
+    resize_image,
+)
+from src.utils.layout import layout_text
+from src.utils.text import FontCache, draw_text_fitted, fit_text
 
 
 class TestHexToRgb:
@@ -48,3 +76,342 @@ class TestBlendColors:
     def test_full_second_color(self):
         result = blend_colors("#ff0000", "#0000ff", 1.0)
         assert result == (0, 0, 255)
+
+
+class TestPalette:
+    @pytest.fixture
+    def palette(self):
+        return Palette.compile({"primary": "#1a73e8", "background": "#0d1117"})
+
+    def test_brand_palette_compiled_once(self):
+        palette = palette_for(BrandConfig())
+        assert palette_for(BrandConfig()) is palette
+        assert palette["primary"] == (26, 115, 232)
+
+    def test_colors_are_rgb_tuples(self, palette):
+        assert palette["primary"] == (26, 115, 232)
+        assert palette.rgba("primary", 128) == (26, 115, 232, 128)
+        with pytest.raises(TypeError):
+            palette.colors["primary"] = (0, 0, 0)
+
+    def test_ramps_match_blend_colors(self, palette):
+        assert palette.tint("primary", 0) == palette["primary"]
+        assert palette.tint("primary", 10) == (255, 255, 255)
+        assert palette.shade("primary", 5) == blend_colors("#1a73e8", "#000000", 0.5)
+
+    def test_blend_lut_endpoints(self, palette):
+        lut = palette.lut("background", "primary")
+        assert len(lut) == 256
+        assert lut[0] == palette["background"] and lut[255] == palette["primary"]
+        assert palette.blend("background", "#ffffff", 1.0) == (255, 255, 255)
+
+    def test_luts_colorize_l_images(self, palette):
+        mask = Image.linear_gradient("L")
+        via_point = Image.merge(
+            "RGB", [mask.point(band) for band in palette.point_luts("background", "primary")]
+        )
+        indexed = mask.copy()
+        indexed.putpalette(palette.putpalette_data("background", "primary"))
+        assert indexed.convert("RGB").tobytes() == via_point.tobytes()
+        assert via_point.getpixel((0, 255)) == palette["primary"]
+
+
+class TestFontCache:
+    @pytest.fixture
+    def font_file(self, tmp_path):
+        try:
+            source = ImageFont.truetype("DejaVuSans.ttf", 12).path
+        except OSError:
+            pytest.skip("DejaVuSans.ttf is not installed")
+        target = tmp_path / "Montserrat-Bold.ttf"
+        shutil.copy(source, target)
+        return target
+
+    def test_discovers_fonts_by_normalized_name(self, font_file):
+        cache = FontCache(font_dirs=[font_file.parent])
+        assert cache.resolve("Montserrat Bold") == str(font_file)
+        assert cache.resolve("montserrat-bold.ttf") == str(font_file)
+
+    def test_hits_and_misses(self, font_file):
+        cache = FontCache(font_dirs=[font_file.parent])
+        first = cache.load("Montserrat-Bold", 32)
+        second = cache.load("Montserrat-Bold", 32)
+        assert first is second
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_negative_cache_for_missing_fonts(self, font_file):
+        cache = FontCache(font_dirs=[font_file.parent])
+        cache.load("No Such Font", 20)
+        cache.load("No Such Font", 20)
+        stats = cache.stats()
+        assert stats["missing"] == ["No Such Font"]
+        assert stats["negative_hits"] == 1
+
+    def test_lru_eviction(self, font_file):
+        cache = FontCache(maxsize=2, font_dirs=[font_file.parent])
+        for size in (10, 11, 12):
+            cache.load("Montserrat-Bold", size)
+        stats = cache.stats()
+        assert stats["size"] == 2
+        assert stats["evictions"] == 1
+
+
+class TestGradient:
+    @staticmethod
+    def _row_loop_gradient(size, primary):
+        # The per-row loop ThumbnailGenerator used before gradients were vectorized.
+        width, height = size
+        image = Image.new("RGB", size, (13, 17, 23))
+        draw = ImageDraw.Draw(image)
+        for y in range(height):
+            alpha = y / height
+            color = tuple(int(primary[i] * alpha) for i in range(3))
+            draw.line([(0, y), (width, y)], fill=color)
+        return image
+
+    def test_matches_thumbnail_row_loop(self):
+        primary = hex_to_rgb("#1a73e8")
+        for size in [(1280, 720), (2560, 1440), (1584, 396)]:
+            expected = self._row_loop_gradient(size, primary)
+            actual = linear_gradient(size, [(0.0, (0, 0, 0)), (1.0, primary)])
+            assert actual.tobytes() == expected.tobytes()
+
+    def test_horizontal_direction(self):
+        image = linear_gradient((100, 10), ["#000000", "#ffffff"], angle=0)
+        assert image.getpixel((0, 5)) == (0, 0, 0)
+        assert image.getpixel((99, 5))[0] > 250
+        assert image.getpixel((50, 0)) == image.getpixel((50, 9))
+
+    def test_multi_stop_and_reversed(self):
+        image = linear_gradient((1, 300), ["#ff0000", "#00ff00", "#0000ff"], angle=270)
+        assert image.getpixel((0, 299)) == (255, 0, 0)
+        assert image.getpixel((0, 149)) == (0, 255, 0)
+
+    def test_diagonal_corners(self):
+        image = linear_gradient((200, 100), ["#000000", "#ffffff"], angle=45)
+        assert image.size == (200, 100)
+        assert sum(image.getpixel((1, 1))) < sum(image.getpixel((198, 98)))
+
+    def test_radial_center_to_corner(self):
+        image = radial_gradient((101, 101), ["#ffffff", "#000000"])
+        assert image.getpixel((50, 50))[0] > 245
+        assert image.getpixel((0, 0))[0] < 10
+
+    def test_memoized_results_are_independent_copies(self):
+        first = linear_gradient((64, 64), ["#000000", "#ffffff"])
+        first.putpixel((0, 0), (1, 2, 3))
+        second = linear_gradient((64, 64), ["#000000", "#ffffff"])
+        assert second.getpixel((0, 0)) == (0, 0, 0)
+
+
+class TestApplyOverlay:
+    @staticmethod
+    def _reference(base, overlay, position, opacity):
+        # apply_overlay before it was optimized.
+        if opacity < 1.0:
+            overlay = overlay.copy()
+            alpha = overlay.getchannel("A")
+            alpha = alpha.point(lambda p: int(p * opacity))
+            overlay.putalpha(alpha)
+        result = base.copy()
+        result.paste(overlay, position, overlay)
+        return result
+
+    @pytest.fixture
+    def base(self):
+        return linear_gradient((200, 120), ["#0d1117", "#1a73e8"])
+
+    @pytest.fixture
+    def overlay(self):
+        overlay = radial_gradient((60, 40), ["#fbbc04", "#ffffff"]).convert("RGBA")
+        overlay.putalpha(linear_gradient((60, 40), ["#000000", "#ffffff"], angle=0).convert("L"))
+        return overlay
+
+    @pytest.mark.parametrize("position", [(10, 20), (-15, -10), (170, 100), (300, 300)])
+    @pytest.mark.parametrize("opacity", [1.0, 0.35])
+    def test_matches_reference(self, base, overlay, position, opacity):
+        expected = self._reference(base, overlay, position, opacity)
+        actual = apply_overlay(base, overlay, position, opacity)
+        assert actual.tobytes() == expected.tobytes()
+
+    def test_in_place(self, base, overlay):
+        result = apply_overlay(base, overlay, (5, 5), in_place=True)
+        assert result is base
+
+    def test_returns_copy_by_default(self, base, overlay):
+        before = base.tobytes()
+        apply_overlay(base, overlay, (5, 5))
+        assert base.tobytes() == before
+
+    def test_multiple_overlays(self, base, overlay):
+        expected = self._reference(base, overlay, (0, 0), 1.0)
+        expected = self._reference(expected, overlay, (50, 50), 0.5)
+        actual = apply_overlays(base, [(overlay, (0, 0)), (overlay, (50, 50), 0.5)])
+        assert actual.tobytes() == expected.tobytes()
+
+
+class TestResizePyramid:
+    def test_levels_built_lazily_from_largest(self):
+        pyramid = ResizePyramid(Image.new("RGB", (800, 400), "#336699"))
+        assert pyramid.resize(400, 200).size == (400, 200)
+        assert [level.size for level in pyramid.levels] == [(800, 400), (400, 200)]
+        pyramid.resize(150, 75)
+        assert [level.size for level in pyramid.levels][-1] == (200, 100)
+        # Upscaling starts from the source.
+        assert pyramid.level_for(1000, 500) is pyramid.levels[0]
+
+    def test_reducing_gap_keeps_larger_level(self):
+        pyramid = ResizePyramid(Image.new("RGB", (800, 400)), reducing_gap=3.0)
+        assert pyramid.level_for(150, 75).size == (800, 400)
+        assert pyramid.level_for(100, 50).size == (400, 200)
+
+    def test_resize_image_accepts_pyramid(self):
+        image = Image.new("RGB", (900, 300), "#ff0000")
+        pyramid = ResizePyramid(image)
+        for method in ("cover", "contain"):
+            expected = resize_image(image, 200, 200, method)
+            actual = resize_image(pyramid, 200, 200, method)
+            assert actual.size == expected.size
+            assert actual.getpixel((5, 5)) == expected.getpixel((5, 5))
+
+
+class TestCompactImage:
+    def test_flat_image_round_trips_exactly(self):
+        image = Image.new("RGB", (120, 60), "#0d1117")
+        draw = ImageDraw.Draw(image)
+        draw.rectangle((0, 0, 119, 9), fill="#fbbc04")
+        draw.text((10, 20), "Flat", fill="#ffffff", font=ImageFont.load_default(24))
+        compact = compact_image(image)
+        assert compact.mode == "P"
+        assert compact.convert("RGB").tobytes() == image.tobytes()
+
+    def test_grays_become_l(self):
+        image = Image.linear_gradient("L").convert("RGB")
+        compact = compact_image(image)
+        assert compact.mode == "L"
+        assert compact.convert("RGB").tobytes() == image.tobytes()
+
+    def test_photographic_image_is_unchanged(self):
+        image = Image.merge("RGB", [Image.linear_gradient("L"), Image.radial_gradient("L"),
+                                    Image.linear_gradient("L").rotate(90)])
+        assert compact_image(image) is image
+
+
+class TestAtomicWrite:
+    def test_new_file_gets_umask_mode(self, tmp_path):
+        umask = os.umask(0)
+        os.umask(umask)
+        path = atomic_save(Image.new("RGB", (4, 4)), tmp_path / "a.png")
+        assert stat.S_IMODE(path.stat().st_mode) == 0o666 & ~umask
+
+    def test_existing_mode_is_kept(self, tmp_path):
+        path = tmp_path / "a.bin"
+        path.write_bytes(b"old")
+        path.chmod(0o640)
+        atomic_write_bytes(path, b"new")
+        assert path.read_bytes() == b"new"
+        assert stat.S_IMODE(path.stat().st_mode) == 0o640
+
+
+class TestLayoutText:
+    @pytest.fixture
+    def font(self):
+        return FontCache().load(None, 24)
+
+    CAPTION = (
+        "Master SQL, Power BI and Python with real business projects, "
+        "mentorship from industry experts and a virtual internship that "
+        "gets you job ready for data analyst roles"
+    )
+
+    def test_greedy_lines_fit(self, font):
+        layout = layout_text(self.CAPTION, font, max_width=300)
+        assert len(layout.lines) > 1
+        assert " ".join(layout.lines) == self.CAPTION
+        for line in layout.lines:
+            bbox = font.getbbox(line)
+            assert bbox[2] - bbox[0] <= 300 or " " not in line
+
+    def test_greedy_matches_word_by_word_ink_fit(self, font):
+        # Reference: try each word on the current line and keep it while the
+        # joined line's ink fits.
+        def word_by_word(text, max_width):
+            lines, current = [], ""
+            for word in text.split():
+                candidate = f"{current} {word}".strip()
+                bbox = font.getbbox(candidate)
+                if bbox[2] - bbox[0] <= max_width:
+                    current = candidate
+                else:
+                    if current:
+                        lines.append(current)
+                    current = word
+            if current:
+                lines.append(current)
+            return tuple(lines)
+
+        words = self.CAPTION.split()
+        for shift in range(len(words)):
+            text = " ".join(words[shift:] + words[:shift])
+            for max_width in (120, 237, 300, 451):
+                layout = layout_text(text, font, max_width=max_width)
+                assert layout.lines == word_by_word(text, max_width)
+
+    def test_optimal_uses_no_more_width(self, font):
+        greedy = layout_text(self.CAPTION, font, max_width=300)
+        optimal = layout_text(self.CAPTION, font, max_width=300, wrap="optimal")
+        assert " ".join(optimal.lines) == self.CAPTION
+        assert all(font.getlength(line) <= 300 for line in optimal.lines)
+        assert len(optimal.lines) >= len(greedy.lines)
+
+    def test_overlong_word_gets_own_line(self, font):
+        layout = layout_text("a supercalifragilisticexpialidocious b", font, max_width=40)
+        assert layout.lines == ("a", "supercalifragilisticexpialidocious", "b")
+
+    def test_wrapped_newlines_are_whitespace(self, font):
+        layout = layout_text("one two\nthree", font, max_width=1000)
+        assert layout.lines == ("one two three",)
+
+    def test_unwrapped_newlines_break(self, font):
+        layout = layout_text("one two\nthree", font)
+        assert layout.lines == ("one two", "three")
+
+    def test_memoized(self, font):
+        first = layout_text(self.CAPTION, font, max_width=250)
+        assert layout_text(self.CAPTION, font, max_width=250) is first
+
+    def test_offsets_stack_line_heights(self, font):
+        layout = layout_text(self.CAPTION, font, max_width=300, line_spacing=10)
+        for i in range(1, len(layout.lines)):
+            prev = layout.bboxes[i - 1]
+            assert layout.offsets[i][1] == layout.offsets[i - 1][1] + prev[3] - prev[1] + 10
+
+
+class TestFitText:
+    TITLE = "Data Analytics Bootcamp with Virtual Internship"
+
+    def test_largest_size_that_fits(self):
+        font, layout = fit_text(self.TITLE, (600, 200), max_lines=2)
+        assert len(layout.lines) <= 2
+        assert layout.width <= 600 and layout.height <= 200
+        bigger = FontCache().load(None, font.size + 1)
+        wider = layout_text(self.TITLE, bigger, 600)
+        assert len(wider.lines) > 2 or wider.width > 600 or wider.height > 200
+
+    def test_respects_max_size(self):
+        font, _ = fit_text("Hi", (2000, 2000), max_size=64)
+        assert font.size == 64
+
+    def test_falls_back_to_min_size(self):
+        font, _ = fit_text(self.TITLE, (20, 10), min_size=8)
+        assert font.size == 8
+
+    def test_drawn_ink_is_centered_in_box(self):
+        box = (40, 30, 560, 230)
+        canvas = Image.new("RGB", (600, 260))
+        draw_text_fitted(ImageDraw.Draw(canvas), self.TITLE, box, color="#ffffff", max_lines=2)
+        left, top, right, bottom = canvas.getbbox()
+        assert box[0] <= left and box[1] <= top and right <= box[2] and bottom <= box[3]
+        assert abs((left - box[0]) - (box[2] - right)) <= 2
+        assert abs((top - box[1]) - (box[3] - bottom)) <= 2